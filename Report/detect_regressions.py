@@ -0,0 +1,226 @@
+"""
+Change-point detection over the performance history kept by perf_store.py.
+
+Every series (system, scenario, install method, metric, message size) is
+split recursively (binary segmentation) at the point where the mean shifts
+the most. For a series x of length n, the two-sample t statistic of every
+candidate split k is computed at once from prefix sums of x and x**2, which
+is the standardised CUSUM of the series. A split is kept if the shift is
+significant after a Bonferroni correction over the candidate splits and
+larger than a minimal relative change, so a single noisy run (at least
+`min_segment` runs are needed on each side) never trips it while a
+sustained 8% drop does. The statistics reported next to the judged metrics
+(`<metric>_p95`, `<metric>_cv`, `<metric>_outliers`...) are skipped, as they are
+by generate_references.py.
+
+Usage:
+    python detect_regressions.py --days 180
+    python detect_regressions.py --system aion --min-confidence 0.999 --csv
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from perf_store import connect, default_store_path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'reframe_tests'))
+from osu_utils.references import UNJUDGED_PVAR_REGEX  # noqa: E402
+
+SERIES_FIELDS = ['system', 'scenario', 'install_method', 'benchmark', 'metric', 'message_size']
+
+# Metrics for which a decrease is a regression; lower is better for the others
+HIGHER_IS_BETTER = {'bandwidth', 'msgrate', 'overlap'}
+
+def higher_is_better(metric):
+    """Direction of a judged metric (`latency`, `bandwidth_<size>`...)."""
+    return metric.partition('_')[0] in HIGHER_IS_BETTER
+
+
+CHANGE_FIELDS = SERIES_FIELDS + [
+    'timestamp', 'index', 'runs_before', 'runs_after', 'mean_before',
+    'mean_after', 'shift', 'confidence', 'kind',
+]
+
+
+def _best_split(values, min_segment):
+    """Split index with the largest mean-shift t statistic, and that statistic."""
+    n = len(values)
+    if n < 2 * min_segment:
+        return None, 0.0
+
+    # Centre the values so the sums of squares keep their precision
+    x = values - values.mean()
+    c1 = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+
+    k = np.arange(min_segment, n - min_segment + 1)
+    n1, n2 = k, n - k
+    mean1 = c1[k] / n1
+    mean2 = (c1[n] - c1[k]) / n2
+    ss = (c2[k] - n1 * mean1**2) + (c2[n] - c2[k] - n2 * mean2**2)
+    stderr = np.sqrt(np.maximum(ss, 0.0) / (n - 2) * (1.0 / n1 + 1.0 / n2))
+
+    # A flat segment with a step gives a zero variance: any shift is significant
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(stderr > 0, (mean2 - mean1) / stderr,
+                     np.where(mean2 != mean1, np.inf, 0.0))
+
+    best = int(np.argmax(np.abs(t)))
+    return int(k[best]), float(abs(t[best]))
+
+
+def _confidence(t_stat, candidates):
+    """1 - p-value of a two-sided normal test, Bonferroni corrected."""
+    p_value = math.erfc(t_stat / math.sqrt(2.0)) * candidates
+    return max(0.0, 1.0 - p_value)
+
+
+def detect_changes(values, min_segment=5, min_confidence=0.99, min_shift=0.02):
+    """
+    Finds the change points of a series by binary segmentation. Returns a
+    list of (index, mean_before, mean_after, confidence), sorted by index;
+    `index` is the first sample after the change and the means are those of
+    the neighbouring segments.
+    """
+    values = np.asarray(values, dtype=float)
+    splits = []
+    segments = [(0, len(values))]
+    while segments:
+        start, end = segments.pop()
+        split, t_stat = _best_split(values[start:end], min_segment)
+        if split is None:
+            continue
+
+        candidates = end - start - 2 * min_segment + 1
+        confidence = _confidence(t_stat, candidates)
+        before = values[start:start + split].mean()
+        after = values[start + split:end].mean()
+        shift = (after - before) / abs(before) if before else math.inf
+        if confidence < min_confidence or abs(shift) < min_shift:
+            continue
+
+        splits.append((start + split, confidence))
+        segments += [(start, start + split), (start + split, end)]
+
+    # Report each change against its final neighbouring segments
+    splits.sort()
+    bounds = [0] + [index for index, _ in splits] + [len(values)]
+    return [
+        (index, values[bounds[i]:index].mean(),
+         values[index:bounds[i + 2]].mean(), confidence)
+        for i, (index, confidence) in enumerate(splits)
+    ]
+
+
+def iter_series(conn, since=None, **filters):
+    """Yields (series key, timestamps, values) for every stored series."""
+    clauses = ['value IS NOT NULL', 'timestamp IS NOT NULL']
+    params = []
+    for name, value in filters.items():
+        if value is not None:
+            # Install methods match in any case (`eessi`, `source+o3-native`)
+            collate = ' COLLATE NOCASE' if name == 'install_method' else ''
+            clauses.append(f'{name} = ?{collate}')
+            params.append(value)
+
+    if since is not None:
+        clauses.append('timestamp >= ?')
+        params.append(since)
+
+    fields = ', '.join(SERIES_FIELDS)
+    rows = conn.execute(
+        f'SELECT {fields}, timestamp, value FROM samples '
+        f'WHERE {" AND ".join(clauses)} ORDER BY {fields}, timestamp', params
+    )
+    width = len(SERIES_FIELDS)
+    for key, group in itertools.groupby(rows, key=lambda row: tuple(row[:width])):
+        series = np.array([tuple(row[width:]) for row in group], dtype=float)
+        yield key, series[:, 0], series[:, 1]
+
+
+def find_regressions(conn, since=None, min_segment=5, min_confidence=0.99,
+                     min_shift=0.02, **filters):
+    """Yields a dict per significant change of every stored series."""
+    for key, timestamps, values in iter_series(conn, since, **filters):
+        series = dict(zip(SERIES_FIELDS, key))
+        if UNJUDGED_PVAR_REGEX.search(series['metric']):
+            continue
+
+        higher = higher_is_better(series['metric'])
+        changes = detect_changes(values, min_segment, min_confidence, min_shift)
+        bounds = [0] + [index for index, *_ in changes] + [len(values)]
+        for i, (index, before, after, confidence) in enumerate(changes):
+            shift = (after - before) / abs(before) if before else math.inf
+            worse = shift < 0 if higher else shift > 0
+            yield dict(
+                series,
+                timestamp=float(timestamps[index]),
+                index=index,
+                runs_before=index - bounds[i],
+                runs_after=bounds[i + 2] - index,
+                mean_before=float(before),
+                mean_after=float(after),
+                shift=float(shift),
+                confidence=confidence,
+                kind='regression' if worse else 'improvement',
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Flag significant shifts in the stored OSU performance history')
+    parser.add_argument('--db', default=default_store_path())
+    for name in SERIES_FIELDS:
+        parser.add_argument('--' + name.replace('_', '-'),
+                            type=int if name == 'message_size' else str)
+    parser.add_argument('--days', type=float, help='only the last N days')
+    parser.add_argument('--min-segment', type=int, default=5,
+                        help='runs required on each side of a change (default: %(default)s)')
+    parser.add_argument('--min-confidence', type=float, default=0.99,
+                        help='default: %(default)s')
+    parser.add_argument('--min-shift', type=float, default=0.02,
+                        help='minimal relative change of the mean (default: %(default)s)')
+    parser.add_argument('--csv', action='store_true', help='print the changes as CSV')
+    args = parser.parse_args(argv)
+
+    filters = {name: getattr(args, name) for name in SERIES_FIELDS}
+    if filters['system']:
+        filters['system'] = filters['system'].lower()
+
+    since = time.time() - args.days * 86400 if args.days else None
+    changes = find_regressions(connect(args.db), since, args.min_segment,
+                               args.min_confidence, args.min_shift, **filters)
+    regressions = 0
+    writer = None
+    if args.csv:
+        writer = csv.DictWriter(sys.stdout, fieldnames=CHANGE_FIELDS)
+        writer.writeheader()
+
+    for change in changes:
+        regressions += change['kind'] == 'regression'
+        if writer:
+            writer.writerow(change)
+            continue
+
+        when = datetime.fromtimestamp(change['timestamp']).strftime('%Y-%m-%d %H:%M')
+        print(f"{change['kind']:<11} {when} {change['system']} {change['scenario']} "
+              f"{change['install_method']} {change['benchmark']} "
+              f"{change['metric']}@{change['message_size']}: "
+              f"{change['mean_before']:.4g} -> {change['mean_after']:.4g} "
+              f"({change['shift']:+.1%}, confidence {change['confidence']:.4f}, "
+              f"{change['runs_before']}/{change['runs_after']} runs)")
+
+    # Non-zero exit status so a campaign script can stop on a regression
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Generates the reference values of the tests (reframe_tests/references.json)
+from the runs kept by perf_store.py.
+
+For every (install method, scenario, benchmark, system:partition, metric),
+only the runs after the last change point of the series (see
+detect_regressions.py) are used, so a recalibration after a hardware or
+software change ignores the previous regime. The reference is the median of
+these runs and the tolerance is a multiple of their MAD-based standard
+deviation, relative to the median and never tighter than `--min-tolerance`.
+Only the side of the bound that means a regression is set (upper for
+latencies, lower for bandwidths). Series with too few runs keep their
+current references.
+
+Usage:
+    python generate_references.py --days 90
+    python generate_references.py --system aion --dry-run
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from detect_regressions import detect_changes, higher_is_better
+from perf_store import connect, default_store_path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'reframe_tests'))
+from osu_utils.references import (UNJUDGED_PVAR_REGEX, default_references_path,  # noqa: E402
+                                  load_references, set_reference, write_references)
+from osu_utils.stats import MAD_TO_SIGMA  # noqa: E402
+
+REFERENCE_FIELDS = ['install_method', 'scenario', 'benchmark', 'system', 'partition', 'metric']
+
+# Per-size perf variables (`<metric>_<size>`, e.g. the collectives) get a
+# reference of their own, keyed by the same name
+_SIZE_SUFFIX_REGEX = re.compile(r'_\d+$')
+
+
+def robust_reference(values, higher, sigmas=4.0, min_tolerance=0.05):
+    """
+    Returns the (value, lower, upper) of a ReFrame reference: the median of
+    the runs and a relative tolerance of `sigmas` robust standard deviations.
+    """
+    values = np.asarray(values, dtype=float)
+    median = float(np.median(values))
+    sigma = MAD_TO_SIGMA * float(np.median(np.abs(values - median)))
+    tolerance = max(min_tolerance, sigmas * sigma / abs(median)) if median else min_tolerance
+    tolerance = round(tolerance, 3)
+    value = float(f'{median:.4g}')
+    if higher:
+        # ReFrame lower thresholds cannot go below -100%
+        return value, -min(tolerance, 1.0), None
+
+    return value, None, tolerance
+
+
+def iter_reference_series(conn, since=None, **filters):
+    """Yields (key, unit, values) of every judged series, oldest run first."""
+    clauses = ['value IS NOT NULL']
+    params = []
+    for name, value in filters.items():
+        if value is not None:
+            # Install methods match in any case (`eessi`, `source+o3-native`)
+            collate = ' COLLATE NOCASE' if name == 'install_method' else ''
+            clauses.append(f'{name} = ?{collate}')
+            params.append(value)
+
+    if since is not None:
+        clauses.append('timestamp >= ?')
+        params.append(since)
+
+    fields = ', '.join(REFERENCE_FIELDS)
+    rows = conn.execute(
+        f'SELECT {fields}, pvar, unit, value FROM samples '
+        f'WHERE {" AND ".join(clauses)} ORDER BY {fields}, timestamp, id', params
+    )
+    width = len(REFERENCE_FIELDS)
+    series = {}
+    for row in rows:
+        pvar = row[width]
+        if UNJUDGED_PVAR_REGEX.search(pvar):
+            continue
+
+        key = row[:width]
+        size = _SIZE_SUFFIX_REGEX.search(pvar)
+        if size and key[-1] is not None:
+            key = key[:-1] + (key[-1] + size.group(0),)
+
+        series.setdefault(key, []).append(row)
+
+    for key, group in series.items():
+        yield key, group[-1][width + 1], [row[width + 2] for row in group]
+
+
+def generate_references(conn, references, since=None, min_samples=10, sigmas=4.0,
+                        min_tolerance=0.05, **filters):
+    """
+    Updates `references` in place from the stored runs. Yields a tuple
+    (key, previous entry, new entry, number of runs) per updated reference.
+    """
+    for key, unit, values in iter_reference_series(conn, since, **filters):
+        install_method, scenario, benchmark, system, partition, metric = key
+        if None in key:
+            continue
+
+        changes = detect_changes(values)
+        if changes:
+            values = values[changes[-1][0]:]
+
+        if len(values) < min_samples:
+            continue
+
+        entry = robust_reference(values, higher_is_better(metric), sigmas, min_tolerance)
+        entry = list(entry) + [unit]
+        previous = set_reference(references, install_method, scenario, benchmark,
+                                 f'{system}:{partition}', metric, entry)
+        if previous != entry:
+            yield key, previous, entry, len(values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Derive the test references from the stored run history')
+    parser.add_argument('--db', default=default_store_path())
+    parser.add_argument('--output', default=default_references_path(),
+                        help='references file to update (default: %(default)s)')
+    for name in REFERENCE_FIELDS:
+        parser.add_argument('--' + name.replace('_', '-'))
+    parser.add_argument('--days', type=float, default=90,
+                        help='only use the last N days of runs (default: %(default)s)')
+    parser.add_argument('--min-samples', type=int, default=10,
+                        help='runs needed to update a reference (default: %(default)s)')
+    parser.add_argument('--sigmas', type=float, default=4.0,
+                        help='tolerance in robust standard deviations (default: %(default)s)')
+    parser.add_argument('--min-tolerance', type=float, default=0.05,
+                        help='minimal relative tolerance (default: %(default)s)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the changes without writing them')
+    args = parser.parse_args(argv)
+
+    filters = {name: getattr(args, name) for name in REFERENCE_FIELDS}
+    if filters['system']:
+        filters['system'] = filters['system'].lower()
+
+    references = load_references(args.output)
+    since = time.time() - args.days * 86400 if args.days else None
+    updates = list(generate_references(connect(args.db), references, since,
+                                       args.min_samples, args.sigmas,
+                                       args.min_tolerance, **filters))
+    for key, previous, entry, runs in updates:
+        install_method, scenario, benchmark, system, partition, metric = key
+        print(f'{install_method} {scenario} {benchmark} {system}:{partition} {metric}: '
+              f'{previous} -> {entry} ({runs} runs)')
+
+    if updates and not args.dry_run:
+        write_references(references, args.output)
+        print(f'{len(updates)} references updated in {args.output}', file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,411 @@
+"""
+Streaming ingestion of OSU regression results into flat sample records.
+
+Supported inputs (detected from the extension and the first lines):
+
+  * ReFrame JSON run reports (`reframe --report-file ...`, `*.json`)
+  * ReFrame perflogs written by the `filelog` handler of config/ulhpc.py
+    (starting with their `job_completion_time|...` header)
+  * pretty-printed performance reports pasted into a text file (results.txt)
+
+Any other file found in a directory is skipped.
+
+Perflogs and text reports are read line by line and JSON reports one file
+at a time, so months of perflogs are ingested in constant memory. System,
+install method and scenario come from the test metadata (the loggable
+`install_method`/`scenario` variables, falling back to the test name),
+never from banners around the tables. Runs pinned to a transport are kept
+under `<scenario>+<transport>`, source build variants under
+`<install_method>+<variant>`.
+
+Usage:
+    python ingest.py ~/.reframe/perflogs reports/*.json > samples.csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'reframe_tests'))
+from osu_utils.references import UNJUDGED_STATISTICS  # noqa: E402
+
+SAMPLE_FIELDS = [
+    'timestamp', 'system', 'partition', 'environ', 'test', 'install_method',
+    'scenario', 'benchmark', 'pvar', 'metric', 'message_size', 'value',
+    'unit', 'reference', 'lower', 'upper', 'result', 'jobid', 'nodes',
+]
+
+# Test class prefix of each install method, longest first
+INSTALL_METHOD_PREFIXES = [
+    ('EasyBuildOsu', 'EASYBUILD'),
+    ('EESSIOsu', 'EESSI'),
+    ('Osu', 'SOURCE'),
+]
+
+# Benchmark of tests reporting several benchmarks (e.g. the packed runs)
+METRIC_BENCHMARKS = {
+    'latency': 'osu_latency',
+    'bandwidth': 'osu_bw',
+    'msgrate': 'osu_mbw_mr',
+}
+
+# `latency`, `latency_8192` (sweeps) or `SameNumaNode_latency` (packed runs),
+# and their statistics (`latency_p95`, `SameNumaNode_latency_outliers`)
+_PVAR_REGEX = re.compile(
+    r'^(?:(?P<scenario>[A-Z][A-Za-z0-9]*)_)?(?P<metric>[a-z][a-z0-9]*)(?:_(?P<size>\d+))?'
+    rf'(?:_(?P<statistic>{UNJUDGED_STATISTICS}))?$'
+)
+_NODE_RANGE_REGEX = re.compile(r'^(?P<prefix>[^\[]*)\[(?P<ranges>[^\]]+)\](?P<suffix>.*)$')
+
+
+def expand_nodelist(nodelist):
+    """
+    Expands a Slurm nodelist (`aion-031[3-4],aion-0064`) or a list of node
+    names into a list of node names, keeping the zero padding.
+    """
+    if not nodelist or nodelist == 'null':
+        return []
+
+    if isinstance(nodelist, (list, tuple)):
+        nodelist = ','.join(nodelist)
+
+    # Split on the commas that are not inside brackets
+    groups = re.findall(r'[^,\[]+(?:\[[^\]]*\][^,\[]*)*', nodelist)
+    nodes = []
+    for group in groups:
+        match = _NODE_RANGE_REGEX.match(group.strip())
+        if not match:
+            nodes.append(group.strip())
+            continue
+
+        for item in match.group('ranges').split(','):
+            first, _, last = item.partition('-')
+            width = len(first)
+            for index in range(int(first), int(last or first) + 1):
+                nodes.append(f"{match.group('prefix')}{index:0{width}d}{match.group('suffix')}")
+
+    return nodes
+
+
+def split_perf_variable(pvar):
+    """
+    Splits a performance variable name into (scenario, metric, message_size).
+    A statistic stays in the metric (`latency_p95`), as a series of its own.
+    """
+    match = _PVAR_REGEX.match(pvar)
+    if not match:
+        return None, pvar, None
+
+    metric, size, statistic = match.group('metric', 'size', 'statistic')
+    if statistic:
+        metric = f'{metric}_{statistic}'
+
+    return match.group('scenario'), metric, int(size) if size else None
+
+
+def _test_name(display_name):
+    return display_name.split(' ')[0]
+
+
+def _name_parameter(display_name, name):
+    match = re.search(rf'%{name}=(\S+)', display_name)
+    return match.group(1) if match else None
+
+
+def infer_install_method(test_name):
+    for prefix, install_method in INSTALL_METHOD_PREFIXES:
+        if test_name.startswith(prefix):
+            return install_method
+
+    return None
+
+
+def infer_scenario(test_name):
+    for prefix, _ in INSTALL_METHOD_PREFIXES:
+        if test_name.startswith(prefix):
+            return test_name[len(prefix):]
+
+    return test_name
+
+
+def _value(value):
+    """Converts a logged value to a float, None for missing ones."""
+    if value in (None, '', 'null', 'None'):
+        return None
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp(value):
+    if value in (None, '', 'null'):
+        return None
+
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    return datetime.fromisoformat(value).timestamp()
+
+
+def make_sample(metadata, pvar, value, unit, reference=None, lower=None, upper=None):
+    """
+    Builds a sample record from the metadata of a test case and one of its
+    performance variables. Missing metadata is inferred from the test name.
+    """
+    display_name = metadata.get('display_name') or ''
+    test = _test_name(display_name)
+    scenario, metric, size = split_perf_variable(pvar)
+
+    # The packed runs report one perf variable per scenario
+    scenario = scenario or metadata.get('scenario') or infer_scenario(test)
+    benchmark = (metadata.get('benchmark_info') or
+                 _name_parameter(display_name, 'benchmark_info') or
+                 METRIC_BENCHMARKS.get(metric.split('_')[0]))
+    if size is None:
+        size = _value(metadata.get('message_size'))
+
+    # Runs pinned to a transport (reframe_tests/osu_utils/transports.py) are
+    # series of their own, e.g. `DifferentNodes+ucx-rc`
+    transport = metadata.get('transport') or _name_parameter(display_name, 'transport')
+    if transport and transport != 'default':
+        scenario = f'{scenario}+{transport}'
+
+    # Source builds of a variant other than the baseline (reframe_tests/
+    # osu_utils/build_variants.py) are an install method of their own
+    install_method = metadata.get('install_method') or infer_install_method(test)
+    variant = (metadata.get('build_variant') or
+               _name_parameter(display_name, 'osu_binaries.build_variant'))
+    if install_method and variant and variant != 'default':
+        install_method = f'{install_method}+{variant}'
+
+    nodes = metadata.get('job_nodelist')
+    return {
+        'timestamp': _timestamp(metadata.get('job_completion_time')),
+        'system': metadata.get('system'),
+        'partition': metadata.get('partition'),
+        'environ': metadata.get('environ'),
+        'test': test,
+        'install_method': install_method,
+        'scenario': scenario,
+        'benchmark': benchmark,
+        'pvar': pvar,
+        'metric': metric,
+        'message_size': int(size) if size is not None else None,
+        'value': _value(value),
+        'unit': unit,
+        'reference': _value(reference),
+        'lower': _value(lower),
+        'upper': _value(upper),
+        'result': metadata.get('result'),
+        'jobid': metadata.get('jobid'),
+        'nodes': ','.join(expand_nodelist(nodes)),
+    }
+
+
+def _clean_metadata(metadata):
+    return {key: value for key, value in metadata.items()
+            if value not in (None, '', 'null', '<undefined>')}
+
+
+def iter_run_report(path):
+    """Yields the samples of a ReFrame JSON run report."""
+    with open(path) as f:
+        report = json.load(f)
+
+    # Retries re-run failed test cases; keep the last run of each of them
+    testcases = {}
+    for run in report.get('runs', []):
+        for testcase in run.get('testcases', []):
+            key = (testcase.get('display_name'), testcase.get('system'),
+                   testcase.get('partition'), testcase.get('environ'))
+            testcases[key] = testcase
+
+    for testcase in testcases.values():
+        metadata = _clean_metadata(testcase)
+        if 'job_completion_time_unix' in metadata:
+            metadata['job_completion_time'] = metadata['job_completion_time_unix']
+
+        for name, perfvalue in (testcase.get('perfvalues') or {}).items():
+            value, reference, lower, upper, unit = perfvalue[:5]
+            yield make_sample(metadata, name.split(':')[-1], value, unit,
+                              reference, lower, upper)
+
+
+def _perflog_layout(header):
+    """Metadata columns and perf variable column groups of a perflog header."""
+    columns = header.split('|')
+    perf_columns = []
+    for index, column in enumerate(columns):
+        if column.endswith('_var'):
+            name = column[:-len('_var')]
+            perf_columns.append({
+                field: columns.index(f'{name}_{field}')
+                for field in ('var', 'value', 'ref', 'lower_thres',
+                              'upper_thres', 'unit')
+                if f'{name}_{field}' in columns
+            })
+
+    first_perf_column = min((group['var'] for group in perf_columns),
+                            default=len(columns))
+    return columns[:first_perf_column], perf_columns
+
+
+def iter_perflog(path):
+    """Yields the samples of a ReFrame perflog, one line at a time."""
+    metadata_columns, perf_columns = None, None
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+
+            if line.startswith('job_completion_time|'):
+                metadata_columns, perf_columns = _perflog_layout(line)
+                continue
+
+            if metadata_columns is None:
+                continue
+
+            fields = line.split('|')
+            metadata = _clean_metadata(dict(zip(metadata_columns, fields)))
+            for group in perf_columns:
+                if group['var'] >= len(fields):
+                    continue
+
+                get = lambda field: fields[group[field]] if field in group else None
+                yield make_sample(metadata, get('var'), get('value'), get('unit'),
+                                  get('ref'), get('lower_thres'), get('upper_thres'))
+
+
+def iter_performance_report(path):
+    """
+    Yields the samples of performance reports pasted from the ReFrame output
+    (the `│`-delimited tables). Banners around the tables are ignored.
+    """
+    header = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith('│'):
+                continue
+
+            parts = [p.strip() for p in line.split('│')[1:-1]]
+            if parts and parts[0] == 'name':
+                header = parts
+                continue
+
+            if header is None or len(parts) != len(header):
+                continue
+
+            row = dict(zip(header, parts))
+            system, _, environ = row.get('sysenv', '').partition('+')
+            system, _, partition = system.partition(':')
+            metadata = _clean_metadata({
+                'display_name': row.get('name'),
+                'system': system,
+                'partition': partition,
+                'environ': environ,
+                'job_nodelist': row.get('job_nodelist'),
+                'result': row.get('result'),
+            })
+            yield make_sample(metadata, row.get('pvar'), row.get('pval'), row.get('punit'))
+
+
+# Bytes read from the start of a file to tell its format
+_DETECT_BYTES = 65536
+
+# Start of a ReFrame run report, which opens with its session information
+_RUN_REPORT_REGEX = re.compile(r'^\{\s*"session_info"\s*:')
+
+# Header row of a pasted performance table
+_TABLE_HEADER_REGEX = re.compile(r'^│\s*name\s*│')
+
+
+def detect_format(path):
+    """
+    Returns 'report', 'perflog' or 'table' from the extension and the first
+    lines of a file, or None for any other file (binary files, CSVs, job
+    outputs...), which iter_samples() skips.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(_DETECT_BYTES)
+    except OSError:
+        return None
+
+    # Binary files (compressed perflogs, images...)
+    if b'\0' in head:
+        return None
+
+    text = head.decode('utf-8', 'replace').lstrip()
+    if path.endswith('.json') and _RUN_REPORT_REGEX.match(text):
+        return 'report'
+
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    if not lines:
+        return None
+
+    if lines[0].startswith('job_completion_time|'):
+        return 'perflog'
+
+    # The tables may follow a banner of free text (results.txt)
+    if any(_TABLE_HEADER_REGEX.match(line) for line in lines):
+        return 'table'
+
+    return None
+
+
+READERS = {
+    'report': iter_run_report,
+    'perflog': iter_perflog,
+    'table': iter_performance_report,
+}
+
+
+def iter_files(paths):
+    """Expands directories (e.g. a perflog tree) into the files they contain."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                yield os.path.join(dirpath, filename)
+
+
+def iter_samples(paths):
+    """Yields the samples of all the result files found in `paths`."""
+    if isinstance(paths, str):
+        paths = [paths]
+
+    for path in iter_files(paths):
+        reader = READERS.get(detect_format(path))
+        if reader is not None:
+            yield from reader(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Convert ReFrame reports, perflogs and results.txt tables to CSV samples')
+    parser.add_argument('paths', nargs='+', help='result files or directories')
+    args = parser.parse_args(argv)
+
+    writer = csv.DictWriter(sys.stdout, fieldnames=SAMPLE_FIELDS)
+    writer.writeheader()
+    for sample in iter_samples(args.paths):
+        writer.writerow(sample)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Per-node performance profiles from the nodes recorded with every run.
+
+Every sample is compared with its peers, the samples of the same system,
+partition, scenario, metric and message size (all install methods together
+unless `--by-install-method`), as its slowdown relative to their median:
+positive when the sample is worse (higher latency, lower bandwidth). The
+slowdown is attributed to every node of the sample's job nodelist, so a node
+shared by several slow runs stands out even when the runs used other nodes
+as well.
+
+A node is flagged when its median slowdown is above `--min-slowdown` and it
+is slow in at least `--min-groups` distinct peer groups (e.g. two scenarios,
+or one scenario with two install methods), so that a single noisy run or a
+scenario that is slow everywhere never flags a node. Flagged nodes are
+candidates for draining.
+
+Usage:
+    python node_outliers.py ../results.txt
+    python node_outliers.py --days 30 --system aion --csv
+"""
+import argparse
+import csv
+import statistics
+import sys
+import time
+
+from detect_regressions import higher_is_better
+from generate_references import UNJUDGED_PVAR_REGEX
+from ingest import iter_samples
+from perf_store import connect, default_store_path, query
+
+PEER_FIELDS = ['system', 'partition', 'scenario', 'benchmark', 'metric', 'message_size']
+
+NODE_FIELDS = [
+    'system', 'node', 'samples', 'groups', 'slow_groups', 'median_slowdown',
+    'worst_slowdown', 'slow_runs', 'flagged',
+]
+
+
+def relative_slowdowns(samples, by_install_method=False, min_peers=3):
+    """
+    Yields (sample, peer group, slowdown) for the samples having at least
+    `min_peers` peers (themselves included).
+    """
+    fields = PEER_FIELDS + (['install_method'] if by_install_method else [])
+    groups = {}
+    for sample in samples:
+        if sample['value'] is None or not sample['nodes']:
+            continue
+
+        if UNJUDGED_PVAR_REGEX.search(sample['pvar'] or ''):
+            continue
+
+        groups.setdefault(tuple(sample[name] for name in fields), []).append(sample)
+
+    for key, peers in groups.items():
+        if len(peers) < min_peers:
+            continue
+
+        center = statistics.median(sample['value'] for sample in peers)
+        if not center:
+            continue
+
+        for sample in peers:
+            slowdown = (sample['value'] - center) / abs(center)
+            if higher_is_better(sample['metric']):
+                slowdown = -slowdown
+
+            yield sample, key, slowdown
+
+
+def node_profiles(samples, by_install_method=False, min_peers=3, min_slowdown=0.05,
+                  min_groups=2):
+    """Returns the profile of every node, most slowed down first."""
+    by_node = {}
+    for sample, key, slowdown in relative_slowdowns(samples, by_install_method, min_peers):
+        for node in sample['nodes'].split(','):
+            by_node.setdefault((sample['system'], node), []).append((sample, key, slowdown))
+
+    profiles = []
+    for (system, node), entries in by_node.items():
+        by_group = {}
+        for sample, key, slowdown in entries:
+            by_group.setdefault(key, []).append(slowdown)
+
+        slow_groups = sum(statistics.median(values) > min_slowdown
+                          for values in by_group.values())
+        median_slowdown = statistics.median(slowdown for _, _, slowdown in entries)
+        slow_runs = sorted({
+            f"{sample['install_method']}/{sample['scenario']}/{sample['metric']}"
+            for sample, _, slowdown in entries if slowdown > min_slowdown
+        })
+        profiles.append({
+            'system': system,
+            'node': node,
+            'samples': len(entries),
+            'groups': len(by_group),
+            'slow_groups': slow_groups,
+            'median_slowdown': median_slowdown,
+            'worst_slowdown': max(slowdown for _, _, slowdown in entries),
+            'slow_runs': ' '.join(slow_runs),
+            'flagged': median_slowdown > min_slowdown and slow_groups >= min_groups,
+        })
+
+    profiles.sort(key=lambda profile: (not profile['flagged'], -profile['median_slowdown']))
+    return profiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Flag nodes that are consistently slower than their peers')
+    parser.add_argument('paths', nargs='*',
+                        help='result files or directories (default: the performance store)')
+    parser.add_argument('--db', default=default_store_path())
+    parser.add_argument('--system')
+    parser.add_argument('--days', type=float, help='only the last N days (store only)')
+    parser.add_argument('--by-install-method', action='store_true',
+                        help='only compare runs of the same install method')
+    parser.add_argument('--min-peers', type=int, default=3,
+                        help='samples needed in a peer group (default: %(default)s)')
+    parser.add_argument('--min-slowdown', type=float, default=0.05,
+                        help='relative slowdown of a slow node (default: %(default)s)')
+    parser.add_argument('--min-groups', type=int, default=2,
+                        help='peer groups a node must be slow in (default: %(default)s)')
+    parser.add_argument('--all', action='store_true', help='also print the nodes not flagged')
+    parser.add_argument('--csv', action='store_true', help='print the profiles as CSV')
+    args = parser.parse_args(argv)
+
+    system = args.system.lower() if args.system else None
+    if args.paths:
+        samples = (sample for sample in iter_samples(args.paths)
+                   if system is None or sample['system'] == system)
+    else:
+        since = time.time() - args.days * 86400 if args.days else None
+        samples = query(connect(args.db), since, system=system)
+
+    profiles = node_profiles(samples, args.by_install_method, args.min_peers,
+                             args.min_slowdown, args.min_groups)
+    flagged = [profile for profile in profiles if profile['flagged']]
+    shown = profiles if args.all else flagged
+    if args.csv:
+        writer = csv.DictWriter(sys.stdout, fieldnames=NODE_FIELDS)
+        writer.writeheader()
+        writer.writerows(shown)
+    else:
+        for profile in shown:
+            print(f"{'SLOW' if profile['flagged'] else 'ok':<5}{profile['system']} "
+                  f"{profile['node']}: median {profile['median_slowdown']:+.1%}, "
+                  f"worst {profile['worst_slowdown']:+.1%} over {profile['samples']} runs, "
+                  f"slow in {profile['slow_groups']}/{profile['groups']} peer groups"
+                  f"{': ' + profile['slow_runs'] if profile['slow_runs'] else ''}")
+
+    # Non-zero exit status so a script can drain the flagged nodes
+    return 1 if flagged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
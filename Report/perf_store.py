@@ -0,0 +1,254 @@
+"""
+Embedded SQLite store of every performance sample ingested from ReFrame
+reports, perflogs and results tables (see ingest.py).
+
+Samples are indexed by system, partition, scenario, install method, metric,
+message size and time, and every node of a sample is listed in the
+`sample_nodes` table, so slicing queries over millions of samples only read
+the matching rows. Each ingested file is recorded with its size and mtime:
+unchanged files are skipped and files that grew (perflogs are appended to)
+are re-ingested, replacing their previous samples.
+
+Usage:
+    python perf_store.py ingest ~/.reframe/perflogs reports/*.json
+    python perf_store.py query --system aion --scenario DifferentNodes \\
+        --install-method EESSI --metric bandwidth --days 90
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+
+from ingest import SAMPLE_FIELDS, READERS, detect_format, iter_files
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    timestamp REAL,
+    system TEXT,
+    partition TEXT,
+    environ TEXT,
+    test TEXT,
+    install_method TEXT,
+    scenario TEXT,
+    benchmark TEXT,
+    pvar TEXT,
+    metric TEXT,
+    message_size INTEGER,
+    value REAL,
+    unit TEXT,
+    reference REAL,
+    lower REAL,
+    upper REAL,
+    result TEXT,
+    jobid TEXT,
+    nodes TEXT
+);
+CREATE TABLE IF NOT EXISTS sample_nodes (
+    sample_id INTEGER NOT NULL REFERENCES samples(id),
+    node TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_series
+    ON samples(system, scenario, install_method, metric, message_size, timestamp);
+CREATE INDEX IF NOT EXISTS idx_samples_partition
+    ON samples(system, partition, timestamp);
+CREATE INDEX IF NOT EXISTS idx_samples_timestamp ON samples(timestamp);
+CREATE INDEX IF NOT EXISTS idx_samples_source ON samples(source_id);
+CREATE INDEX IF NOT EXISTS idx_sample_nodes_node ON sample_nodes(node, sample_id);
+CREATE INDEX IF NOT EXISTS idx_sample_nodes_sample ON sample_nodes(sample_id);
+"""
+
+# Filters of query(), all matched for equality
+QUERY_FILTERS = ['system', 'partition', 'scenario', 'install_method',
+                 'metric', 'message_size', 'benchmark', 'environ', 'pvar']
+
+INSERT_BATCH_SIZE = 10000
+
+
+def default_store_path():
+    return os.environ.get(
+        'OSU_PERF_STORE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'osu-regression',
+                     'perf.sqlite')
+    )
+
+
+def connect(path=None):
+    """Opens (and creates if needed) a performance store."""
+    path = path or default_store_path()
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _delete_source(conn, source_id):
+    conn.execute('DELETE FROM sample_nodes WHERE sample_id IN '
+                 '(SELECT id FROM samples WHERE source_id = ?)', (source_id,))
+    conn.execute('DELETE FROM samples WHERE source_id = ?', (source_id,))
+    conn.execute('DELETE FROM sources WHERE id = ?', (source_id,))
+
+
+def _insert_samples(conn, source_id, samples):
+    """
+    Inserts samples in batches; returns the number of samples. Must run in
+    the transaction that registered the source, which holds the write lock.
+    """
+    columns = ', '.join(SAMPLE_FIELDS)
+    placeholders = ', '.join('?' for _ in SAMPLE_FIELDS)
+    insert = f'INSERT INTO samples (id, source_id, {columns}) VALUES (?, ?, {placeholders})'
+    last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM samples').fetchone()[0]
+    count = 0
+    sample_rows, node_rows = [], []
+
+    def flush():
+        conn.executemany(insert, sample_rows)
+        conn.executemany('INSERT INTO sample_nodes (sample_id, node) VALUES (?, ?)',
+                         node_rows)
+        sample_rows.clear()
+        node_rows.clear()
+
+    for sample in samples:
+        count += 1
+        sample_id = last_id + count
+        sample_rows.append([sample_id, source_id] + [sample[f] for f in SAMPLE_FIELDS])
+        node_rows.extend((sample_id, node)
+                         for node in (sample['nodes'] or '').split(',') if node)
+        if len(sample_rows) >= INSERT_BATCH_SIZE:
+            flush()
+
+    flush()
+    return count
+
+
+def ingest(conn, paths, force=False):
+    """
+    Ingests result files or directories into the store; returns the number
+    of new samples. Files already ingested with the same size and mtime are
+    skipped unless `force` is set.
+    """
+    total = 0
+    for path in iter_files(paths):
+        reader = READERS.get(detect_format(path))
+        if reader is None:
+            continue
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = conn.execute('SELECT id, size, mtime FROM sources WHERE path = ?',
+                           (path,)).fetchone()
+        if (row is not None and not force and
+            row['size'] == stat.st_size and row['mtime'] == stat.st_mtime):
+            continue
+
+        with conn:
+            if row is not None:
+                _delete_source(conn, row['id'])
+
+            source_id = conn.execute(
+                'INSERT INTO sources (path, size, mtime, ingested_at) VALUES (?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime, time.time())
+            ).lastrowid
+            total += _insert_samples(conn, source_id, reader(path))
+
+    conn.execute('ANALYZE')
+    return total
+
+
+def query(conn, since=None, until=None, node=None, **filters):
+    """
+    Yields the samples matching the given filters (see QUERY_FILTERS) as
+    dicts, oldest first. `since`/`until` are Unix timestamps and `node`
+    selects the samples that ran on that node.
+    """
+    unknown = set(filters) - set(QUERY_FILTERS)
+    if unknown:
+        raise ValueError(f'unknown query filters: {", ".join(sorted(unknown))}')
+
+    clauses, params = [], []
+    for name in QUERY_FILTERS:
+        value = filters.get(name)
+        if value is not None:
+            # Install methods match in any case (`eessi`, `source+o3-native`)
+            collate = ' COLLATE NOCASE' if name == 'install_method' else ''
+            clauses.append(f's.{name} = ?{collate}')
+            params.append(value)
+
+    if since is not None:
+        clauses.append('s.timestamp >= ?')
+        params.append(since)
+
+    if until is not None:
+        clauses.append('s.timestamp < ?')
+        params.append(until)
+
+    if node is not None:
+        clauses.append('s.id IN (SELECT sample_id FROM sample_nodes WHERE node = ?)')
+        params.append(node)
+
+    sql = f'SELECT {", ".join("s." + f for f in SAMPLE_FIELDS)} FROM samples s'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+
+    sql += ' ORDER BY s.timestamp'
+    for row in conn.execute(sql, params):
+        yield dict(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Historical OSU performance store')
+    parser.add_argument('--db', default=default_store_path(),
+                        help='SQLite file (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command')
+
+    ingest_parser = subparsers.add_parser('ingest', help='ingest result files or directories')
+    ingest_parser.add_argument('paths', nargs='+')
+    ingest_parser.add_argument('--force', action='store_true',
+                               help='re-ingest files that did not change')
+
+    query_parser = subparsers.add_parser('query', help='print matching samples as CSV')
+    for name in QUERY_FILTERS:
+        query_parser.add_argument('--' + name.replace('_', '-'),
+                                  type=int if name == 'message_size' else str)
+    query_parser.add_argument('--node', help='samples that ran on this node')
+    query_parser.add_argument('--days', type=float, help='only the last N days')
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.command == 'ingest':
+        print(f'{ingest(conn, args.paths, args.force)} samples ingested into {args.db}',
+              file=sys.stderr)
+    elif args.command == 'query':
+        filters = {name: getattr(args, name) for name in QUERY_FILTERS}
+        if filters['system']:
+            filters['system'] = filters['system'].lower()
+
+        since = time.time() - args.days * 86400 if args.days else None
+        writer = csv.DictWriter(sys.stdout, fieldnames=SAMPLE_FIELDS)
+        writer.writeheader()
+        for sample in query(conn, since=since, node=args.node, **filters):
+            writer.writerow(sample)
+    else:
+        parser.print_help()
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
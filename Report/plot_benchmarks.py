@@ -1,59 +1,27 @@
-import re
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def parse_benchmark_data(filepath="result.txt"):
-    
-    with open(filepath, 'r') as f:
-        content = f.read()
-
-    all_records = []
-    current_system = None
-    current_install_method = None
-
-    title_regex = re.compile(r"^(AION|IRIS) \((EESSI|EASYBUILD|SOURCE)\)")
-    scenario_regex = re.compile(r"(?:EESSIOsu|EasyBuildOsu|Osu)?(DifferentNodes|DifferentSockets|SameSocketDifferentNuma|SameNumaNode)")
-
-    lines = content.splitlines()
-    table_header = ['name_full', 'sysenv', 'job_nodelist', 'pvar', 'punit', 'pval', 'result']
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        title_match = title_regex.match(line)
-        if title_match:
-            current_system = title_match.group(1)
-            current_install_method = title_match.group(2)
-            continue
-
-        if line.startswith('│') and 'name' not in line and '━━━━━━━━' not in line and '────────' not in line:
-            if not current_system or not current_install_method:
-                continue
-
-            parts = [p.strip() for p in line.split('│')[1:-1]]
-            if len(parts) == len(table_header):
-                record = dict(zip(table_header, parts))
-                record['system'] = current_system
-                record['install_method'] = current_install_method
-
-                scenario_match = scenario_regex.search(record['name_full'])
-                if scenario_match:
-                    record['scenario'] = scenario_match.group(1)
-                else:
-                    record['scenario'] = "Unknown"
-
-                try:
-                    record['pval'] = float(record['pval'])
-                except ValueError:
-                    record['pval'] = None
-
-                all_records.append(record)
-
-    df = pd.DataFrame(all_records)
-    df.dropna(subset=['pval'], inplace=True)
+from ingest import iter_samples
+
+def parse_benchmark_data(paths="result.txt"):
+    """
+    Loads the latency/bandwidth samples of ReFrame reports, perflogs or
+    results.txt tables (see ingest.py) into a DataFrame.
+    """
+    columns = ['system', 'install_method', 'scenario', 'pvar', 'metric', 'value']
+    records = (
+        {key: sample[key] for key in columns}
+        for sample in iter_samples(paths)
+        if sample['value'] is not None
+    )
+    df = pd.DataFrame.from_records(records, columns=columns)
+
+    # Sweep rows (`latency_8192`...) are not comparable with the judged sizes
+    df = df[~df['pvar'].str.contains(r'_\d+$')]
+    df = df.drop(columns='pvar').rename(columns={'metric': 'pvar', 'value': 'pval'})
+    df['system'] = df['system'].str.upper()
     return df
 
 def plot_metrics(df):
@@ -185,7 +153,7 @@ def plot_metrics(df):
 
 
 if __name__ == "__main__":
-    data_df = parse_benchmark_data()
+    data_df = parse_benchmark_data(sys.argv[1:] or "result.txt")
     if not data_df.empty:
         plot_metrics(data_df)
     else:
@@ -14,7 +14,8 @@ site_configuration = {
           'descr': 'Iris Skylake compute nodes via batch partition',
           'scheduler': 'slurm',
           'launcher': 'srun',
-          'access': ['--partition=batch', '--qos=normal', '-C skylake', '--time=0-00:10:00'],
+          'access': ['--partition=batch', '--qos=normal', '-C skylake'],
+          'time_limit': '10m',
           'environs': ['foss-2023b'],
           'max_jobs': 8, # 8? probably should be a diff number
           'sched_options': {
@@ -34,7 +35,8 @@ site_configuration = {
           'descr': 'Aion compute nodes',
           'scheduler': 'slurm',
           'launcher': 'srun',
-          'access': ['--partition=batch', '--qos=normal', '--time=0-00:10:00'],
+          'access': ['--partition=batch', '--qos=normal'],
+          'time_limit': '10m',
           'environs': ['foss-2023b'],
           'max_jobs': 8,
           'sched_options': {
@@ -61,4 +63,44 @@ site_configuration = {
     },
     # We can add other environments later (e.g., EESSI)
   ],
+
+  'general': [
+    {
+      # Detect the processor topology of each partition once (cached under
+      # ~/.reframe/topology); the topology-aware tests use it to pick core
+      # pairs from the topology cache when the tests are generated
+      'remote_detect': True
+    }
+  ],
+
+  'logging': [
+    {
+      # One perflog per test under <perflogdir>/<system>/<partition>, with
+      # the metadata Report/ingest.py needs to group the samples
+      'handlers_perflog': [
+        {
+          'type': 'filelog',
+          'prefix': '%(check_system)s/%(check_partition)s',
+          'level': 'info',
+          'format': (
+            '%(check_job_completion_time)s|%(check_display_name)s|'
+            '%(check_system)s|%(check_partition)s|%(check_environ)s|'
+            '%(check_jobid)s|%(check_job_nodelist)s|'
+            '%(check_install_method)s|%(check_build_variant)s|%(check_scenario)s|'
+            '%(check_benchmark_info)s|%(check_message_size)s|'
+            '%(check_bound_cpus)s|%(check_bound_placement)s|'
+            '%(check_transport)s|%(check_transport_selected)s|'
+            '%(check_result)s|%(check_perfvalues)s'
+          ),
+          'format_perfvars': (
+            '%(check_perf_var)s|%(check_perf_value)s|%(check_perf_ref)s|'
+            '%(check_perf_lower_thres)s|%(check_perf_upper_thres)s|'
+            '%(check_perf_unit)s|'
+          ),
+          'datefmt': '%FT%T%:z',
+          'append': True
+        }
+      ]
+    }
+  ],
 }
\ No newline at end of file
@@ -2,12 +2,23 @@
 import reframe as rfm
 import reframe.utility.sanity as sn
 import os
+import sys
 
 # ============================================================================
 #  Part 1: Compilation Test for OSU Micro-Benchmarks from Source
 # ============================================================================
 
 _THIS_FILE_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, _THIS_FILE_DIR)
+
+from osu_utils.easybuild import eb_module, easyconfig_digest, installed_module, stamp_path
+from osu_utils.checks import (
+    OsuBinaries, OsuCollectiveScalingBase, OsuCoreLatencyMatrixBase, OsuDifferentNodesBase,
+    OsuDifferentSocketsBase, OsuFabricPairSweepBase, OsuMultiPairScalingBase,
+    OsuMultiThreadLatencyBase, OsuNonBlockingOverlapBase, OsuPackedIntranodeBase,
+    OsuPartitionHealthSweepBase, OsuSameNumaNodeBase, OsuSameSocketDifferentNumaBase,
+    OsuTopologyPlacementBase
+)
 
 class OsuBuildEasyBuild(rfm.CompileOnlyRegressionTest):
     '''Fixture for building the OSU benchmarks'''
@@ -19,6 +30,14 @@ class OsuBuildEasyBuild(rfm.CompileOnlyRegressionTest):
 
     # --- Build configuration ---
     build_system = 'EasyBuild'
+    easyconfig = variable(str, value='OSU-Micro-Benchmarks-7.2-foss-2023b.eb')
+
+    # Persistent EasyBuild prefix; a matching installation found there is
+    # reused instead of rebuilding ('' forces a rebuild in the stage dir)
+    install_prefix = variable(str, value=os.environ.get(
+        'OSU_EASYBUILD_PREFIX',
+        os.path.join(os.path.expanduser('~'), '.cache', 'osu-regression', 'easybuild')
+    ))
 
     def __init__(self):
         super().__init__()
@@ -26,233 +45,149 @@ class OsuBuildEasyBuild(rfm.CompileOnlyRegressionTest):
 
     @run_before('compile')
     def setup_build_system(self):
+        easyconfig_path = os.path.join(self.test_definition_dir, self.easyconfig)
+        toolchain_modules = self.current_environ.modules + self.modules
+        self.reused_module = None
+        self.stamp = None
+        if self.install_prefix:
+            # Named by the site's module naming scheme, as eb reports it
+            module_name = eb_module(easyconfig_path)
+            self.reused_module = installed_module(self.install_prefix, easyconfig_path,
+                                                  toolchain_modules, module_name)
+
+        if self.reused_module:
+            # Module already installed from this easyconfig: skip EasyBuild
+            self.build_system = 'CustomBuild'
+            self.build_system.commands = [
+                f'echo "Reusing installed module {self.reused_module} from {self.install_prefix}"'
+            ]
+            return
+
         self.prebuild_cmds += [
-          f'cp {self.test_definition_dir}/OSU-Micro-Benchmarks-7.2-foss-2023b.eb {self.stagedir}/',
+          f'cp {easyconfig_path} {self.stagedir}/',
         ]
-        self.build_system.easyconfigs = ['OSU-Micro-Benchmarks-7.2-foss-2023b.eb']
-        self.build_system.options = ['-f --detect-loaded-modules=purge']
+        self.build_system.easyconfigs = [self.easyconfig]
+        if not self.install_prefix:
+            self.build_system.options = ['-f --detect-loaded-modules=purge']
+            return
+
+        # Install into the persistent prefix, stamped once the build succeeded
+        self.build_system.prefix = self.install_prefix
+        self.build_system.options = ['--rebuild --detect-loaded-modules=purge']
+        self.stamp = (stamp_path(self.install_prefix, module_name),
+                      easyconfig_digest(easyconfig_path, toolchain_modules))
 
     @sanity_function
     def validate_easybuild_build(self):
+        if self.reused_module:
+            return sn.assert_found(r'Reusing installed module', self.stdout)
+
         # Basic check that EasyBuild finished
         return sn.assert_found(r'Build succeeded for 1 out of 1', self.stdout)
+
+    @run_after('sanity')
+    def stamp_installation(self):
+        # Only a successful build makes the installation reusable
+        if self.stamp is None or self.is_dry_run():
+            return
+
+        path, digest = self.stamp
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as fp:
+            fp.write(digest + '\n')
     
     @property
     def generated_modules(self):
+        if self.reused_module:
+            return [{
+                'name': self.reused_module,
+                'collection': False,
+                'path': os.path.join(self.install_prefix, 'modules', 'all')
+            }]
+
         return self.build_system.generated_modules
 
-class OsuBwLatencyBenchmarkBase(rfm.RunOnlyRegressionTest):
-    '''Base class for OSU Point-to-Point benchmark tests (osu_latency, osu_bw).'''
+# ============================================================================
+#  Part 2: Point-to-Point Benchmark Tests
+# ============================================================================
 
-    # message_size will be set based on the specific benchmark (latency/bw)
-    message_size = variable(int, loggable=True)
+class EasyBuildBinaries(OsuBinaries):
+    '''OSU executables of the EasyBuild module, in PATH once it is loaded.'''
 
-    valid_systems = ['*']
-    valid_prog_environs = ['*']
-    num_tasks = 2
-    num_tasks_per_node = 2
-    num_cpus_per_task = 1
-    exclusive_access = True
-
-    # --- Parameter to select the specific pt2pt benchmark ---
-    # benchmark_info: tuple(executable_name_suffix, metric_name)
-    benchmark_info = parameter([
-        ('osu_bw', 'bandwidth'),
-        ('osu_latency', 'latency')
-    ], fmt=lambda x: x[0], loggable=True) # Log only the executable name suffix
+    install_method = 'EASYBUILD'
 
     # --- Fixture Dependency ---
     osu_bins = fixture(OsuBuildEasyBuild, scope='environment')
 
-    @run_before('run')
-    def set_executable_path(self):
-        '''Sets the full path to the executable using the build fixture.'''
-        exec_name = self.benchmark_info[0]
+    @run_after('setup')
+    def load_easybuild_module(self):
         self.modules = self.osu_bins.generated_modules
-        self.executable = exec_name
-
-    @run_before('setup')
-    def setup_executable_options_and_perf(self):
-        '''Sets executable options and performance variables based on benchmark type.'''
-        exec_name, bench_metric = self.benchmark_info
-
-        if bench_metric == 'latency':
-            self.message_size = 8192
-            unit = 'us'
-        elif bench_metric == 'bandwidth':
-            self.message_size = 1048576
-            unit = 'MB/s'
-        else:
-            raise ValueError(f'Unknown benchmark metric: {bench_metric}')
-
-        self.executable_opts = ['-m', f'{self.message_size}:{self.message_size}', '-x', '100', '-i', '1000']
-        self.reference_unit = unit
-
-        metric_regex = rf'^{self.message_size}\s+(?P<metric_val>\S+)'
-        self.perf_variables = {
-            # The key is the metric name ('latency' or 'bandwidth')
-            bench_metric: sn.make_performance_function(
-                # The first argument is the extraction logic
-                sn.extractsingle(metric_regex, self.stdout, 'metric_val', float),
-                unit=self.reference_unit
-            )
-        }
 
-    @sanity_function
-    def validate_test(self):
-        '''Basic sanity check: Look for the output line of the tested message size.'''
-        return sn.assert_found(rf'^{self.message_size}\s+\S+', self.stdout)
-
-    # Default reference dictionary - subclasses should override or extend this
-    @run_before('performance')
-    def set_default_reference(self):
-        if not self.reference: # Only set if not already set by subclass
-            metric = self.benchmark_info[1]
-            self.reference = {
-                '*': {
-                    metric: (0, None, None, self.reference_unit)
-                }
-            }
-
-@rfm.simple_test
-class EasyBuildOsuSameNumaNode(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Point-to-Point Benchmark Run'
-
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
-
-      # These SLURM options are passed to srun
-      self.job.launcher.options += [
-          '--cpu-bind=verbose,cores',
-          '--mem-bind=local',
-          '--distribution=block:block'
-      ]
-
-      self.env_vars['OMPI_MCA_hwloc_base_report_bindings'] = '1'
-
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (1.0, None, 0.2, 'us')},
-          'iris:batch': {'latency': (2.0, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-          'iris:batch': {'bandwidth': (15000.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
 
 # ============================================================================
-# Test Case: Same Physical Socket, Different NUMA Nodes (Targeted for Aion)
+# Tests shared with the source and EESSI files (osu_utils/checks.py)
 # ============================================================================
+
 @rfm.simple_test
-class EasyBuildOsuSameSocketDifferentNuma(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Pt2Pt: Same Socket, Different NUMA Nodes (Aion Specific)'
-
-    # --- Target only Aion for this specific test ---
-    valid_systems = ['aion:batch']
-
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
-        self.job.launcher.options += [
-            '--cpu-bind=verbose,map_cpu:0,16',
-            '--mem-bind=local',
-        ]
+class EasyBuildOsuSameNumaNode(EasyBuildBinaries, OsuSameNumaNodeBase):
+    pass
 
-        self.env_vars['OMPI_MCA_hwloc_base_report_bindings'] = '1'
-
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (2.3, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
 
-# ============================================================================
-# Test Case: Same Compute Node, Different Physical Sockets
-# ============================================================================
+@rfm.simple_test
+class EasyBuildOsuSameSocketDifferentNuma(EasyBuildBinaries, OsuSameSocketDifferentNumaBase):
+    pass
+
 
 @rfm.simple_test
-class EasyBuildOsuDifferentSockets(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Pt2Pt: Same Node, Different Sockets'
-
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
-         # These SLURM options are passed to srun
-        self.job.launcher.options += [
-            '--ntasks-per-socket=1',
-            '--cpu-bind=verbose,cores',
-            '--mem-bind=local',
-            '--distribution=cyclic:cyclic'
-        ]
-        self.env_vars['OMPI_MCA_hwloc_base_report_bindings'] = '1'
-
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (2.3, None, 0.2, 'us')},
-          'iris:batch': {'latency': (4.2, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-          'iris:batch': {'bandwidth': (15000.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
+class EasyBuildOsuDifferentSockets(EasyBuildBinaries, OsuDifferentSocketsBase):
+    pass
 
-# ============================================================================
-# Test Case: 2 processes are running on different nodes.
-# ============================================================================
 
 @rfm.simple_test
-class EasyBuildOsuDifferentNodes(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Pt2Pt: Same Node, Different Sockets'
+class EasyBuildOsuDifferentNodes(EasyBuildBinaries, OsuDifferentNodesBase):
+    pass
 
-    num_tasks_per_node = 1
 
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
+@rfm.simple_test
+class EasyBuildOsuTopologyPlacement(EasyBuildBinaries, OsuTopologyPlacementBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuPackedIntranode(EasyBuildBinaries, OsuPackedIntranodeBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuCoreLatencyMatrix(EasyBuildBinaries, OsuCoreLatencyMatrixBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuFabricPairSweep(EasyBuildBinaries, OsuFabricPairSweepBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuPartitionHealthSweep(EasyBuildBinaries, OsuPartitionHealthSweepBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuMultiPairScaling(EasyBuildBinaries, OsuMultiPairScalingBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuCollectiveScaling(EasyBuildBinaries, OsuCollectiveScalingBase):
+    pass
+
+
+@rfm.simple_test
+class EasyBuildOsuMultiThreadLatency(EasyBuildBinaries, OsuMultiThreadLatencyBase):
+    pass
 
-        self.job.launcher.options += [
-            '--nodes=2'
-        ]
 
-        self.env_vars['OMPI_MCA_hwloc_base_report_bindings'] = '1'
-
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (4.0, None, 0.2, 'us')},
-          'iris:batch': {'latency': (4.5, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-          'iris:batch': {'bandwidth': (8000.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
\ No newline at end of file
+@rfm.simple_test
+class EasyBuildOsuNonBlockingOverlap(EasyBuildBinaries, OsuNonBlockingOverlapBase):
+    pass
@@ -1,7 +1,25 @@
-
 import reframe as rfm
 import reframe.utility.sanity as sn
+import reframe.utility.typecheck as typ
+import json
 import os
+import sys
+
+_THIS_FILE_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, _THIS_FILE_DIR)
+
+from osu_utils import build_cache
+from osu_utils.benchmarks import BENCHMARK_DIRS, SUITE_BENCHMARKS, benchmark_dirs
+from osu_utils.build_variants import (BUILD_VARIANTS, selected_variants, toolchain_commands,
+                                     toolchain_error, toolchain_report_command,
+                                     variant_install_method, variant_modules)
+from osu_utils.checks import (
+    OsuBinaries, OsuCollectiveScalingBase, OsuCoreLatencyMatrixBase, OsuDifferentNodesBase,
+    OsuDifferentSocketsBase, OsuFabricPairSweepBase, OsuMultiPairScalingBase,
+    OsuMultiThreadLatencyBase, OsuNonBlockingOverlapBase, OsuPackedIntranodeBase,
+    OsuPartitionHealthSweepBase, OsuSameNumaNodeBase, OsuSameSocketDifferentNumaBase,
+    OsuTopologyPlacementBase
+)
 
 # ============================================================================
 #  Part 1: Compilation Test for OSU Micro-Benchmarks from Source
@@ -17,229 +35,240 @@ class OsuBuildSource(rfm.CompileOnlyRegressionTest):
     build_prefix = variable(str)
     version = variable(str, value='7.2')
 
+    # Only the directories building these executables are compiled. The
+    # default covers every test, which all share one build per environment
+    benchmarks = variable(typ.List[str], value=SUITE_BENCHMARKS)
+
+    # Persistent binary cache and tarball mirror ('' disables the cache)
+    build_cache_dir = variable(str, value=build_cache.default_cache_dir())
+
+    # Toolchain/flags variants to build (osu_utils/build_variants.py): the
+    # baseline plus the ones named in $OSU_BUILD_VARIANTS
+    build_variant = parameter(selected_variants(), loggable=True)
+
+    @run_after('init')
+    def set_native_build(self):
+        # -march=native must see the CPU of the nodes running the benchmarks
+        if BUILD_VARIANTS[self.build_variant].get('native'):
+            self.build_locally = False
+
+    @run_before('compile')
+    def apply_build_variant(self):
+        variant = BUILD_VARIANTS[self.build_variant]
+        # The variant's toolchain replaces the environment's, never on top of it
+        self.prebuild_cmds += self.toolchain_commands()
+        self.build_system.cflags += variant.get('cflags', [])
+        self.build_system.config_opts += variant.get('config_opts', [])
+
     @run_before('compile')
     def prepare_build(self):
-      osu_file_name = f'osu-micro-benchmarks-{self.version}.tar.gz'
-      self.build_prefix = osu_file_name[:-7]
-      self.prebuild_cmds += [
-        f'curl -LJO http://mvapich.cse.ohio-state.edu/download/mvapich/{osu_file_name}',
-        f'tar xzf {osu_file_name}',
-        f'cd {self.build_prefix}'
-      ]
-      self.build_system.max_concurrency = 8
-
-class OsuBwLatencyBenchmarkBase(rfm.RunOnlyRegressionTest):
-    '''Base class for OSU Point-to-Point benchmark tests (osu_latency, osu_bw).'''
-
-    # message_size will be set based on the specific benchmark (latency/bw)
-    message_size = variable(int, loggable=True)
-
-    valid_systems = ['*']
-    valid_prog_environs = ['*']
-    num_tasks = 2
-    num_tasks_per_node = 2
-    num_cpus_per_task = 1
-    exclusive_access = True
-
-    # --- Parameter to select the specific pt2pt benchmark ---
-    benchmark_info = parameter([
-        ('osu_bw', 'bandwidth'),
-        ('osu_latency', 'latency')
-    ], fmt=lambda x: x[0], loggable=True) # Log only the executable name suffix
+        osu_file_name = f'osu-micro-benchmarks-{self.version}.tar.gz'
+        self.build_prefix = osu_file_name[:-7]
+
+        # Everything that changes the binaries goes into the cache key
+        self.build_manifest = {
+            'version': self.version,
+            'modules': variant_modules(self.build_variant,
+                                       self.current_environ.modules) + self.modules,
+            'compiler': self.current_environ.cc,
+            'cflags': self.current_environ.cflags + self.build_system.cflags,
+            'config_opts': self.build_system.config_opts,
+            'benchmarks': sorted(set(self.benchmarks)),
+        }
+        if BUILD_VARIANTS[self.build_variant].get('native'):
+            self.build_manifest['arch'] = self.current_partition.processor.arch
+        self.cache_key = build_cache.build_key(self.build_manifest)
+        self.cached_prefix = None
+        if self.build_cache_dir:
+            self.cached_prefix = build_cache.lookup(self.cache_key, self.build_cache_dir)
+
+        if self.cached_prefix:
+            # Cache hit: nothing to build, the cached binaries are used in place
+            self.build_system = 'CustomBuild'
+            self.build_system.commands = [f'echo "Using cached OSU build {self.cached_prefix}"']
+            return
+
+        osu_url = f'http://mvapich.cse.ohio-state.edu/download/mvapich/{osu_file_name}'
+        if self.build_cache_dir:
+            self.prebuild_cmds += build_cache.fetch_commands(osu_url, osu_file_name,
+                                                             self.build_cache_dir)
+        else:
+            self.prebuild_cmds += [f'curl -LJO {osu_url}']
+
+        self.prebuild_cmds += [
+            f'tar xzf {osu_file_name}',
+            f'cd {self.build_prefix}'
+        ]
+
+        # Build only the needed executables, one `make -C <dir>` per directory
+        concurrency = self._build_concurrency()
+        make_targets = [['-C', build_dir] + names
+                        for build_dir, names in benchmark_dirs(self.benchmarks).items()]
+        self.build_system.max_concurrency = concurrency
+        self.build_system.make_opts = make_targets[0]
+        self.postbuild_cmds += [' '.join(['make', '-j', str(concurrency)] + opts)
+                                for opts in make_targets[1:]]
+        self.postbuild_cmds += [toolchain_report_command(
+            self.build_variant, os.path.join(BENCHMARK_DIRS[self.benchmarks[0]],
+                                             self.benchmarks[0]))]
+
+        if self.build_cache_dir:
+            manifest_file = os.path.join(self.stagedir, 'osu_build_manifest.json')
+            with open(manifest_file, 'w') as fp:
+                json.dump(self.build_manifest, fp, indent=2)
+
+            # A failure to publish must not fail an otherwise good build
+            self.postbuild_cmds += [
+                f'PYTHONPATH={_THIS_FILE_DIR} python3 -m osu_utils.build_cache '
+                f'--cache-dir {self.build_cache_dir} publish {self.cache_key} . {manifest_file} '
+                f'|| echo "WARNING: could not publish the OSU build to {self.build_cache_dir}"'
+            ]
+
+    @run_before('sanity')
+    def read_toolchain(self):
+        '''Check the toolchain report of a variant that swaps the toolchain.'''
+        self.toolchain_error = None
+        if (self.cached_prefix or self.is_dry_run() or
+                not BUILD_VARIANTS[self.build_variant].get('modules')):
+            return
+
+        with open(os.path.join(self.stagedir, sn.evaluate(self.stdout))) as fp:
+            self.toolchain_error = toolchain_error(fp.read(), self.build_variant,
+                                                   self.current_environ.modules)
+
+    @sanity_function
+    def validate_toolchain(self):
+        '''The variant's mpicc and MPI library built the benchmarks.'''
+        return sn.assert_true(self.toolchain_error is None, msg=self.toolchain_error)
+
+    def toolchain_commands(self):
+        '''Module commands swapping the environment's toolchain for the variant's.'''
+        return toolchain_commands(self.build_variant, self.current_environ.modules)
+
+    def _build_concurrency(self):
+        '''Number of cores available to the build.'''
+        if self.build_locally:
+            # Honours the cores allocated by Slurm when running in a job
+            return len(os.sched_getaffinity(0))
+
+        # Built in a job: allocate as many cores as make jobs
+        self.num_cpus_per_task = self.current_partition.processor.num_cpus or 8
+        return self.num_cpus_per_task
+
+    def mpi_library(self):
+        '''MPI library of the variant's toolchain.'''
+        return BUILD_VARIANTS[self.build_variant].get('mpi', 'openmpi')
+
+    def benchmark_path(self, exec_name):
+        '''Full path to a built benchmark executable.'''
+        root = self.cached_prefix or os.path.join(self.stagedir, self.build_prefix)
+        return os.path.join(root, BENCHMARK_DIRS[exec_name], exec_name)
+
+# ============================================================================
+#  Part 2: Point-to-Point Benchmark Tests
+# ============================================================================
+
+class SourceBinaries(OsuBinaries):
+    '''OSU executables of the source build, one test per build variant.'''
+
+    install_method = 'SOURCE'
+
+    # Build variant of the binaries (see OsuBuildSource.build_variant); every
+    # variant other than the baseline is its own install method in the
+    # references and the history (`SOURCE+<variant>`)
+    build_variant = variable(str, value='default', loggable=True)
 
     # --- Fixture Dependency ---
     osu_binaries = fixture(OsuBuildSource, scope='environment')
 
-    @run_before('run')
-    def set_executable_path(self):
-        '''Sets the full path to the executable using the build fixture.'''
-        exec_name = self.benchmark_info[0]
-        self.executable = os.path.join(self.osu_binaries.stagedir,
-                                       self.osu_binaries.build_prefix, 'c',
-                                       'mpi', 'pt2pt', 'standard', exec_name)
-
-        # export relevant OMPI MCA vars
-        self.env_vars = {
-            'OMPI_MCA_hwloc_base_report_bindings': '1'
-        }
+    @run_after('setup')
+    def set_build_variant(self):
+        '''Record the build variant and swap in its toolchain.'''
+        self.build_variant = self.osu_binaries.build_variant
+        self.prerun_cmds = self.osu_binaries.toolchain_commands() + self.prerun_cmds
 
-    @run_before('setup')
-    def setup_executable_options_and_perf(self):
-        '''Sets executable options and performance variables based on benchmark type.'''
-        exec_name, bench_metric = self.benchmark_info
-
-        if bench_metric == 'latency':
-            self.message_size = 8192
-            unit = 'us'
-        elif bench_metric == 'bandwidth':
-            self.message_size = 1048576
-            unit = 'MB/s'
-        else:
-            raise ValueError(f'Unknown benchmark metric: {bench_metric}')
-
-        self.executable_opts = ['-m', f'{self.message_size}:{self.message_size}', '-x', '100', '-i', '1000']
-        self.reference_unit = unit
-
-        metric_regex = rf'^{self.message_size}\s+(?P<metric_val>\S+)'
-        self.perf_variables = {
-            # The key is the metric name ('latency' or 'bandwidth')
-            bench_metric: sn.make_performance_function(
-                # The first argument is the extraction logic
-                sn.extractsingle(metric_regex, self.stdout, 'metric_val', float),
-                unit=self.reference_unit
-            )
-        }
+    def osu_command(self, exec_name):
+        return self.osu_binaries.benchmark_path(exec_name)
 
-    @sanity_function
-    def validate_test(self):
-        '''Basic sanity check: Look for the output line of the tested message size.'''
-        return sn.assert_found(rf'^{self.message_size}\s+\S+', self.stdout)
-
-    # Default reference dictionary - subclasses should override or extend this
-    @run_before('performance')
-    def set_default_reference(self):
-        if not self.reference: # Only set if not already set by subclass
-            metric = self.benchmark_info[1]
-            self.reference = {
-                '*': {
-                    metric: (0, None, None, self.reference_unit)
-                }
-            }
+    def mpi_library(self):
+        return self.osu_binaries.mpi_library()
 
-@rfm.simple_test
-class OsuSameNumaNode(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Point-to-Point Benchmark Run'
-
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
-
-      # These SLURM options are passed to srun
-      self.job.launcher.options += [
-          '--cpu-bind=verbose,cores',
-          '--mem-bind=local',
-          '--distribution=block:block'
-      ]
-
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (1.0, None, 0.2, 'us')},
-          'iris:batch': {'latency': (2.5, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-          'iris:batch': {'bandwidth': (4700, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
+    def references_install_method(self):
+        return variant_install_method(self.install_method, self.osu_binaries.build_variant)
 
 
+class BaselineSourceBinaries(SourceBinaries):
+    '''OSU executables of the baseline source build only.'''
+
+    # --- Fixture Dependency ---
+    osu_binaries = fixture(OsuBuildSource, scope='environment',
+                           variants={'build_variant': 'default'})
+
 
 # ============================================================================
-# Test Case: Same Physical Socket, Different NUMA Nodes (Targeted for Aion)
+# Tests shared with the EasyBuild and EESSI files (osu_utils/checks.py)
 # ============================================================================
+
 @rfm.simple_test
-class OsuSameSocketDifferentNuma(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Pt2Pt: Same Socket, Different NUMA Nodes (Aion Specific)'
-
-    # --- Target only Aion for this specific test ---
-    valid_systems = ['aion:batch']
-
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
-        self.job.launcher.options += [
-            '--cpu-bind=verbose,map_cpu:0,16',
-            '--mem-bind=local',
-        ]
+class OsuSameNumaNode(SourceBinaries, OsuSameNumaNodeBase):
+    pass
 
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (2.3, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
 
-# ============================================================================
-# Test Case: Same Compute Node, Different Physical Sockets
-# ============================================================================
+@rfm.simple_test
+class OsuSameSocketDifferentNuma(SourceBinaries, OsuSameSocketDifferentNumaBase):
+    pass
+
 
 @rfm.simple_test
-class OsuDifferentSockets(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Pt2Pt: Same Node, Different Sockets'
-
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
-         # These SLURM options are passed to srun
-        self.job.launcher.options += [
-            '--ntasks-per-socket=1',
-            '--cpu-bind=verbose,cores',
-            '--mem-bind=local',
-            '--distribution=cyclic:cyclic'
-        ]
+class OsuDifferentSockets(SourceBinaries, OsuDifferentSocketsBase):
+    pass
 
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (2.3, None, 0.2, 'us')},
-          'iris:batch': {'latency': (4.5, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-          'iris:batch': {'bandwidth': (4500.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
 
-# ============================================================================
-# Test Case: 2 processes are running on different nodes.
-# ============================================================================
+@rfm.simple_test
+class OsuDifferentNodes(SourceBinaries, OsuDifferentNodesBase):
+    pass
+
 
 @rfm.simple_test
-class OsuDifferentNodes(OsuBwLatencyBenchmarkBase):
-    descr = 'OSU Pt2Pt: Same Node, Different Sockets'
+class OsuTopologyPlacement(SourceBinaries, OsuTopologyPlacementBase):
+    pass
+
 
-    num_tasks_per_node = 1
+@rfm.simple_test
+class OsuPackedIntranode(SourceBinaries, OsuPackedIntranodeBase):
+    pass
 
-    # --- MPI Binding ---
-    @run_before('run')
-    def set_mpi_binding(self):
 
-        self.job.launcher.options += [
-            '--nodes=2'
-        ]
+@rfm.simple_test
+class OsuCoreLatencyMatrix(BaselineSourceBinaries, OsuCoreLatencyMatrixBase):
+    pass
 
-    # --- Set specific reference values ---
-    @run_before('performance')
-    def set_references(self):
-      # This method overrides the default set in the base class
-      metric = self.benchmark_info[1] # 'latency' or 'bandwidth'
-      references = {
-        'latency': {
-          'aion:batch': {'latency': (4.0, None, 0.2, 'us')},
-          'iris:batch': {'latency': (7.2, None, 0.2, 'us')},
-        },
-        'bandwidth': {
-          'aion:batch': {'bandwidth': (12000.0, -0.2, None, 'MB/s')},
-          'iris:batch': {'bandwidth': (8000.0, -0.2, None, 'MB/s')},
-        }
-      }
-      self.reference = references[metric]
+
+@rfm.simple_test
+class OsuFabricPairSweep(BaselineSourceBinaries, OsuFabricPairSweepBase):
+    pass
+
+
+@rfm.simple_test
+class OsuPartitionHealthSweep(BaselineSourceBinaries, OsuPartitionHealthSweepBase):
+    pass
+
+
+@rfm.simple_test
+class OsuMultiPairScaling(BaselineSourceBinaries, OsuMultiPairScalingBase):
+    pass
+
+
+@rfm.simple_test
+class OsuCollectiveScaling(BaselineSourceBinaries, OsuCollectiveScalingBase):
+    pass
+
+
+@rfm.simple_test
+class OsuMultiThreadLatency(BaselineSourceBinaries, OsuMultiThreadLatencyBase):
+    pass
+
+
+@rfm.simple_test
+class OsuNonBlockingOverlap(BaselineSourceBinaries, OsuNonBlockingOverlapBase):
+    pass
@@ -0,0 +1,6 @@
+'''Helpers shared by the OSU ReFrame tests and the report scripts.
+
+Nothing in here imports ReFrame, except the shared tests of checks.py, so
+the modules can also be run as plain scripts on the compute nodes
+(`python3 -m osu_utils.<module>`).
+'''
@@ -0,0 +1,134 @@
+'''Adaptive iteration count for the OSU point-to-point benchmarks.
+
+Runs a benchmark in batches of a few hundred iterations at one message size
+until the confidence interval of the mean of the batches is narrower than a
+relative width, or until a time budget runs out. Each batch is a separate
+launch, so the command must include the parallel launcher:
+
+    python3 -m osu_utils.adaptive --size 8192 --rel-width 0.02 \
+        --launcher "srun --cpu-bind=cores" -- osu_latency
+
+The output ends like an OSU table, followed by the sampling summary:
+
+    8192                    0.57
+    # Iterations: 1200
+    # CI: 1.35%
+    # Converged: yes
+'''
+
+import argparse
+import math
+import re
+import subprocess
+import sys
+import time
+
+from osu_utils.stats import coefficient_of_variation
+
+# Two-sided t quantiles for 95% confidence, by degrees of freedom
+_T95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086,
+    25: 2.060, 30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980,
+}
+
+
+def t_quantile_95(dof):
+    '''95% two-sided Student t quantile (table lookup, conservative between rows).
+
+    Between two rows of the table, the row with fewer degrees of freedom (the
+    larger quantile) is used, so the interval is never narrower than exact.
+    '''
+    if dof < 1:
+        raise ValueError(f'degrees of freedom must be at least 1, got {dof}')
+
+    return _T95[max(d for d in _T95 if d <= dof)]
+
+
+def relative_ci_width(values):
+    '''Half-width of the 95% confidence interval of the mean, relative to it.'''
+    if len(values) < 2:
+        return math.inf
+
+    stderr = coefficient_of_variation(values) / 100.0 / math.sqrt(len(values))
+    return t_quantile_95(len(values) - 1) * stderr
+
+
+def run_batch(command, size):
+    '''Run one batch and return the value printed for the message size.'''
+    proc = subprocess.run(command, shell=True, stdout=subprocess.PIPE,
+                          universal_newlines=True)
+    sys.stdout.write(''.join('# | ' + line + '\n'
+                             for line in proc.stdout.splitlines()))
+    if proc.returncode != 0:
+        raise RuntimeError(f'batch failed with exit code {proc.returncode}: {command}')
+
+    match = re.search(rf'^{size}\s+(\S+)', proc.stdout, re.MULTILINE)
+    if not match:
+        raise RuntimeError(f'no row for message size {size} in the output of: {command}')
+
+    return float(match.group(1))
+
+
+def sample(command, size, rel_width, time_budget, min_batches=3, max_batches=200):
+    '''Run batches until converged; returns (batch values, converged).'''
+    values = []
+    start = time.time()
+    while len(values) < max_batches:
+        batch_start = time.time()
+        values.append(run_batch(command, size))
+        if len(values) >= min_batches and relative_ci_width(values) <= rel_width:
+            return values, True
+
+        # Stop before a batch that would overrun the budget
+        batch_time = time.time() - batch_start
+        if time.time() - start + batch_time > time_budget:
+            break
+
+    return values, False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run an OSU benchmark in batches until its mean converges')
+    parser.add_argument('--size', type=int, required=True, help='message size')
+    parser.add_argument('--launcher', default='', help='parallel launcher command')
+    parser.add_argument('--rel-width', type=float, default=0.02,
+                        help='target half-width of the 95%% CI, relative to the mean')
+    parser.add_argument('--time-budget', type=float, default=120.0,
+                        help='seconds after which no new batch is started')
+    parser.add_argument('--batch-iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=50,
+                        help='warmup iterations of every batch (not counted)')
+    parser.add_argument('--min-batches', type=int, default=3)
+    parser.add_argument('--max-batches', type=int, default=200)
+    parser.add_argument('benchmark', nargs=argparse.REMAINDER,
+                        help='benchmark command, after `--`')
+    args = parser.parse_args(argv)
+
+    benchmark = [arg for arg in args.benchmark if arg != '--']
+    if not benchmark:
+        parser.error('no benchmark command given')
+
+    command = ' '.join([args.launcher] + benchmark + [
+        '-m', f'{args.size}:{args.size}', '-x', str(args.warmup),
+        '-i', str(args.batch_iterations)
+    ]).strip()
+    try:
+        values, converged = sample(command, args.size, args.rel_width,
+                                   args.time_budget, args.min_batches,
+                                   args.max_batches)
+    except RuntimeError as err:
+        print(err, file=sys.stderr)
+        return 1
+
+    mean = sum(values) / len(values)
+    print(f'{args.size:<24}{mean:.2f}')
+    print(f'# Iterations: {len(values) * args.batch_iterations}')
+    print(f'# CI: {100 * relative_ci_width(values):.2f}%')
+    print(f'# Converged: {"yes" if converged else "no"}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+'''Location of the OSU Micro-Benchmarks 7.x executables in the source tree.'''
+
+# Benchmark executable -> directory (relative to the top of the source tree)
+# whose Makefile builds it
+BENCHMARK_DIRS = {}
+for _name in ['osu_bibw', 'osu_bw', 'osu_latency', 'osu_latency_mp',
+              'osu_latency_mt', 'osu_mbw_mr', 'osu_multi_lat']:
+    BENCHMARK_DIRS[_name] = 'c/mpi/pt2pt/standard'
+
+for _name in ['osu_acc_latency', 'osu_cas_latency', 'osu_fop_latency',
+              'osu_get_acc_latency', 'osu_get_bw', 'osu_get_latency',
+              'osu_put_bibw', 'osu_put_bw', 'osu_put_latency']:
+    BENCHMARK_DIRS[_name] = 'c/mpi/one-sided'
+
+for _name in ['osu_allgather', 'osu_allgatherv', 'osu_allreduce',
+              'osu_alltoall', 'osu_alltoallv', 'osu_barrier', 'osu_bcast',
+              'osu_gather', 'osu_gatherv', 'osu_reduce',
+              'osu_reduce_scatter', 'osu_scatter', 'osu_scatterv']:
+    BENCHMARK_DIRS[_name] = 'c/mpi/collective/blocking'
+    BENCHMARK_DIRS[_name.replace('osu_', 'osu_i', 1)] = 'c/mpi/collective/non_blocking'
+
+
+def benchmark_dirs(benchmarks):
+    '''Group benchmark executables by the directory building them.
+
+    Returns an ordered {directory: [benchmark, ...]} mapping and raises
+    ValueError for unknown benchmarks.
+    '''
+    unknown = sorted(set(benchmarks) - set(BENCHMARK_DIRS))
+    if unknown:
+        raise ValueError(f'unknown OSU benchmarks: {", ".join(unknown)}')
+
+    dirs = {}
+    for name in sorted(set(benchmarks)):
+        dirs.setdefault(BENCHMARK_DIRS[name], []).append(name)
+
+    return dirs
+
+
+# Every benchmark the test suite runs. The source build compiles all of them,
+# so a single build per environment serves every test
+SUITE_BENCHMARKS = [
+    'osu_bw', 'osu_latency', 'osu_bibw', 'osu_mbw_mr', 'osu_latency_mt',
+    'osu_put_latency', 'osu_get_latency', 'osu_put_bw', 'osu_get_bw',
+    'osu_allreduce', 'osu_alltoall', 'osu_bcast',
+    'osu_iallreduce', 'osu_ialltoall',
+]
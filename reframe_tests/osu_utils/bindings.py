@@ -0,0 +1,122 @@
+'''Where the ranks of a run were actually bound, from the binding reports.
+
+Two reports are understood, both written to the job's stderr:
+
+* `srun --cpu-bind=verbose`, with the OS indices of the CPUs of each task:
+
+      cpu-bind=MASK - aion-0001, task  1  1 [48121]: mask 0x10000 set
+
+  (`cpu_bind=` in older Slurm releases, with the unit of the binding in some,
+  e.g. `cpu-bind-cores=`)
+
+* Open MPI's `OMPI_MCA_hwloc_base_report_bindings=1`, with the logical
+  indices of the cores of each rank (only used when srun reported nothing,
+  and mapped to CPUs with the node topology):
+
+      [aion-0001:48121] MCW rank 1 bound to socket 0[core 16[hwt 0]]: [...]
+      [aion-0001:48121] Rank 1 bound to package[0][core:16]
+
+Each launch of the benchmark is classified like the core pairs of
+`topology.py`, plus `SameCore` and `CrossNode`, so a job is only judged when
+Slurm placed its ranks as its scenario says (see `placements.py`).
+'''
+
+import re
+
+from osu_utils.topology import cpu_pair_class, mask_cpus
+
+SRUN_REGEX = re.compile(
+    r'cpu[-_]bind(?:[-_]\w+)?=\S+\s+-\s+(?P<host>[^,\s]+),\s+task\s+(?P<rank>\d+)\s+\d+\s+'
+    r'\[\d+\]:\s+mask\s+(?P<mask>0x[0-9a-fA-F]+)\s+set'
+)
+OMPI_REGEX = re.compile(
+    r'^\[(?P<host>[^:\]]+):\d+\]\s+(?:MCW rank|Rank)\s+(?P<rank>\d+)\s+bound to\b(?P<where>.*)$',
+    re.MULTILINE
+)
+_CORE_REGEX = re.compile(r'core[\s:\[]*(\d+)')
+
+
+def _srun_reports(text):
+    return [(int(match.group('rank')), match.group('host'), mask_cpus(match.group('mask')))
+            for match in SRUN_REGEX.finditer(text)]
+
+
+def _ompi_reports(text, topology):
+    cores = topology['cores'] if topology else []
+    reports = []
+    for match in OMPI_REGEX.finditer(text):
+        indices = [int(index) for index in _CORE_REGEX.findall(match.group('where'))]
+        if not indices or max(indices) >= len(cores):
+            continue
+
+        cpus = sorted(cpu for index in indices for cpu in cores[index]['pus'])
+        reports.append((int(match.group('rank')), match.group('host'), cpus))
+
+    return reports
+
+
+def parse_bindings(text, topology=None):
+    '''Bindings of every launch in a job's stderr, as {rank: (host, [cpu, ...])}.
+
+    The reports come one per rank and launch; a rank seen again starts the
+    next launch (repeated or adaptive runs).
+    '''
+    launches = []
+    current = {}
+    for rank, host, cpus in _srun_reports(text) or _ompi_reports(text, topology):
+        if rank in current:
+            launches.append(current)
+            current = {}
+
+        current[rank] = (host, cpus)
+
+    if current:
+        launches.append(current)
+
+    return launches
+
+
+def launch_class(topology, launch):
+    '''Placement class of ranks 0 and 1 of a launch, None if not known.'''
+    if 0 not in launch or 1 not in launch:
+        return None
+
+    (host_a, cpus_a), (host_b, cpus_b) = launch[0], launch[1]
+    if host_a != host_b:
+        return 'CrossNode'
+
+    if topology is None:
+        return None
+
+    known = {pu for core in topology['cores'] for pu in core['pus']}
+    if not set(cpus_a + cpus_b) <= known:
+        return None
+
+    # A rank bound to several cores is only classified if all of them agree
+    classes = {cpu_pair_class(topology, cpu_a, cpu_b) for cpu_a in cpus_a for cpu_b in cpus_b}
+    return classes.pop() if len(classes) == 1 else None
+
+
+def describe_launch(launch):
+    '''`host:cpus` of the ranks of a launch, e.g. `aion-0001:0 aion-0001:16`.'''
+    return ' '.join(f'{host}:{",".join(str(cpu) for cpu in cpus)}'
+                    for _, (host, cpus) in sorted(launch.items()))
+
+
+def launch_placements(text, topology=None):
+    '''(`host:cpus` of the ranks, placement class or None) of every launch.'''
+    return [(describe_launch(launch), launch_class(topology, launch))
+            for launch in parse_bindings(text, topology)]
+
+
+def placement_error(placements, expected):
+    '''Message for the first launch not bound as one of `expected`, else None.'''
+    if not placements:
+        return 'no binding report (srun --cpu-bind=verbose or Open MPI) in the job stderr'
+
+    for cpus, placement in placements:
+        if placement not in expected:
+            return (f'ranks bound to {cpus} ({placement or "unknown placement"}), '
+                    f'expected {" or ".join(expected)}')
+
+    return None
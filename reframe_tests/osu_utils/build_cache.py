@@ -0,0 +1,146 @@
+'''Content-addressed cache of OSU Micro-Benchmarks builds.
+
+A build is identified by a hash of everything that affects the binaries
+(OSU version, toolchain modules, compiler, configure flags...). Cached builds
+only keep the benchmark executables, laid out as in the source tree:
+
+    <cache_dir>/<key>/manifest.json
+    <cache_dir>/<key>/c/mpi/pt2pt/standard/osu_latency
+    ...
+
+The cache also mirrors the source tarballs under `<cache_dir>/sources`, so a
+rebuild with another toolchain does not need network access either.
+
+After a successful build, the build directory is published with:
+
+    python3 -m osu_utils.build_cache publish <key> <build_dir> <manifest>
+'''
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+
+def default_cache_dir():
+    return os.environ.get(
+        'OSU_BUILD_CACHE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'osu-regression',
+                     'builds')
+    )
+
+
+def build_key(parts):
+    '''Hash of a dict describing a build configuration.'''
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+
+def lookup(key, cache_dir=None):
+    '''Directory of a cached build, or None if it is not cached.'''
+    prefix = os.path.join(cache_dir or default_cache_dir(), key)
+    if os.path.isfile(os.path.join(prefix, 'manifest.json')):
+        return prefix
+
+    return None
+
+
+def source_mirror(cache_dir=None):
+    return os.path.join(cache_dir or default_cache_dir(), 'sources')
+
+
+def fetch_commands(url, file_name, cache_dir=None):
+    '''Shell commands copying a tarball from the mirror, downloading it on a miss.'''
+    mirror = source_mirror(cache_dir)
+    cached = os.path.join(mirror, file_name)
+    return [
+        f'if [ -f {cached} ]; then cp {cached} .; else '
+        f'curl -LJO {url} && mkdir -p {mirror} && '
+        f'cp {file_name} {cached}.$$ && mv {cached}.$$ {cached}; fi'
+    ]
+
+
+def _is_benchmark(path):
+    name = os.path.basename(path)
+    mode = os.stat(path).st_mode
+    return (name.startswith('osu_') and '.' not in name and
+            stat.S_ISREG(mode) and mode & stat.S_IXUSR)
+
+
+def publish(key, build_dir, manifest, cache_dir=None):
+    '''Copy the benchmark executables of a build tree into the cache.'''
+    cache_dir = cache_dir or default_cache_dir()
+    prefix = os.path.join(cache_dir, key)
+    if lookup(key, cache_dir):
+        return prefix
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir, prefix=f'.{key}.')
+    count = 0
+    for dirpath, _, filenames in os.walk(build_dir):
+        for name in filenames:
+            src = os.path.join(dirpath, name)
+            if not _is_benchmark(src):
+                continue
+
+            dst = os.path.join(staging, os.path.relpath(src, build_dir))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+            count += 1
+
+    if not count:
+        shutil.rmtree(staging)
+        raise ValueError(f'no OSU benchmark executables found in {build_dir}')
+
+    # The manifest is written last: its presence marks a complete entry
+    with open(os.path.join(staging, 'manifest.json'), 'w') as fp:
+        json.dump(manifest, fp, indent=2, sort_keys=True)
+
+    try:
+        os.rename(staging, prefix)
+    except OSError:
+        # Another session published the same key in the meantime
+        shutil.rmtree(staging)
+
+    return prefix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage the OSU build cache')
+    parser.add_argument('--cache-dir', default=default_cache_dir())
+    subparsers = parser.add_subparsers(dest='command')
+    publish_parser = subparsers.add_parser(
+        'publish', help='copy the executables of a build tree into the cache')
+    publish_parser.add_argument('key')
+    publish_parser.add_argument('build_dir')
+    publish_parser.add_argument('manifest', help='JSON file describing the build')
+    subparsers.add_parser('list', help='list the cached builds')
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        with open(args.manifest) as fp:
+            manifest = json.load(fp)
+
+        print(publish(args.key, args.build_dir, manifest, args.cache_dir))
+    elif args.command == 'list':
+        if not os.path.isdir(args.cache_dir):
+            return 0
+
+        for key in sorted(os.listdir(args.cache_dir)):
+            if lookup(key, args.cache_dir):
+                with open(os.path.join(args.cache_dir, key, 'manifest.json')) as fp:
+                    print(key, json.dumps(json.load(fp), sort_keys=True))
+    else:
+        parser.print_help()
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
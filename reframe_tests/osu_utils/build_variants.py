@@ -0,0 +1,140 @@
+'''Build variants of the OSU Micro-Benchmarks source build.
+
+A variant changes the toolchain and/or the compiler and configure flags of
+the build:
+
+    'O3-native': {'cflags': ['-O3', '-march=native'], 'native': True}
+
+`native` variants are built on the partition they run on, and their cached
+builds are keyed by the CPU architecture as well. `mpi` names the MPI library
+of a toolchain that is not built on Open MPI (`openmpi` by default): the
+tests then set none of the Open MPI/UCX variables and cannot pin a transport.
+
+The baseline `default` (the environment's toolchain with its default flags)
+is always built. The other variants are opt-in, named in
+`OSU_BUILD_VARIANTS` (comma-separated):
+
+    OSU_BUILD_VARIANTS=O3-native,foss-2024a reframe ...
+
+A variant is its own install method in the references and the history,
+e.g. `SOURCE+O3-native`.
+
+The `modules` of a variant replace the toolchain of the ReFrame environment
+(its `toolchain/...` modules) for the build and again when the benchmarks
+run, so the two toolchains are never mixed. The build reports the loaded
+modules, `mpicc` and the MPI library the benchmarks are linked with, and
+`toolchain_error` checks them:
+
+    OSU toolchain: modules=... mpi_root=... mpicc=... libmpi=...
+'''
+
+import os
+import re
+
+BUILD_VARIANTS = {
+    # The environment's toolchain (foss/2023b), default flags
+    'default': {},
+
+    # Same toolchain, optimised for the CPU of the partition
+    'O3-native': {'cflags': ['-O3', '-march=native'], 'native': True},
+    'O3-native-lto': {'cflags': ['-O3', '-march=native', '-flto'], 'native': True},
+
+    # Newer GCC and Open MPI
+    'foss-2024a': {'modules': ['toolchain/foss/2024a']},
+
+    # Intel MPI instead of Open MPI (`mpicc` still wraps GCC)
+    'intel-2023b': {'modules': ['toolchain/intel/2023b'], 'mpi': 'intelmpi'},
+}
+
+
+# EasyBuild root of the MPI library of each `mpi`: the variant's mpicc and
+# libmpi must come from it
+MPI_ROOT_VARS = {
+    'openmpi': 'EBROOTOPENMPI',
+    'intelmpi': 'EBROOTIMPI',
+}
+
+_TOOLCHAIN_REPORT_REGEX = re.compile(
+    r'^OSU toolchain: modules=(?P<modules>\S*) mpi_root=(?P<mpi_root>\S*) '
+    r'mpicc=(?P<mpicc>\S*) libmpi=(?P<libmpi>\S*)$', re.MULTILINE
+)
+
+
+def selected_variants(value=None):
+    '''The baseline plus the variants named in `OSU_BUILD_VARIANTS`.'''
+    if value is None:
+        value = os.environ.get('OSU_BUILD_VARIANTS', '')
+
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in BUILD_VARIANTS]
+    if unknown:
+        raise ValueError(f'unknown build variant(s) {", ".join(unknown)} '
+                         f'(known: {", ".join(BUILD_VARIANTS)})')
+
+    return ['default'] + [name for name in dict.fromkeys(names) if name != 'default']
+
+
+def variant_install_method(install_method, variant):
+    '''Install method the references and the history of a variant are kept under.'''
+    if not variant or variant == 'default':
+        return install_method
+
+    return f'{install_method}+{variant}'
+
+
+def _replaced_modules(variant, environ_modules):
+    '''The environment's toolchain modules a variant replaces.'''
+    if not BUILD_VARIANTS[variant].get('modules'):
+        return []
+
+    return [module for module in environ_modules if module.startswith('toolchain/')]
+
+
+def variant_modules(variant, environ_modules):
+    '''Modules a variant is built and run with.'''
+    replaced = _replaced_modules(variant, environ_modules)
+    return ([module for module in environ_modules if module not in replaced] +
+            BUILD_VARIANTS[variant].get('modules', []))
+
+
+def toolchain_commands(variant, environ_modules):
+    '''Shell commands swapping the environment's toolchain for the variant's.'''
+    commands = [f'module unload {module}'
+                for module in reversed(_replaced_modules(variant, environ_modules))]
+    return commands + [f'module load {module}'
+                       for module in BUILD_VARIANTS[variant].get('modules', [])]
+
+
+def toolchain_report_command(variant, executable):
+    '''Shell command printing the toolchain `executable` was built with.'''
+    mpi_root = MPI_ROOT_VARS[BUILD_VARIANTS[variant].get('mpi', 'openmpi')]
+    return (f'echo "OSU toolchain: modules=$LOADEDMODULES mpi_root=${mpi_root} '
+            f'mpicc=$(command -v mpicc) '
+            f'libmpi=$(ldd {executable} | awk \'/libmpi[.]so/ {{print $3; exit}}\')"')
+
+
+def toolchain_error(output, variant, environ_modules):
+    '''Why the report in a build output does not match the variant, or None.'''
+    match = _TOOLCHAIN_REPORT_REGEX.search(output)
+    if not match:
+        return 'no toolchain report in the build output'
+
+    loaded = match.group('modules').split(':')
+    for module in BUILD_VARIANTS[variant].get('modules', []):
+        if module not in loaded:
+            return f'{module} is not loaded'
+
+    for module in _replaced_modules(variant, environ_modules):
+        if module in loaded:
+            return f'{module} of the environment is still loaded'
+
+    mpi_root = match.group('mpi_root')
+    if not mpi_root:
+        return f'no {BUILD_VARIANTS[variant].get("mpi", "openmpi")} module loaded'
+
+    for name in ('mpicc', 'libmpi'):
+        path = match.group(name)
+        if not path.startswith(mpi_root.rstrip('/') + '/'):
+            return f'{name} {path or "(not found)"} is not from {mpi_root}'
+
+    return None
@@ -0,0 +1,1301 @@
+'''ReFrame tests shared by the source, EasyBuild and EESSI test files.
+
+Unlike the rest of osu_utils, this module imports ReFrame: it is only loaded
+by the test files, never on the compute nodes. The classes below are not
+registered as tests. Each test file combines them with the provider of its
+OSU binaries, a subclass of `OsuBinaries`:
+
+    @rfm.simple_test
+    class EESSIOsuPackedIntranode(EESSIBinaries, OsuPackedIntranodeBase):
+        pass
+'''
+
+import json
+import os
+
+import reframe as rfm
+import reframe.utility.sanity as sn
+import reframe.utility.typecheck as typ
+from reframe.core.backends import getlauncher
+from reframe.core.exceptions import PerformanceError
+
+from osu_utils.bindings import launch_placements, placement_error
+from osu_utils.opt_in import selected_groups
+from osu_utils.placements import INTRANODE_PLACEMENTS, intranode_placements, scenario_classes
+from osu_utils.topology import PLACEMENT_CLASSES
+from osu_utils.topology_cache import (default_cache_dir, lookup_pairs, partition_topology,
+                                      processor_signature)
+from osu_utils.references import (default_references_path, missing_references,
+                                  scenario_references)
+from osu_utils.stats import REPEAT_STATISTICS, run_statistic
+from osu_utils.transports import (TRANSPORTS, selected_transport, transport_env,
+                                  transport_error, transport_scenario)
+
+# Directory of the test files: the job scripts run the helpers of osu_utils
+# with it in PYTHONPATH (`python3 -m osu_utils.<module>`)
+_TESTS_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Largest message size osu_latency/osu_bw print in their default size range
+OSU_MAX_MESSAGE_SIZE = 4194304
+
+# Point-to-point benchmarks: (executable_name, metric_name)
+PT2PT_BENCHMARKS = [
+    ('osu_bw', 'bandwidth'),
+    ('osu_latency', 'latency')
+]
+
+# Also run in every placement scenario: bidirectional bandwidth and the
+# one-sided (MPI-3 RMA, default window and synchronization) benchmarks.
+# They report the same metrics; benchmark_info tells them apart.
+EXTRA_PT2PT_BENCHMARKS = [
+    ('osu_bibw', 'bandwidth'),
+    ('osu_put_latency', 'latency'),
+    ('osu_get_latency', 'latency'),
+    ('osu_put_bw', 'bandwidth'),
+    ('osu_get_bw', 'bandwidth'),
+]
+
+# Message size each metric is judged at, and its unit
+METRIC_SETTINGS = {
+    'latency': (8192, 'us'),
+    'bandwidth': (1048576, 'MB/s'),
+}
+
+# Collective benchmarks and the message sizes their latency is judged at
+# (osu_alltoall stops at 64 KiB: its buffers grow with the number of ranks)
+COLLECTIVE_BENCHMARKS = {
+    'osu_allreduce': [8, 1024, 65536, 1048576],
+    'osu_alltoall': [8, 1024, 65536],
+    'osu_bcast': [8, 1024, 65536, 1048576],
+}
+
+# Message sizes the multi-threaded latency is judged at
+MULTI_THREAD_SIZES = [8, 8192]
+
+# Non-blocking collective benchmarks and the message sizes they are judged at
+NONBLOCKING_BENCHMARKS = {
+    'osu_iallreduce': [8, 65536, 1048576],
+    'osu_ialltoall': [8, 65536],
+}
+
+
+def osu_message_sizes(exec_name):
+    '''Message sizes of the default OSU range (only osu_latency starts at 0 B).'''
+    sizes = [2**i for i in range(OSU_MAX_MESSAGE_SIZE.bit_length())]
+    return [0] + sizes if exec_name == 'osu_latency' else sizes
+
+
+class OsuBinaries(rfm.RegressionMixin):
+    '''Where a test gets its OSU executables from.
+
+    The subclass sets `install_method` and makes the executables available,
+    e.g. with a fixture or by loading a module. The references of the test are
+    kept under its install method, and every judged perf variable needs one.
+    '''
+
+    # --- Result metadata, read back by Report/ingest.py ---
+    install_method = variable(str, loggable=True)
+
+    # Once a test has references on a partition, a judged perf variable
+    # without one fails it (ReFrame would report it unbounded). A test with
+    # none there yet passes, so that its first runs can seed them.
+    # `-S require_references=true` to require them anyway, `false` never.
+    require_references = variable(typ.Bool, type(None), value=None)
+
+    def osu_command(self, exec_name):
+        '''Command running the benchmark `exec_name` (by default, found in PATH).'''
+        return exec_name
+
+    def references_install_method(self):
+        '''Install method the references of the test are kept under.'''
+        return self.install_method
+
+    def mpi_library(self):
+        '''MPI library of the executables (foss and gompi build on Open MPI).'''
+        return 'openmpi'
+
+    @run_after('performance')
+    def check_references(self):
+        '''Fails the test if a judged perf variable has no reference (see
+        `missing_references`).
+
+        Runs after the values are evaluated, so they still reach the perflog
+        and Report/generate_references.py can seed the missing references.
+        '''
+        if self.is_dry_run():
+            return
+
+        partition = self.current_partition.fullname
+        missing = missing_references(self.reference, partition, self.perf_variables,
+                                     self.require_references)
+        if missing:
+            raise PerformanceError(
+                f'no reference for {", ".join(missing)} on {partition} under '
+                f'{self.references_install_method()} in {self.references_file}'
+            )
+
+
+class OsuOptIn(rfm.RegressionMixin):
+    '''A test family only loaded when its group is named in `OSU_OPT_IN`.
+
+    The subclass sets `opt_in_group` (see osu_utils/opt_in.py) and tags itself
+    with it. A test skipped at init is never loaded, so a run that does not
+    opt in submits nothing for it, whatever its tags.
+    '''
+
+    opt_in_group = variable(str)
+
+    @run_after('init')
+    def skip_unless_opted_in(self):
+        self.skip_if(self.opt_in_group not in selected_groups(),
+                     f'opt-in test, set OSU_OPT_IN={self.opt_in_group} to run it')
+
+
+# ============================================================================
+# Point-to-point benchmarks (osu_latency, osu_bw, osu_bibw, RMA)
+# ============================================================================
+
+class OsuBwLatencyBenchmarkBase(rfm.RunOnlyRegressionTest):
+    '''Base class for OSU Point-to-Point benchmark tests (osu_latency, osu_bw, osu_bibw, RMA).
+
+    The subclasses bind the 2 ranks as their scenario says; the scenario
+    tests below are combined with the binaries provider of each test file.
+    '''
+
+    # message_size will be set based on the specific benchmark (latency/bw)
+    message_size = variable(int, loggable=True)
+
+    # --- Opt-in full message-size sweep (e.g. `-S sweep_sizes=true`) ---
+    # Runs the whole OSU size range in one job and reports every row of the
+    # output table as its own `<metric>_<size>` performance variable.
+    sweep_sizes = variable(bool, value=False, loggable=True)
+
+    # --- Opt-in repetitions inside the same job (e.g. `-S repeat=5`) ---
+    # The benchmark runs `repeat` times back-to-back. The metric is then the
+    # median of the runs (and is judged against the references), reported
+    # with `<metric>_p5`, `<metric>_p95` and `<metric>_cv` (in %).
+    repeat = variable(int, value=1, loggable=True)
+
+    # --- Opt-in adaptive iteration count (e.g. `-S adaptive=true`) ---
+    # osu_utils/adaptive.py launches the benchmark in batches until the 95%
+    # confidence interval of the mean is narrower than `adaptive_rel_width`
+    # (relative to the mean) or `adaptive_time_budget` seconds are spent.
+    # Reports `<metric>_iterations` and `<metric>_ci` (CI half-width, in %).
+    adaptive = variable(bool, value=False, loggable=True)
+    adaptive_rel_width = variable(float, value=0.02)
+    adaptive_time_budget = variable(float, value=120.0)
+    adaptive_batch_iterations = variable(int, value=200)
+
+    # --- Result metadata, read back by Report/ingest.py ---
+    scenario = variable(str, value='', loggable=True)
+
+    # References generated from the run history (Report/generate_references.py)
+    references_file = variable(str, value=default_references_path())
+
+    # --- Placement the ranks actually got, from the binding reports ---
+    # `host:cpus` of the ranks and their topology class (e.g. SameL3,
+    # CrossSocket, CrossNode), per distinct launch. A run not bound as its
+    # scenario says fails the sanity check instead of being judged.
+    bound_cpus = variable(str, value='', loggable=True)
+    bound_placement = variable(str, value='', loggable=True)
+
+    # Per-node-type topology cache, on a filesystem shared with the nodes
+    topology_cache_dir = variable(str, value=default_cache_dir())
+
+    # --- Opt-in pinned communication path (e.g. `-P transport=ucx-rc,ob1-tcp`) ---
+    # Sets the Open MPI/UCX variables of an entry of osu_utils/transports.py.
+    # A pinned run is its own series (`<scenario>+<transport>`) in the
+    # references and the history. `transport_selected` records what Open MPI
+    # and UCX reported picking for it (e.g. `pml=ucx tls=rc_mlx5,self,sysv`); a run
+    # on another PML than the pinned one fails the sanity check.
+    transport = variable(str, value='default', loggable=True)
+    transport_selected = variable(str, value='', loggable=True)
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks = 2
+    num_tasks_per_node = 2
+    num_cpus_per_task = 1
+    exclusive_access = True
+
+    # --- Parameter to select the specific pt2pt benchmark ---
+    # benchmark_info: tuple(executable_name_suffix, metric_name)
+    benchmark_info = parameter(PT2PT_BENCHMARKS + EXTRA_PT2PT_BENCHMARKS, fmt=lambda x: x[0], loggable=True) # Log only the executable name suffix
+
+    @run_before('run')
+    def set_executable_path(self):
+        '''Sets the executable from the binaries provider of the test file.'''
+        exec_name = self.benchmark_info[0]
+        self.executable = self.osu_command(exec_name)
+
+        # export relevant OMPI MCA vars
+        if self.mpi_library() == 'openmpi':
+            self.env_vars['OMPI_MCA_hwloc_base_report_bindings'] = '1'
+
+    @run_after('setup')
+    def skip_foreign_transport(self):
+        '''The transports are Open MPI components: skip them for the other MPI builds.'''
+        self.skip_if(self.transport != 'default' and self.mpi_library() != 'openmpi',
+                     f'transport {self.transport} needs Open MPI, the binaries '
+                     f'use {self.mpi_library()}')
+
+    @run_before('run')
+    def set_transport(self):
+        '''Pin the transport and make Open MPI and UCX report their selection.'''
+        if self.mpi_library() == 'openmpi':
+            self.env_vars.update(transport_env(self.transport))
+
+    @run_before('setup')
+    def setup_executable_options_and_perf(self):
+        '''Sets executable options and performance variables based on benchmark type.'''
+        exec_name, bench_metric = self.benchmark_info
+
+        if bench_metric not in METRIC_SETTINGS:
+            raise ValueError(f'Unknown benchmark metric: {bench_metric}')
+
+        if self.repeat < 1:
+            raise ValueError(f'repeat must be at least 1, got {self.repeat}')
+
+        if self.adaptive and (self.sweep_sizes or self.repeat > 1):
+            raise ValueError('adaptive mode cannot be combined with sweep_sizes or repeat')
+
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f'Unknown transport: {self.transport}')
+
+        self.message_size, unit = METRIC_SETTINGS[bench_metric]
+
+        self.reference_unit = unit
+
+        if self.sweep_sizes:
+            # No `-m`: let OSU print its whole default size range. The sanity
+            # check then looks for the last row of the table.
+            self.executable_opts = ['-x', '100', '-i', '1000']
+            self.perf_variables = {
+                f'{bench_metric}_{size}': self._size_performance_function(size)
+                for size in osu_message_sizes(exec_name)
+            }
+            self.message_size = OSU_MAX_MESSAGE_SIZE
+            return
+
+        self.executable_opts = ['-m', f'{self.message_size}:{self.message_size}', '-x', '100', '-i', '1000']
+        self.perf_variables = {
+            # The key is the metric name ('latency' or 'bandwidth')
+            bench_metric: self._size_performance_function(self.message_size)
+        }
+        if self.repeat > 1:
+            for statistic in REPEAT_STATISTICS:
+                self.perf_variables[f'{bench_metric}_{statistic}'] = self._size_performance_function(
+                    self.message_size, statistic, '%' if statistic == 'cv' else self.reference_unit
+                )
+
+        if self.adaptive:
+            self.perf_variables[f'{bench_metric}_iterations'] = sn.make_performance_function(
+                sn.extractsingle(r'^# Iterations:\s+(\d+)', self.stdout, 1, int), unit='iterations'
+            )
+            self.perf_variables[f'{bench_metric}_ci'] = sn.make_performance_function(
+                sn.extractsingle(r'^# CI:\s+(\S+)%', self.stdout, 1, float), unit='%'
+            )
+
+    def _size_performance_function(self, size, statistic='median', unit=None):
+        '''Performance function extracting the row of one message size.
+
+        With repeated runs, the value is a statistic over the rows of all runs.
+        '''
+        metric_regex = rf'^{size}\s+(?P<metric_val>\S+)'
+        if self.repeat == 1:
+            # The first argument is the extraction logic
+            value = sn.extractsingle(metric_regex, self.stdout, 'metric_val', float)
+        else:
+            value = sn.deferrable(run_statistic)(
+                sn.extractall(metric_regex, self.stdout, 'metric_val', float), statistic
+            )
+
+        return sn.make_performance_function(value, unit=unit or self.reference_unit)
+
+    @run_before('sanity')
+    def read_bindings(self):
+        '''Record where the ranks were bound and the transport used, from the job output.'''
+        if self.is_dry_run():
+            return
+
+        topology = partition_topology(self.current_partition.processor, self.topology_cache_dir)
+        with open(os.path.join(self.stagedir, sn.evaluate(self.stderr))) as fp:
+            stderr = fp.read()
+
+        # UCX logs to stdout, Open MPI to stderr
+        with open(os.path.join(self.stagedir, sn.evaluate(self.stdout))) as fp:
+            self.transport_selected = selected_transport(fp.read() + stderr)
+
+        self.transport_error = transport_error(self.transport, self.transport_selected)
+        placements = launch_placements(stderr, topology)
+
+        self.bound_cpus = '; '.join(dict.fromkeys(cpus for cpus, _ in placements))
+        self.bound_placement = '; '.join(dict.fromkeys(placement or 'unknown'
+                                                       for _, placement in placements))
+        self.placement_error = placement_error(placements, scenario_classes(self.scenario))
+
+    @sanity_function
+    def validate_test(self):
+        '''Look for the output line of the tested message size, then check binding and transport.'''
+        if self.repeat == 1:
+            completed = sn.assert_found(rf'^{self.message_size}\s+\S+', self.stdout)
+        else:
+            # Every repetition must have completed
+            completed = sn.assert_eq(
+                sn.count(sn.findall(rf'^{self.message_size}\s+\S+', self.stdout)), self.repeat
+            )
+
+        return sn.all([
+            completed,
+            sn.assert_true(self.placement_error is None, msg=self.placement_error),
+            sn.assert_true(self.transport_error is None, msg=self.transport_error),
+        ])
+
+    @run_before('run', always_last=True)
+    def add_repetitions(self):
+        '''Launch the benchmark `repeat - 1` more times before the main launch.'''
+        if self.repeat == 1:
+            return
+
+        # Same launcher command, so the repetitions get the same binding
+        command = ' '.join([self._launch_command(), self.executable, *self.executable_opts])
+        self.prerun_cmds.append(f'for osu_run in $(seq 2 {self.repeat}); do {command}; done')
+
+    @run_before('run', always_last=True)
+    def use_adaptive_wrapper(self):
+        '''In adaptive mode, launch the benchmark in batches from osu_utils/adaptive.py.'''
+        if not self.adaptive:
+            return
+
+        launch = self._launch_command()
+        self.job.launcher = getlauncher('local')()
+        self.executable_opts = [
+            '-m', 'osu_utils.adaptive', '--size', str(self.message_size),
+            '--rel-width', str(self.adaptive_rel_width),
+            '--time-budget', str(self.adaptive_time_budget),
+            '--batch-iterations', str(self.adaptive_batch_iterations),
+            # Double quotes: the job script expands the variables of the
+            # prerun commands (e.g. $OSU_CPU_PAIR)
+            '--launcher', f'"{launch}"', '--', self.executable
+        ]
+        self.executable = f'PYTHONPATH={_TESTS_DIR} python3'
+
+    def _launch_command(self):
+        '''Launcher command of the benchmark, with the binding options.'''
+        # The launcher reads the job geometry, which ReFrame only copies from
+        # the test right before emitting the launch
+        self.job.num_tasks = self.num_tasks
+        self.job.num_tasks_per_node = self.num_tasks_per_node
+        self.job.num_cpus_per_task = self.num_cpus_per_task
+        return self.job.launcher.run_command(self.job)
+
+    @run_after('setup')
+    def load_references(self):
+        '''Load the references of this scenario and benchmark for every partition.'''
+        scenario = transport_scenario(self.scenario, self.transport)
+        self.reference = scenario_references(self.references_install_method(), scenario,
+                                             self.benchmark_info[0], self.references_file)
+
+    @run_before('performance', always_last=True)
+    def expand_sweep_references(self):
+        '''In sweep mode, key the references by the per-size perf variables.
+
+        The scenario reference applies to the size the test normally pins
+        (8192 B for latency, 1 MB for bandwidth); every other size is
+        reported without bounds.
+        '''
+        if not self.sweep_sizes:
+            return
+
+        metric = self.benchmark_info[1]
+        pinned_size = METRIC_SETTINGS[metric][0]
+        unbounded = (0, None, None, self.reference_unit)
+        references = {}
+        for key, value in self.reference.items():
+            sysenv, var = key.rsplit(':', 1)
+            if var != metric:
+                continue
+
+            references[sysenv] = {
+                f'{metric}_{size}': value if size == pinned_size else unbounded
+                for size in osu_message_sizes(self.benchmark_info[0])
+            }
+
+        self.reference = references
+
+
+# ============================================================================
+# Test Case: both processes on the same NUMA node
+# ============================================================================
+
+class OsuSameNumaNodeBase(OsuBwLatencyBenchmarkBase):
+    descr = 'OSU Point-to-Point Benchmark Run'
+    scenario = 'SameNumaNode'
+
+    # --- MPI Binding ---
+    @run_before('run')
+    def set_mpi_binding(self):
+        # These SLURM options are passed to srun
+        self.job.launcher.options += INTRANODE_PLACEMENTS['SameNumaNode']
+
+
+# ============================================================================
+# Test Case: Same Physical Socket, Different NUMA Nodes (Targeted for Aion)
+# ============================================================================
+
+class OsuSameSocketDifferentNumaBase(OsuBwLatencyBenchmarkBase):
+    descr = 'OSU Pt2Pt: Same Socket, Different NUMA Nodes (Aion Specific)'
+    scenario = 'SameSocketDifferentNuma'
+
+    # --- Target only Aion for this specific test ---
+    valid_systems = ['aion:batch']
+
+    # --- MPI Binding ---
+    @run_before('run')
+    def set_mpi_binding(self):
+        self.job.launcher.options += INTRANODE_PLACEMENTS['SameSocketDifferentNuma']
+
+
+# ============================================================================
+# Test Case: Same Compute Node, Different Physical Sockets
+# ============================================================================
+
+class OsuDifferentSocketsBase(OsuBwLatencyBenchmarkBase):
+    descr = 'OSU Pt2Pt: Same Node, Different Sockets'
+    scenario = 'DifferentSockets'
+
+    # --- MPI Binding ---
+    @run_before('run')
+    def set_mpi_binding(self):
+        # These SLURM options are passed to srun
+        self.job.launcher.options += INTRANODE_PLACEMENTS['DifferentSockets']
+
+
+# ============================================================================
+# Test Case: 2 processes are running on different nodes.
+# ============================================================================
+
+class OsuDifferentNodesBase(OsuBwLatencyBenchmarkBase):
+    descr = 'OSU Pt2Pt: Same Node, Different Sockets'
+    scenario = 'DifferentNodes'
+
+    num_tasks_per_node = 1
+
+    # --- MPI Binding ---
+    @run_before('run')
+    def set_mpi_binding(self):
+        self.job.launcher.options += [
+            '--nodes=2',
+            '--cpu-bind=verbose'
+        ]
+
+
+# ============================================================================
+# Test Case: core pair derived from the node topology (hwloc)
+# ============================================================================
+
+class OsuTopologyPlacementBase(OsuBwLatencyBenchmarkBase):
+    '''Binds the 2 ranks to a core pair derived from the node's lstopo XML.
+
+    There is one test per placement class, so no binding string has to be
+    written per node type. If the node type is in the topology cache, the
+    pair is chosen when the test is generated and classes the node type does
+    not have are skipped. Otherwise the job runs lstopo, caches the result
+    and fails early for a missing class.
+    '''
+
+    descr = 'OSU Pt2Pt: core pair derived from the hwloc topology'
+
+    placement = parameter(PLACEMENT_CLASSES, loggable=True)
+
+    # Module providing `lstopo`, loaded only if it is not already in PATH
+    hwloc_module = variable(str, value='system/hwloc')
+
+    @run_after('init')
+    def set_scenario(self):
+        self.scenario = self.placement
+
+    @run_after('setup')
+    def lookup_topology_cache(self):
+        '''Pick the core pair from the cache when the node type is known.'''
+        signature = processor_signature(self.current_partition.processor)
+        self.cached_pairs = lookup_pairs(signature, self.topology_cache_dir)
+        if self.cached_pairs is not None:
+            self.skip_if(self.placement not in self.cached_pairs,
+                         f'no {self.placement} core pair on this node type')
+
+    # --- MPI Binding ---
+    @run_before('run')
+    def set_mpi_binding(self):
+        if self.cached_pairs is not None:
+            cpu_pair = '{},{}'.format(*self.cached_pairs[self.placement])
+        else:
+            # Cache miss: discover the topology in the job and cache it
+            helper = f'PYTHONPATH={_TESTS_DIR} python3 -m'
+            self.prerun_cmds += [
+                f'command -v lstopo > /dev/null || module load {self.hwloc_module}',
+                'lstopo --of xml --no-io topology.xml',
+                f'{helper} osu_utils.topology_cache --cache-dir {self.topology_cache_dir} '
+                f'store topology.xml',
+                f'OSU_CPU_PAIR=$({helper} osu_utils.topology topology.xml '
+                f'{self.placement}) || exit 1'
+            ]
+            cpu_pair = '$OSU_CPU_PAIR'
+
+        self.job.launcher.options += [
+            f'--cpu-bind=verbose,map_cpu:{cpu_pair}',
+            '--mem-bind=local',
+        ]
+
+
+# ============================================================================
+# Packed run: every intranode placement inside one exclusive node allocation
+# ============================================================================
+
+class OsuPackedIntranodeBase(rfm.RunOnlyRegressionTest):
+    '''Runs all intranode placements and both benchmarks in a single job.
+
+    Each (scenario, benchmark) pair is a separate srun step writing to its own
+    output file and is reported as a `<scenario>_<metric>` perf variable.
+    '''
+
+    descr = 'OSU Pt2Pt: all intranode placements packed in one node allocation'
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks = 2
+    num_tasks_per_node = 2
+    num_cpus_per_task = 1
+    exclusive_access = True
+
+    references_file = variable(str, value=default_references_path())
+
+    # `<scenario>: host:cpus` and `<scenario>: class` of every run, as in the
+    # single-scenario tests
+    bound_cpus = variable(str, value='', loggable=True)
+    bound_placement = variable(str, value='', loggable=True)
+    topology_cache_dir = variable(str, value=default_cache_dir())
+
+    @run_after('setup')
+    def set_packed_runs(self):
+        '''Select the placements valid on this partition and their perf vars.'''
+        scenarios = intranode_placements(self.current_partition.fullname)
+        self.packed_runs = [
+            (scenario, exec_name, metric)
+            for scenario in scenarios for exec_name, metric in PT2PT_BENCHMARKS
+        ]
+        self.perf_variables = {
+            f'{scenario}_{metric}': sn.make_performance_function(
+                sn.extractsingle(rf'^{METRIC_SETTINGS[metric][0]}\s+(?P<metric_val>\S+)',
+                                 self.output_file(scenario, exec_name),
+                                 'metric_val', float),
+                unit=METRIC_SETTINGS[metric][1]
+            )
+            for scenario, exec_name, metric in self.packed_runs
+        }
+
+    def output_file(self, scenario, exec_name):
+        return f'{scenario}.{exec_name}.out'
+
+    @run_before('run')
+    def set_packed_commands(self):
+        '''Emit one srun step per run; the job itself only collects outputs.'''
+
+        if self.mpi_library() == 'openmpi':
+            self.env_vars['OMPI_MCA_hwloc_base_report_bindings'] = '1'
+
+        # The srun steps are written explicitly, so run the final `cat` locally
+        self.job.launcher = getlauncher('local')()
+        for scenario, exec_name, metric in self.packed_runs:
+            size = METRIC_SETTINGS[metric][0]
+            self.prerun_cmds.append(' '.join([
+                'srun', f'--ntasks={self.num_tasks}',
+                f'--cpus-per-task={self.num_cpus_per_task}',
+                *INTRANODE_PLACEMENTS[scenario],
+                self.osu_command(exec_name), '-m', f'{size}:{size}', '-x', '100', '-i', '1000',
+                '>', self.output_file(scenario, exec_name)
+            ]))
+
+        self.executable = 'cat'
+        self.executable_opts = [self.output_file(scenario, exec_name)
+                                for scenario, exec_name, _ in self.packed_runs]
+
+    @run_before('sanity')
+    def read_bindings(self):
+        '''Record where the ranks of every run were bound (one srun step each, in order).'''
+        if self.is_dry_run():
+            return
+
+        topology = partition_topology(self.current_partition.processor, self.topology_cache_dir)
+        with open(os.path.join(self.stagedir, sn.evaluate(self.stderr))) as fp:
+            placements = launch_placements(fp.read(), topology)
+
+        runs = list(zip([scenario for scenario, _, _ in self.packed_runs], placements))
+        self.bound_cpus = '; '.join(dict.fromkeys(f'{scenario}: {cpus}'
+                                                  for scenario, (cpus, _) in runs))
+        self.bound_placement = '; '.join(dict.fromkeys(f'{scenario}: {placement or "unknown"}'
+                                                       for scenario, (_, placement) in runs))
+        if len(placements) != len(self.packed_runs):
+            self.placement_error = (f'{len(placements)} binding reports for '
+                                    f'{len(self.packed_runs)} runs in the job stderr')
+        else:
+            errors = [f'{scenario}: {error}' for scenario, placement in runs
+                      for error in [placement_error([placement], scenario_classes(scenario))]
+                      if error]
+            self.placement_error = errors[0] if errors else None
+
+    @sanity_function
+    def validate_packed_runs(self):
+        '''Every packed run must have printed its row, with its ranks bound as expected.'''
+        return sn.all([
+            *[sn.assert_found(rf'^{METRIC_SETTINGS[metric][0]}\s+\S+',
+                              self.output_file(scenario, exec_name))
+              for scenario, exec_name, metric in self.packed_runs],
+            sn.assert_true(self.placement_error is None, msg=self.placement_error),
+        ])
+
+    @run_after('setup')
+    def set_references(self):
+        '''Judge each packed run against the references of its scenario.'''
+        references = {}
+        for scenario, exec_name, metric in self.packed_runs:
+            for sysenv, values in scenario_references(self.references_install_method(),
+                                                      scenario, exec_name,
+                                                      self.references_file).items():
+                if metric in values:
+                    references.setdefault(sysenv, {})[f'{scenario}_{metric}'] = values[metric]
+
+        self.reference = references
+
+
+# ============================================================================
+# Core-to-core latency matrix of one node
+# ============================================================================
+
+class OsuCoreLatencyMatrixBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Measures osu_latency between every pair of cores of one node.
+
+    osu_utils/core_matrix.py runs round-robin rounds of disjoint pairs, a few
+    pairs at a time, and writes the matrix (`core_matrix.f32`, described by
+    `core_matrix.json`) to the output directory of the test, as a fingerprint
+    of the node type. The median latency of each topology class on the node
+    is reported as `latency_<class>`, its slowest pair as `latency_<class>_max`.
+    '''
+
+    descr = 'OSU Pt2Pt: core-to-core latency matrix of a node'
+
+    # Every pair of cores for up to 1h: only loaded with `OSU_OPT_IN=sweep`
+    opt_in_group = 'sweep'
+    tags = {'sweep'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks = 2
+    num_tasks_per_node = 2
+    num_cpus_per_task = 1
+    exclusive_access = True
+    time_limit = '1h'
+
+    message_size = variable(int, value=8, loggable=True)
+
+    # Pairs launched at the same time (never two in the same L3 domain)
+    concurrency = variable(int, value=8)
+
+    # Also measure the SMT siblings of each core
+    all_pus = variable(bool, value=False)
+
+    # Launcher of one pair, `{a}` and `{b}` are replaced by its CPUs
+    pair_launcher = variable(str, value='srun --overlap --ntasks=2 --cpus-per-task=1 '
+                                        '--mem-bind=local --cpu-bind=map_cpu:{a},{b}')
+
+    # Module providing `lstopo`, loaded only if it is not already in PATH
+    hwloc_module = variable(str, value='system/hwloc')
+
+    scenario = variable(str, value='CoreMatrix', loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    keep_files = ['core_matrix.f32', 'core_matrix.json', 'topology.xml']
+
+    @run_before('run')
+    def set_matrix_command(self):
+        '''Run the driver locally, it launches one srun step per pair.'''
+        self.prerun_cmds += [
+            f'command -v lstopo > /dev/null || module load {self.hwloc_module}',
+            'lstopo --of xml --no-io topology.xml',
+        ]
+        self.job.launcher = getlauncher('local')()
+        self.executable = f'PYTHONPATH={_TESTS_DIR} python3'
+        self.executable_opts = [
+            '-m', 'osu_utils.core_matrix', '--topology', 'topology.xml',
+            '--size', str(self.message_size), '--concurrency', str(self.concurrency),
+            '--launcher', f'"{self.pair_launcher}"',
+            *(['--all-pus'] if self.all_pus else []),
+            '--', self.osu_command('osu_latency')
+        ]
+
+    @sanity_function
+    def validate_matrix(self):
+        return sn.all([
+            sn.assert_found(r'^# Matrix: ', self.stdout),
+            sn.assert_found(r'^# Failed pairs: 0$', self.stdout),
+        ])
+
+    @run_before('performance')
+    def set_class_perf_variables(self):
+        '''Report the topology classes found on the node.'''
+        self.perf_variables = {}
+        if self.is_dry_run():
+            return
+
+        with open(os.path.join(self.stagedir, 'core_matrix.json')) as fp:
+            classes = json.load(fp)['summary']
+
+        for name in classes:
+            for suffix, statistic in (('', 'median'), ('_max', 'max')):
+                self.perf_variables[f'latency_{name}{suffix}'] = sn.make_performance_function(
+                    sn.extractsingle(rf'^# Class {name} .*\b{statistic}=(\S+)',
+                                     self.stdout, 1, float),
+                    unit='us'
+                )
+
+    @run_after('setup')
+    def load_references(self):
+        self.reference = scenario_references(self.references_install_method(), self.scenario,
+                                             'osu_latency', self.references_file)
+
+
+# ============================================================================
+# Inter-node pair sweep over the nodes of one allocation
+# ============================================================================
+
+class OsuFabricPairSweepBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Measures inter-node pairs of one large allocation, round by round.
+
+    osu_utils/fabric_sweep.py pairs the `num_nodes` nodes of the job in
+    round-robin rounds of disjoint pairs and measures the pairs of a round
+    concurrently. Every pair is kept in `fabric_pairs.csv` with its robust
+    z-score. The median over the pairs is reported as `<metric>`, the tail as
+    `<metric>_p95` (`_p5` for bandwidths) and the number of pairs falling out
+    of the distribution as `<metric>_outliers`. The outlier pairs are marked
+    `OUTLIER` in the output.
+    '''
+
+    descr = 'OSU Pt2Pt: inter-node pair sweep over one allocation'
+
+    # 16 exclusive nodes: only loaded with `OSU_OPT_IN=sweep`
+    opt_in_group = 'sweep'
+    tags = {'sweep'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks_per_node = 1
+    num_cpus_per_task = 1
+    exclusive_access = True
+    time_limit = '30m'
+
+    num_nodes = variable(int, value=16, loggable=True)
+
+    # Rounds of disjoint pairs to run (0: all of them, every pair of nodes)
+    rounds = variable(int, value=0)
+
+    # Pairs launched at the same time (0: a whole round)
+    concurrency = variable(int, value=0)
+
+    # Robust z-score and relative deviation from the median of an outlier
+    z_threshold = variable(float, value=3.5)
+    min_deviation = variable(float, value=0.05)
+
+    # Launcher of one pair, `{a}` and `{b}` are replaced by its nodes
+    pair_launcher = variable(str, value='srun --overlap --nodes=2 --ntasks=2 '
+                                        '--ntasks-per-node=1 --cpus-per-task=1 '
+                                        '--nodelist={a},{b}')
+
+    scenario = variable(str, value='FabricSweep', loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    keep_files = ['fabric_pairs.csv']
+
+    @run_after('init')
+    def set_num_tasks(self):
+        self.num_tasks = self.num_nodes
+
+    @run_before('run')
+    def set_sweep_command(self):
+        '''Run the driver locally, it launches one srun step per pair.'''
+        self.job.launcher = getlauncher('local')()
+        self.executable = f'PYTHONPATH={_TESTS_DIR} python3'
+        self.executable_opts = [
+            '-m', 'osu_utils.fabric_sweep', '--launcher', f'"{self.pair_launcher}"',
+            '--concurrency', str(self.concurrency), '--z-threshold', str(self.z_threshold),
+            '--min-deviation', str(self.min_deviation),
+            *(['--rounds', str(self.rounds)] if self.rounds else []),
+        ]
+        for exec_name, metric in PT2PT_BENCHMARKS:
+            size = METRIC_SETTINGS[metric][0]
+            self.executable_opts += [
+                '--benchmark', f'{metric}:{size}:{self.osu_command(exec_name)}'
+            ]
+
+    @sanity_function
+    def validate_sweep(self):
+        return sn.all([
+            *[sn.assert_found(rf'^# Metric {metric} ', self.stdout)
+              for _, metric in PT2PT_BENCHMARKS],
+            sn.assert_found(r'^# Failed pairs: 0$', self.stdout),
+        ])
+
+    @run_after('setup')
+    def set_perf_variables(self):
+        self.perf_variables = {}
+        for _, metric in PT2PT_BENCHMARKS:
+            unit = METRIC_SETTINGS[metric][1]
+            tail = 'p5' if metric == 'bandwidth' else 'p95'
+            for name, statistic, stat_unit in ((metric, 'median', unit),
+                                                (f'{metric}_{tail}', tail, unit),
+                                                (f'{metric}_outliers', 'outliers', 'pairs')):
+                self.perf_variables[name] = sn.make_performance_function(
+                    sn.extractsingle(rf'^# Metric {metric} .*\b{statistic}=(\S+)',
+                                     self.stdout, 1, float),
+                    unit=stat_unit
+                )
+
+    @run_after('setup')
+    def set_references(self):
+        references = {}
+        for exec_name, _ in PT2PT_BENCHMARKS:
+            for sysenv, values in scenario_references(self.references_install_method(),
+                                                      self.scenario, exec_name,
+                                                      self.references_file).items():
+                references.setdefault(sysenv, {}).update(values)
+
+        self.reference = references
+
+
+# ============================================================================
+# Intranode health sweep over every node of a partition
+# ============================================================================
+
+class OsuPartitionHealthSweepBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Runs the intranode scenarios on every node of one large allocation.
+
+    The job takes all the idle nodes of the partition (flexible node
+    allocation, see `--flex-alloc-nodes`) and osu_utils/node_sweep.py runs
+    every intranode scenario and benchmark on all of them at once. Every
+    node is kept in `node_health.csv`. The median over the nodes is reported
+    as `<scenario>_<metric>`, judged against the references of the scenario,
+    and the number of nodes falling out of the distribution as
+    `<scenario>_<metric>_outliers`.
+    '''
+
+    descr = 'OSU Pt2Pt: intranode scenarios on every node of a partition'
+
+    # Takes the whole partition: only loaded with `OSU_OPT_IN=health`
+    opt_in_group = 'health'
+    tags = {'health'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks = 0
+    num_tasks_per_node = 2
+    num_cpus_per_task = 1
+    exclusive_access = True
+
+    # Nodes measured at the same time
+    concurrency = variable(int, value=64)
+
+    # Robust z-score and relative deviation from the median of an outlier
+    z_threshold = variable(float, value=3.5)
+    min_deviation = variable(float, value=0.05)
+
+    # Launcher of one node, `{node}` is replaced by its name
+    node_launcher = variable(str, value='srun --overlap --nodes=1 --ntasks=2 '
+                                        '--cpus-per-task=1 --nodelist={node}')
+
+    scenario = variable(str, value='PartitionHealth', loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    keep_files = ['node_health.csv']
+
+    @run_after('setup')
+    def set_sweep_runs(self):
+        '''Select the placements valid on this partition and their perf vars.'''
+        self.sweep_runs = [
+            (scenario, exec_name, metric)
+            for scenario in intranode_placements(self.current_partition.fullname)
+            for exec_name, metric in PT2PT_BENCHMARKS
+        ]
+        self.perf_variables = {}
+        for scenario, _, metric in self.sweep_runs:
+            for name, statistic, unit in ((f'{scenario}_{metric}', 'median',
+                                           METRIC_SETTINGS[metric][1]),
+                                          (f'{scenario}_{metric}_outliers', 'outliers',
+                                           'nodes')):
+                self.perf_variables[name] = sn.make_performance_function(
+                    sn.extractsingle(rf'^# Scenario {scenario} {metric} .*\b{statistic}=(\S+)',
+                                     self.stdout, 1, float),
+                    unit=unit
+                )
+
+    @run_before('run')
+    def set_sweep_command(self):
+        '''Run the driver locally, it launches one srun step per node.'''
+        self.job.launcher = getlauncher('local')()
+        self.executable = f'PYTHONPATH={_TESTS_DIR} python3'
+        self.executable_opts = [
+            '-m', 'osu_utils.node_sweep', '--partition', self.current_partition.fullname,
+            '--launcher', f'"{self.node_launcher}"', '--concurrency', str(self.concurrency),
+            '--z-threshold', str(self.z_threshold), '--min-deviation', str(self.min_deviation),
+        ]
+        for exec_name, metric in PT2PT_BENCHMARKS:
+            size = METRIC_SETTINGS[metric][0]
+            self.executable_opts += [
+                '--benchmark', f'{metric}:{size}:{self.osu_command(exec_name)}'
+            ]
+
+    @sanity_function
+    def validate_sweep(self):
+        '''Every node must have run every scenario.'''
+        return sn.all([
+            *[sn.assert_found(rf'^# Scenario {scenario} {metric} ', self.stdout)
+              for scenario, _, metric in self.sweep_runs],
+            sn.assert_found(r'^# Failed runs: 0$', self.stdout),
+        ])
+
+    @run_after('setup')
+    def set_references(self):
+        '''Judge the median of each scenario against the references of the scenario.'''
+        references = {}
+        for scenario, exec_name, metric in self.sweep_runs:
+            for sysenv, values in scenario_references(self.references_install_method(),
+                                                      scenario, exec_name,
+                                                      self.references_file).items():
+                if metric in values:
+                    references.setdefault(sysenv, {})[f'{scenario}_{metric}'] = values[metric]
+
+        self.reference = references
+
+
+# ============================================================================
+# Aggregate bandwidth and message rate versus concurrent pairs
+# ============================================================================
+
+class OsuMultiPairScalingBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Ramps the number of concurrent osu_mbw_mr pairs up to a full node.
+
+    osu_utils/pair_scaling.py launches osu_mbw_mr with 1, 2, 4... pairs, one
+    step each, either all on one node (`intranode`) or every pair between two
+    nodes (`internode`). The aggregate bandwidth (1 MiB messages) and message
+    rate (8 B messages) of the full node are reported as `bandwidth` and
+    `msgrate`; `bandwidth_knee` and `msgrate_knee` are the pair counts past
+    which adding pairs stops paying off, logged to follow contention.
+    '''
+
+    descr = 'OSU Pt2Pt: multi-pair bandwidth and message rate scaling'
+
+    # Up to a full node of pairs, on two nodes for `internode`: only loaded
+    # with `OSU_OPT_IN=scaling`
+    opt_in_group = 'scaling'
+    tags = {'scaling'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks = 2
+    num_cpus_per_task = 1
+    exclusive_access = True
+    time_limit = '30m'
+
+    layout = parameter(['intranode', 'internode'], loggable=True)
+
+    # Largest number of pairs (0: a full node)
+    max_pairs = variable(int, value=0)
+
+    benchmark_info = variable(str, value='osu_mbw_mr', loggable=True)
+    scenario = variable(str, loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    @run_after('init')
+    def set_layout(self):
+        self.num_tasks_per_node = 2 if self.layout == 'intranode' else 1
+        self.scenario = f'MultiPair{self.layout.capitalize()}'
+
+    @run_before('run')
+    def set_scaling_command(self):
+        '''Run the driver locally, it launches one srun step per pair count.'''
+        max_pairs = self.max_pairs
+        cores = self.current_partition.processor.num_cores
+        if not max_pairs and cores:
+            max_pairs = cores // 2 if self.layout == 'intranode' else cores
+
+        self.job.launcher = getlauncher('local')()
+        self.executable = f'PYTHONPATH={_TESTS_DIR} python3'
+        self.executable_opts = [
+            '-m', 'osu_utils.pair_scaling', '--layout', self.layout,
+            '--bandwidth-size', str(METRIC_SETTINGS['bandwidth'][0]), '--rate-size', '8',
+            *(['--max-pairs', str(max_pairs)] if max_pairs else []),
+            '--', self.osu_command(self.benchmark_info),
+        ]
+
+    @sanity_function
+    def validate_scaling(self):
+        return sn.all([
+            sn.assert_found(r'^# Full node: ', self.stdout),
+            sn.assert_found(r'^# Failed steps: 0$', self.stdout),
+        ])
+
+    @run_after('setup')
+    def set_perf_variables(self):
+        self.perf_variables = {}
+        for name, line, field, unit, conv in (
+                ('bandwidth', 'Full node', 'bandwidth', 'MB/s', float),
+                ('msgrate', 'Full node', 'msgrate', 'msg/s', float),
+                ('bandwidth_knee', 'Knee', 'bandwidth', 'pairs', int),
+                ('msgrate_knee', 'Knee', 'msgrate', 'pairs', int)):
+            self.perf_variables[name] = sn.make_performance_function(
+                sn.extractsingle(rf'^# {line}: .*\b{field}=(\S+)', self.stdout, 1, conv),
+                unit=unit
+            )
+
+    @run_after('setup')
+    def set_references(self):
+        self.reference = scenario_references(self.references_install_method(), self.scenario,
+                                             self.benchmark_info, self.references_file)
+
+
+# ============================================================================
+# Collective latency versus node count
+# ============================================================================
+
+class OsuCollectiveScalingBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Runs one collective benchmark on 1, 2, 4, 8... full nodes.
+
+    Every case fills `num_nodes` exclusive nodes with one rank per core and
+    reports the average latency of each representative message size as
+    `latency_<size>`. The references are kept per scale (scenario
+    `Collective<N>Nodes`), so a change in the algorithm selection or tuning
+    of Open MPI's coll components shows at the sizes and scales it affects.
+    '''
+
+    descr = 'OSU Collective: latency versus node count'
+
+    # Up to 8 exclusive nodes: only loaded with `OSU_OPT_IN=scaling`
+    opt_in_group = 'scaling'
+    tags = {'scaling'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_cpus_per_task = 1
+    exclusive_access = True
+    time_limit = '30m'
+
+    benchmark_info = parameter(list(COLLECTIVE_BENCHMARKS), loggable=True)
+    num_nodes = parameter([1, 2, 4, 8], loggable=True)
+
+    # Ranks per node (0: one per core of the partition's processor)
+    tasks_per_node = variable(int, value=0)
+
+    scenario = variable(str, loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    @run_after('init')
+    def set_scenario(self):
+        self.scenario = f'Collective{self.num_nodes}Nodes'
+        self.message_sizes = COLLECTIVE_BENCHMARKS[self.benchmark_info]
+
+    @run_after('setup')
+    def set_num_tasks(self):
+        '''Fill the nodes, one rank per core unless `tasks_per_node` is set.'''
+        if not self.tasks_per_node:
+            self.skip_if_no_procinfo()
+            self.tasks_per_node = self.current_partition.processor.num_cores
+
+        self.num_tasks_per_node = self.tasks_per_node
+        self.num_tasks = self.num_nodes * self.tasks_per_node
+
+    @run_before('run')
+    def set_executable(self):
+        self.executable = self.osu_command(self.benchmark_info)
+        self.executable_opts = ['-m', f'{self.message_sizes[0]}:{self.message_sizes[-1]}']
+        self.job.launcher.options += ['--cpu-bind=cores']
+
+    @sanity_function
+    def validate_sizes(self):
+        return sn.all([sn.assert_found(rf'^{size}\s+\S+', self.stdout)
+                       for size in self.message_sizes])
+
+    @run_after('setup')
+    def set_perf_variables(self):
+        self.perf_variables = {
+            f'latency_{size}': sn.make_performance_function(
+                sn.extractsingle(rf'^{size}\s+(\S+)', self.stdout, 1, float), unit='us'
+            )
+            for size in self.message_sizes
+        }
+
+    @run_after('setup')
+    def set_references(self):
+        self.reference = scenario_references(self.references_install_method(), self.scenario,
+                                             self.benchmark_info, self.references_file)
+
+
+# ============================================================================
+# Multi-threaded latency (MPI_THREAD_MULTIPLE) versus threads per rank
+# ============================================================================
+
+class OsuMultiThreadLatencyBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Runs osu_latency_mt with 1, 2, 4... threads on each of the two ranks.
+
+    osu_latency_mt initialises MPI with MPI_THREAD_MULTIPLE and ping-pongs
+    from `num_threads` sender threads to as many receiver threads. Each rank
+    gets one core per thread. The two ranks share a node (`intranode`) or
+    not (`internode`). The latency of each size is reported as
+    `latency_<size>`, with references per layout and thread count
+    (scenario `<Layout><N>Threads`), so the locking overhead of a rebuilt
+    MPI shows at the thread counts it affects. OSU 7.2 has no
+    multi-threaded bandwidth benchmark.
+    '''
+
+    descr = 'OSU Pt2Pt: MPI_THREAD_MULTIPLE latency versus threads per rank'
+
+    # Ten cases, on two nodes for `internode`: only loaded with
+    # `OSU_OPT_IN=scaling`
+    opt_in_group = 'scaling'
+    tags = {'scaling'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_tasks = 2
+    exclusive_access = True
+
+    benchmark_info = variable(str, value='osu_latency_mt', loggable=True)
+    layout = parameter(['intranode', 'internode'], loggable=True)
+    num_threads = parameter([1, 2, 4, 8, 16], loggable=True)
+
+    scenario = variable(str, loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    @run_after('init')
+    def set_layout(self):
+        self.scenario = f'{self.layout.capitalize()}{self.num_threads}Threads'
+        self.num_tasks_per_node = 2 if self.layout == 'intranode' else 1
+        self.num_cpus_per_task = self.num_threads
+
+    @run_after('setup')
+    def check_cores(self):
+        '''Skip the thread counts the node has not enough cores for.'''
+        cores = self.current_partition.processor.num_cores
+        self.skip_if(cores and self.num_tasks_per_node * self.num_threads > cores,
+                     f'{self.num_tasks_per_node} x {self.num_threads} threads '
+                     f'do not fit on {cores} cores')
+
+    @run_before('run')
+    def set_executable(self):
+        self.executable = self.osu_command(self.benchmark_info)
+        self.executable_opts = [
+            '-t', f'{self.num_threads}:{self.num_threads}',
+            '-m', f'{MULTI_THREAD_SIZES[0]}:{MULTI_THREAD_SIZES[-1]}', '-x', '100', '-i', '1000'
+        ]
+        # One core per thread, the threads of a rank on neighbouring cores
+        self.job.launcher.options += ['--cpu-bind=cores', '--distribution=block:block']
+
+    @sanity_function
+    def validate_sizes(self):
+        return sn.all([sn.assert_found(rf'^{size}\s+\S+', self.stdout)
+                       for size in MULTI_THREAD_SIZES])
+
+    @run_after('setup')
+    def set_perf_variables(self):
+        self.perf_variables = {
+            f'latency_{size}': sn.make_performance_function(
+                sn.extractsingle(rf'^{size}\s+(\S+)', self.stdout, 1, float), unit='us'
+            )
+            for size in MULTI_THREAD_SIZES
+        }
+
+    @run_after('setup')
+    def set_references(self):
+        self.reference = scenario_references(self.references_install_method(), self.scenario,
+                                             self.benchmark_info, self.references_file)
+
+
+# ============================================================================
+# Communication/computation overlap of non-blocking collectives
+# ============================================================================
+
+class OsuNonBlockingOverlapBase(OsuOptIn, rfm.RunOnlyRegressionTest):
+    '''Runs one non-blocking collective benchmark on 1, 2, 4, 8... full nodes.
+
+    The OSU non-blocking benchmarks time the collective alone (pure
+    communication), then posted around a compute phase as long as it. For
+    each representative size the pure communication time is reported as
+    `comm_<size>` and the share of it hidden behind the compute phase as
+    `overlap_<size>` (in %, higher is better). The overlap depends on
+    whether the MPI library progresses the collective asynchronously, so a
+    rebuild that loses asynchronous progress shows as an overlap regression.
+    '''
+
+    descr = 'OSU Collective: non-blocking overlap versus node count'
+
+    # Up to 8 exclusive nodes: only loaded with `OSU_OPT_IN=scaling`
+    opt_in_group = 'scaling'
+    tags = {'scaling'}
+
+    valid_systems = ['*']
+    valid_prog_environs = ['*']
+    num_cpus_per_task = 1
+    exclusive_access = True
+    time_limit = '30m'
+
+    benchmark_info = parameter(list(NONBLOCKING_BENCHMARKS), loggable=True)
+    num_nodes = parameter([1, 2, 4, 8], loggable=True)
+
+    # Ranks per node (0: one per core of the partition's processor)
+    tasks_per_node = variable(int, value=0)
+
+    scenario = variable(str, loggable=True)
+    references_file = variable(str, value=default_references_path())
+
+    @run_after('init')
+    def set_scenario(self):
+        self.scenario = f'Collective{self.num_nodes}Nodes'
+        self.message_sizes = NONBLOCKING_BENCHMARKS[self.benchmark_info]
+
+    @run_after('setup')
+    def set_num_tasks(self):
+        '''Fill the nodes, one rank per core unless `tasks_per_node` is set.'''
+        if not self.tasks_per_node:
+            self.skip_if_no_procinfo()
+            self.tasks_per_node = self.current_partition.processor.num_cores
+
+        self.num_tasks_per_node = self.tasks_per_node
+        self.num_tasks = self.num_nodes * self.tasks_per_node
+
+    @run_before('run')
+    def set_executable(self):
+        self.executable = self.osu_command(self.benchmark_info)
+        self.executable_opts = ['-m', f'{self.message_sizes[0]}:{self.message_sizes[-1]}']
+        self.job.launcher.options += ['--cpu-bind=cores']
+
+    def _row_regex(self, size):
+        # Size, Overall(us), Compute(us), Pure Comm.(us), Overlap(%)
+        return rf'^{size}\s+\S+\s+\S+\s+(?P<comm>\S+)\s+(?P<overlap>\S+)'
+
+    @sanity_function
+    def validate_sizes(self):
+        return sn.all([sn.assert_found(self._row_regex(size), self.stdout)
+                       for size in self.message_sizes])
+
+    @run_after('setup')
+    def set_perf_variables(self):
+        self.perf_variables = {}
+        for size in self.message_sizes:
+            self.perf_variables[f'comm_{size}'] = sn.make_performance_function(
+                sn.extractsingle(self._row_regex(size), self.stdout, 'comm', float), unit='us'
+            )
+            self.perf_variables[f'overlap_{size}'] = sn.make_performance_function(
+                sn.extractsingle(self._row_regex(size), self.stdout, 'overlap', float), unit='%'
+            )
+
+    @run_after('setup')
+    def set_references(self):
+        self.reference = scenario_references(self.references_install_method(), self.scenario,
+                                             self.benchmark_info, self.references_file)
@@ -0,0 +1,206 @@
+'''Core-to-core latency matrix of a node.
+
+Measures osu_latency between every pair of cores of an exclusively
+allocated node. The pairs are scheduled as round-robin rounds of disjoint
+pairs (see `pairing.py`) and the pairs of a round run concurrently, in waves
+of at most `--concurrency` launches that never share an L3 domain (or a NUMA
+node when the L3 is unknown), so that concurrent pairs do not compete for
+the same cache.
+
+    lstopo --of xml --no-io topology.xml
+    python3 -m osu_utils.core_matrix --topology topology.xml --size 8 \
+        --concurrency 8 --launcher "srun --overlap --ntasks=2 --cpu-bind=map_cpu:{a},{b}" \
+        -- osu_latency
+
+The launcher is a template: `{a}` and `{b}` are replaced by the PU os
+indices of the pair. The matrix is written as raw float32 values in row-major
+order (`<output>.f32`, NaN on the diagonal and for failed pairs), described
+by `<output>.json` together with a summary per topology class:
+
+    import json, numpy as np
+    meta = json.load(open('core_matrix.json'))
+    matrix = np.fromfile(meta['file'], dtype=meta['dtype']).reshape(meta['shape'])
+
+The summary is also printed, one line per class:
+
+    # Class SameL3 pairs=448 min=0.21 median=0.25 p95=0.30 max=0.41
+'''
+
+import argparse
+import array
+import json
+import math
+import os
+import re
+import socket
+import sys
+
+from osu_utils.pairing import round_robin, run_concurrently, waves
+from osu_utils.stats import median, percentile
+from osu_utils.topology import PLACEMENT_CLASSES, cpu_pair_class, parse_lstopo_xml
+
+# Topology classes of the summary, closest first
+MATRIX_CLASSES = ['SameCore'] + PLACEMENT_CLASSES
+
+
+def matrix_cpus(topology, all_pus=False):
+    '''PU os indices measured: the first PU of every core, or all of them.'''
+    cpus = []
+    for core in topology['cores']:
+        cpus += core['pus'] if all_pus else core['pus'][:1]
+
+    return sorted(cpus)
+
+
+def cache_domains(topology):
+    '''Map each PU os index to the domain concurrent pairs must not share.'''
+    domains = {}
+    for core in topology['cores']:
+        for level in ('l3', 'numa', 'package'):
+            if core[level] is not None:
+                domain = (level, core[level])
+                break
+        else:
+            domain = ('core', tuple(core['pus']))
+
+        for pu in core['pus']:
+            domains[pu] = domain
+
+    return domains
+
+
+def parse_value(output, size):
+    match = re.search(rf'^{size}\s+(\S+)', output, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def measure(cpus, domains, command, size, concurrency, log=sys.stdout):
+    '''Latency of every pair as {(a, b): value or None}.'''
+    results = {}
+    rounds = round_robin(cpus)
+    for number, pairs in enumerate(rounds, start=1):
+        round_waves = waves(pairs, concurrency,
+                            lambda pair: (domains[pair[0]], domains[pair[1]]))
+        print(f'# Round {number}/{len(rounds)}: {len(pairs)} pairs in '
+              f'{len(round_waves)} waves', file=log, flush=True)
+        for wave in round_waves:
+            outputs = run_concurrently([command.format(a=a, b=b) for a, b in wave])
+            for pair, (returncode, output) in zip(wave, outputs):
+                value = parse_value(output, size) if returncode == 0 else None
+                if value is None:
+                    print(f'# Pair {pair[0]},{pair[1]} failed:', file=log)
+                    log.write(''.join(f'# | {line}\n' for line in output.splitlines()))
+
+                results[pair] = value
+
+    return results
+
+
+def class_summary(topology, results):
+    '''Statistics of the measured pairs of each topology class.'''
+    by_class = {}
+    for (cpu_a, cpu_b), value in results.items():
+        if value is not None:
+            by_class.setdefault(cpu_pair_class(topology, cpu_a, cpu_b), []).append(value)
+
+    return {
+        name: {
+            'pairs': len(by_class[name]),
+            'min': min(by_class[name]),
+            'median': median(by_class[name]),
+            'p95': percentile(by_class[name], 95),
+            'max': max(by_class[name]),
+        }
+        for name in MATRIX_CLASSES if name in by_class
+    }
+
+
+def write_matrix(output, cpus, results, metadata):
+    '''Write `<output>.f32` and `<output>.json`; returns the metadata.'''
+    index = {cpu: i for i, cpu in enumerate(cpus)}
+    matrix = array.array('f', [math.nan] * (len(cpus) * len(cpus)))
+    for (cpu_a, cpu_b), value in results.items():
+        if value is not None:
+            i, j = index[cpu_a], index[cpu_b]
+            matrix[i * len(cpus) + j] = matrix[j * len(cpus) + i] = value
+
+    with open(output + '.f32', 'wb') as fp:
+        matrix.tofile(fp)
+
+    metadata = dict(metadata,
+                    file=os.path.basename(output) + '.f32',
+                    dtype=('<' if sys.byteorder == 'little' else '>') + 'f4',
+                    shape=[len(cpus), len(cpus)],
+                    cpus=cpus)
+    with open(output + '.json', 'w') as fp:
+        json.dump(metadata, fp, indent=2)
+
+    return metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Measure the latency between every pair of cores of a node')
+    parser.add_argument('--topology', default='topology.xml',
+                        help='output of `lstopo --of xml` (default: %(default)s)')
+    parser.add_argument('--size', type=int, default=8, help='message size')
+    parser.add_argument('--launcher',
+                        default='srun --overlap --ntasks=2 --cpu-bind=map_cpu:{a},{b}',
+                        help='launcher of one pair, `{a}`/`{b}` are its PUs')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='pairs measured at the same time (default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--all-pus', action='store_true',
+                        help='also measure the SMT siblings of each core')
+    parser.add_argument('--output', default='core_matrix',
+                        help='path of the artifacts, without extension')
+    parser.add_argument('benchmark', nargs=argparse.REMAINDER,
+                        help='benchmark command, after `--`')
+    args = parser.parse_args(argv)
+
+    benchmark = [arg for arg in args.benchmark if arg != '--']
+    if not benchmark:
+        parser.error('no benchmark command given')
+
+    if args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+
+    topology = parse_lstopo_xml(args.topology)
+    cpus = matrix_cpus(topology, args.all_pus)
+    if len(cpus) < 2:
+        print(f'{args.topology}: less than 2 CPUs to pair', file=sys.stderr)
+        return 1
+
+    command = ' '.join([args.launcher] + benchmark + [
+        '-m', f'{args.size}:{args.size}', '-x', str(args.warmup),
+        '-i', str(args.iterations)
+    ])
+    results = measure(cpus, cache_domains(topology), command, args.size,
+                      args.concurrency)
+    summary = class_summary(topology, results)
+    failed = sum(1 for value in results.values() if value is None)
+    metadata = write_matrix(args.output, cpus, results, {
+        'hostname': socket.gethostname(),
+        'cpu_model': topology['cpu_model'],
+        'benchmark': os.path.basename(benchmark[0]),
+        'message_size': args.size,
+        'iterations': args.iterations,
+        'concurrency': args.concurrency,
+        'unit': 'us',
+        'failed_pairs': failed,
+        'summary': summary,
+    })
+
+    print('# Matrix: {file} ({0}x{1} {dtype})'.format(*metadata['shape'], **metadata))
+    for name, stats in summary.items():
+        print(f'# Class {name} pairs={stats["pairs"]} min={stats["min"]:.2f} '
+              f'median={stats["median"]:.2f} p95={stats["p95"]:.2f} '
+              f'max={stats["max"]:.2f}')
+
+    print(f'# Failed pairs: {failed}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
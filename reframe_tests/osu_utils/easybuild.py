@@ -0,0 +1,124 @@
+'''Reuse of EasyBuild installations across ReFrame sessions.
+
+When an easyconfig is installed into a persistent prefix, a stamp holding a
+checksum of the easyconfig and of the toolchain modules it was built with is
+written next to the installation once the build succeeded:
+
+    <prefix>/software/<module name>/.osu-regression.sha256
+
+An installation is reused only if its module file exists and its stamp
+matches the current easyconfig and toolchain.
+
+The module name depends on the naming scheme EasyBuild is configured with,
+e.g. `OSU-Micro-Benchmarks/7.2-foss-2023b` with the default EasyBuildMNS, or
+`tools/OSU-Micro-Benchmarks/7.2-foss-2023b` with a categorized scheme. It is
+taken from `eb --dry-run`, so it follows the site configuration.
+'''
+
+import ast
+import hashlib
+import json
+import os
+import re
+import subprocess
+
+# `eb --dry-run` lists every easyconfig with the module it installs:
+#   * [ ] $CFGS/o/OSU-Micro-Benchmarks/OSU-Micro-Benchmarks-7.2-foss-2023b.eb (module: ...)
+_DRY_RUN_REGEX = re.compile(
+    r'^\s*\*\s+\[.\]\s+(?P<path>\S+)\s+\(module:\s+(?P<module>[^)\s]+)\)', re.MULTILINE
+)
+
+STAMP_NAME = '.osu-regression.sha256'
+
+
+def _easyconfig_params(easyconfig):
+    '''Literal top-level assignments of an easyconfig file.'''
+    with open(easyconfig) as fp:
+        tree = ast.parse(fp.read(), easyconfig)
+
+    params = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+
+        target = node.targets[0]
+        if isinstance(target, ast.Name):
+            try:
+                params[target.id] = ast.literal_eval(node.value)
+            except ValueError:
+                # Values built from EasyBuild constants (e.g. SOURCELOWER_TAR_GZ)
+                pass
+
+    return params
+
+
+def easyconfig_module(easyconfig):
+    '''Module name EasyBuildMNS generates for an easyconfig, e.g. `OSU/7.2-foss-2023b`.'''
+    params = _easyconfig_params(easyconfig)
+    toolchain = params.get('toolchain', {})
+    version = params['version']
+    if toolchain and toolchain.get('name') != 'system':
+        version += f'-{toolchain["name"]}-{toolchain["version"]}'
+
+    return f'{params["name"]}/{version}{params.get("versionsuffix", "")}'
+
+
+def dry_run_module(output, easyconfig):
+    '''Module name of `easyconfig` in the output of `eb --dry-run`, or None.'''
+    name = os.path.basename(easyconfig)
+    for match in _DRY_RUN_REGEX.finditer(output):
+        if os.path.basename(match.group('path')) == name:
+            return match.group('module')
+
+    return None
+
+
+def eb_module(easyconfig):
+    '''Module name eb gives an easyconfig with the configured naming scheme.
+
+    Falls back to the EasyBuildMNS name when eb is not available.
+    '''
+    try:
+        proc = subprocess.run(['eb', '--dry-run', easyconfig], stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, universal_newlines=True)
+    except OSError:
+        return easyconfig_module(easyconfig)
+
+    return dry_run_module(proc.stdout, easyconfig) or easyconfig_module(easyconfig)
+
+
+def easyconfig_digest(easyconfig, toolchain_modules):
+    '''Checksum of an easyconfig and of the toolchain modules it is built with.'''
+    digest = hashlib.sha256()
+    with open(easyconfig, 'rb') as fp:
+        digest.update(fp.read())
+
+    digest.update(json.dumps(list(toolchain_modules)).encode())
+    return digest.hexdigest()
+
+
+def stamp_path(prefix, module_name):
+    return os.path.join(prefix, 'software', module_name, STAMP_NAME)
+
+
+def installed_module(prefix, easyconfig, toolchain_modules, module_name=None):
+    '''Name of a matching module installed in `prefix`, or None.
+
+    EasyBuild writes every module under `modules/all`, whatever the naming
+    scheme; `module_name` defaults to the name eb gives the easyconfig.
+    '''
+    module_name = module_name or eb_module(easyconfig)
+    module_file = os.path.join(prefix, 'modules', 'all', module_name)
+    if not (os.path.isfile(module_file) or os.path.isfile(module_file + '.lua')):
+        return None
+
+    try:
+        with open(stamp_path(prefix, module_name)) as fp:
+            stamp = fp.read().strip()
+    except OSError:
+        return None
+
+    if stamp != easyconfig_digest(easyconfig, toolchain_modules):
+        return None
+
+    return module_name
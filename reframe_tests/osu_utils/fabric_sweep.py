@@ -0,0 +1,126 @@
+'''Inter-node pair sweep over the nodes of one Slurm allocation.
+
+The nodes of the job are paired in round-robin rounds of disjoint pairs
+(see `pairing.py`). The pairs of a round are measured concurrently, one
+`srun --overlap` step per pair and benchmark, so checking every link between
+N nodes takes N-1 rounds in a single job:
+
+    python3 -m osu_utils.fabric_sweep --rounds 4 \
+        --benchmark latency:8192:osu_latency --benchmark bandwidth:1048576:osu_bw
+
+Every pair is printed and written to `--output` (CSV), with its robust z-score
+in its metric (distance to the median of all pairs, in MAD-based standard
+deviations). A pair is an outlier when it is worse than the median by more
+than `--z-threshold` and by more than `--min-deviation` (relative):
+
+    latency aion-0064 aion-0321 0.57 0.41
+    latency aion-0313 aion-0314 1.93 27.3 OUTLIER
+    # Metric latency pairs=120 median=0.55 p5=0.52 p95=0.61 outliers=1
+'''
+
+import argparse
+import csv
+import re
+import subprocess
+import sys
+
+from osu_utils.pairing import round_robin, run_concurrently, waves
+from osu_utils.stats import median, outlier_flags, percentile
+
+PAIR_FIELDS = ['metric', 'node_a', 'node_b', 'value', 'robust_z', 'outlier']
+
+
+def job_nodes():
+    '''Host names of the nodes of the current Slurm job.'''
+    output = subprocess.check_output(['scontrol', 'show', 'hostnames'],
+                                     universal_newlines=True)
+    return output.split()
+
+
+def parse_benchmark(spec):
+    '''`metric:size:command` of a `--benchmark` option.'''
+    metric, size, command = spec.split(':', 2)
+    return metric, int(size), command
+
+
+def parse_value(output, size):
+    match = re.search(rf'^{size}\s+(\S+)', output, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def measure(nodes, benchmarks, launcher, rounds=None, concurrency=0, log=sys.stdout):
+    '''Values of every measured pair as {metric: {(node_a, node_b): value or None}}.'''
+    results = {metric: {} for metric, _, _ in benchmarks}
+    schedule = round_robin(nodes)[:rounds]
+    for number, pairs in enumerate(schedule, start=1):
+        print(f'# Round {number}/{len(schedule)}: {len(pairs)} pairs', file=log, flush=True)
+        for metric, size, command in benchmarks:
+            for wave in waves(pairs, concurrency):
+                outputs = run_concurrently([
+                    f'{launcher.format(a=a, b=b)} {command} -m {size}:{size}'
+                    for a, b in wave
+                ])
+                for pair, (returncode, output) in zip(wave, outputs):
+                    value = parse_value(output, size) if returncode == 0 else None
+                    if value is None:
+                        print(f'# Pair {pair[0]},{pair[1]} failed {metric}:', file=log)
+                        log.write(''.join(f'# | {line}\n' for line in output.splitlines()))
+
+                    results[metric][pair] = value
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Measure node pairs of a Slurm job in rounds of disjoint pairs')
+    parser.add_argument('--benchmark', action='append', type=parse_benchmark,
+                        required=True, metavar='METRIC:SIZE:COMMAND',
+                        help='benchmark to run on every pair (repeatable)')
+    parser.add_argument('--nodes', nargs='+',
+                        help='nodes to pair (default: the nodes of the Slurm job)')
+    parser.add_argument('--launcher',
+                        default='srun --overlap --nodes=2 --ntasks=2 --ntasks-per-node=1 '
+                                '--nodelist={a},{b}',
+                        help='launcher of one pair, `{a}`/`{b}` are its nodes')
+    parser.add_argument('--rounds', type=int,
+                        help='stop after N rounds (default: all the pairs)')
+    parser.add_argument('--concurrency', type=int, default=0,
+                        help='pairs measured at the same time (default: a whole round)')
+    parser.add_argument('--z-threshold', type=float, default=3.5)
+    parser.add_argument('--min-deviation', type=float, default=0.05)
+    parser.add_argument('--output', default='fabric_pairs.csv')
+    args = parser.parse_args(argv)
+
+    nodes = args.nodes or job_nodes()
+    if len(nodes) < 2:
+        print('less than 2 nodes to pair', file=sys.stderr)
+        return 1
+
+    results = measure(nodes, args.benchmark, args.launcher, args.rounds, args.concurrency)
+    with open(args.output, 'w', newline='') as fp:
+        writer = csv.writer(fp)
+        writer.writerow(PAIR_FIELDS)
+        for metric, pairs in results.items():
+            measured = [(pair, value) for pair, value in pairs.items() if value is not None]
+            if not measured:
+                continue
+
+            values = [value for _, value in measured]
+            flags = outlier_flags(metric, values, args.z_threshold, args.min_deviation)
+            for ((node_a, node_b), value), (score, outlier) in zip(measured, flags):
+                writer.writerow([metric, node_a, node_b, value, f'{score:.2f}', int(outlier)])
+                print(f'{metric} {node_a} {node_b} {value} {score:.2f}'
+                      f'{" OUTLIER" if outlier else ""}')
+
+            print(f'# Metric {metric} pairs={len(values)} median={median(values):.2f} '
+                  f'p5={percentile(values, 5):.2f} p95={percentile(values, 95):.2f} '
+                  f'outliers={sum(outlier for _, outlier in flags)}')
+
+    failed = sum(value is None for pairs in results.values() for value in pairs.values())
+    print(f'# Failed pairs: {failed}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
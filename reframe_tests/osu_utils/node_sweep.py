@@ -0,0 +1,119 @@
+'''Intranode health sweep over every node of one Slurm allocation.
+
+Runs the intranode placement scenarios of the partition (see `placements.py`)
+on all the nodes of the job. Every (scenario, benchmark) step is launched on
+all the nodes at once, one `srun --overlap` step per node and at most
+`--concurrency` at a time, so a whole partition is validated in one job:
+
+    python3 -m osu_utils.node_sweep --partition aion:batch \
+        --benchmark latency:8192:osu_latency --benchmark bandwidth:1048576:osu_bw
+
+The value of every node is written to `--output` (CSV) with its robust
+z-score among the nodes (see `stats.outlier_flags`). The output is a
+compact summary:
+
+    # Scenario SameNumaNode latency nodes=318 median=0.57 p5=0.55 p95=0.60 outliers=0
+    # Scenario DifferentSockets bandwidth nodes=318 median=13102.40 p5=12650.10 p95=13870.00 outliers=1
+    # Slow node aion-0270: DifferentSockets/bandwidth
+    # Failed runs: 0
+
+Outside of a Slurm job, put `reframe_tests/slurm_standin` first in PATH to
+run the sweep against stand-in `srun`/`scontrol` commands and benchmarks.
+'''
+
+import argparse
+import csv
+import sys
+
+from osu_utils.fabric_sweep import job_nodes, parse_benchmark, parse_value
+from osu_utils.pairing import run_concurrently, waves
+from osu_utils.placements import INTRANODE_PLACEMENTS, intranode_placements
+from osu_utils.stats import median, outlier_flags, percentile
+
+NODE_FIELDS = ['node', 'scenario', 'metric', 'value', 'robust_z', 'outlier']
+
+
+def measure(nodes, steps, launcher, concurrency=64, log=sys.stdout):
+    '''Values of every step as {(scenario, metric): {node: value or None}}.'''
+    results = {}
+    for scenario, metric, size, command in steps:
+        print(f'# Step {scenario} {metric}: {len(nodes)} nodes', file=log, flush=True)
+        options = ' '.join(INTRANODE_PLACEMENTS[scenario])
+        values = results[scenario, metric] = {}
+        for wave in waves(nodes, concurrency):
+            outputs = run_concurrently([
+                f'{launcher.format(node=node)} {options} {command} '
+                f'-m {size}:{size} -x 100 -i 1000'
+                for node in wave
+            ])
+            for node, (returncode, output) in zip(wave, outputs):
+                value = parse_value(output, size) if returncode == 0 else None
+                if value is None:
+                    print(f'# Node {node} failed {scenario} {metric}:', file=log)
+                    log.write(''.join(f'# | {line}\n' for line in output.splitlines()))
+
+                values[node] = value
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Run the intranode scenarios on every node of a Slurm job')
+    parser.add_argument('--partition', required=True,
+                        help='system:partition, selects the valid scenarios')
+    parser.add_argument('--benchmark', action='append', type=parse_benchmark,
+                        required=True, metavar='METRIC:SIZE:COMMAND',
+                        help='benchmark to run in every scenario (repeatable)')
+    parser.add_argument('--nodes', nargs='+',
+                        help='nodes to check (default: the nodes of the Slurm job)')
+    parser.add_argument('--launcher',
+                        default='srun --overlap --nodes=1 --ntasks=2 --cpus-per-task=1 '
+                                '--nodelist={node}',
+                        help='launcher of one node, `{node}` is its name')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='nodes measured at the same time (default: %(default)s)')
+    parser.add_argument('--z-threshold', type=float, default=3.5)
+    parser.add_argument('--min-deviation', type=float, default=0.05)
+    parser.add_argument('--output', default='node_health.csv')
+    args = parser.parse_args(argv)
+
+    nodes = args.nodes or job_nodes()
+    steps = [(scenario, metric, size, command)
+             for scenario in intranode_placements(args.partition)
+             for metric, size, command in args.benchmark]
+    results = measure(nodes, steps, args.launcher, args.concurrency)
+
+    slow_nodes = {}
+    with open(args.output, 'w', newline='') as fp:
+        writer = csv.writer(fp)
+        writer.writerow(NODE_FIELDS)
+        for (scenario, metric), values in results.items():
+            measured = [(node, value) for node, value in values.items() if value is not None]
+            if not measured:
+                continue
+
+            flags = outlier_flags(metric, [value for _, value in measured],
+                                  args.z_threshold, args.min_deviation)
+            for (node, value), (score, outlier) in zip(measured, flags):
+                writer.writerow([node, scenario, metric, value, f'{score:.2f}', int(outlier)])
+                if outlier:
+                    slow_nodes.setdefault(node, []).append(f'{scenario}/{metric}')
+
+            measured_values = [value for _, value in measured]
+            print(f'# Scenario {scenario} {metric} nodes={len(measured)} '
+                  f'median={median(measured_values):.2f} '
+                  f'p5={percentile(measured_values, 5):.2f} '
+                  f'p95={percentile(measured_values, 95):.2f} '
+                  f'outliers={sum(outlier for _, outlier in flags)}')
+
+    for node, runs in sorted(slow_nodes.items()):
+        print(f'# Slow node {node}: {" ".join(runs)}')
+
+    failed = sum(value is None for values in results.values() for value in values.values())
+    print(f'# Failed runs: {failed}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
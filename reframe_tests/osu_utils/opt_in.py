@@ -0,0 +1,34 @@
+'''Test families left out of the regular runs.
+
+Some families take a whole partition or run for up to an hour, so a plain
+`reframe -c reframe_tests/ -r` must not submit them. Their tests are only
+loaded when their group is named in `OSU_OPT_IN` (comma-separated):
+
+    OSU_OPT_IN=health,sweep reframe ...
+
+The group is also the tag of the tests, so `--tag` still narrows a run down
+to them once they are loaded.
+'''
+
+import os
+
+# Opt-in groups and the families they hold
+OPT_IN_GROUPS = {
+    'health': 'the intranode health sweep over a whole partition',
+    'sweep': 'the all-pairs sweeps, up to an hour each',
+    'scaling': 'the scaling tests, up to a full node of pairs or 8 nodes',
+}
+
+
+def selected_groups(value=None):
+    '''The groups named in `OSU_OPT_IN`.'''
+    if value is None:
+        value = os.environ.get('OSU_OPT_IN', '')
+
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in OPT_IN_GROUPS]
+    if unknown:
+        raise ValueError(f'unknown opt-in group(s) {", ".join(unknown)} '
+                         f'(known: {", ".join(OPT_IN_GROUPS)})')
+
+    return set(names)
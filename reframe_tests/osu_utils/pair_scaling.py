@@ -0,0 +1,135 @@
+'''Aggregate bandwidth and message rate of osu_mbw_mr versus concurrent pairs.
+
+osu_mbw_mr pairs rank i with rank i + N/2. With a block distribution the
+pairs either live on one node (`intranode`, 2N ranks on a node) or each
+cross between two nodes (`internode`, N ranks per node). The number of pairs
+is ramped 1, 2, 4... up to a full node, one launch per step:
+
+    python3 -m osu_utils.pair_scaling --layout intranode -- osu_mbw_mr
+
+The output is a table of the aggregate bandwidth (at `--bandwidth-size`)
+and message rate (at `--rate-size`) for every pair count, followed by the
+values of the full node and the knee of each curve:
+
+    # Pairs        MB/s      Messages/s
+    1          12011.30     10150000.00
+    ...
+    # Full node: pairs=64 bandwidth=98210.50 msgrate=410200000.00
+    # Knee: bandwidth=16 msgrate=32
+    # Failed steps: 0
+
+The knee is the pair count furthest above the straight line from the first
+to the last point of the normalised curve (Kneedle), i.e. where adding pairs
+stops paying off.
+'''
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Launcher of one step per layout: `{pairs}` is the number of pairs, `{tasks}` twice that
+LAUNCHERS = {
+    'intranode': 'srun --overlap --nodes=1 --ntasks={tasks} --cpus-per-task=1 '
+                 '--cpu-bind=cores --distribution=block:block',
+    'internode': 'srun --overlap --nodes=2 --ntasks={tasks} --ntasks-per-node={pairs} '
+                 '--cpus-per-task=1 --cpu-bind=cores --distribution=block:block',
+}
+
+
+def pair_counts(max_pairs):
+    '''1, 2, 4... up to `max_pairs`, which is always included.'''
+    counts = []
+    pairs = 1
+    while pairs < max_pairs:
+        counts.append(pairs)
+        pairs *= 2
+
+    return counts + [max_pairs]
+
+
+def knee(xs, ys):
+    '''x of the point furthest above the chord of the normalised curve.'''
+    if len(xs) < 3:
+        return xs[-1]
+
+    x_span = (xs[-1] - xs[0]) or 1
+    y_min, y_max = min(ys), max(ys)
+    y_span = (y_max - y_min) or 1
+    gaps = [(y - y_min) / y_span - (x - xs[0]) / x_span for x, y in zip(xs, ys)]
+    return xs[gaps.index(max(gaps))]
+
+
+def run_step(command, sizes, log=sys.stdout):
+    '''{size: (MB/s, messages/s)} printed by one osu_mbw_mr launch, None on failure.'''
+    proc = subprocess.run(command, shell=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, universal_newlines=True)
+    values = {}
+    for size in sizes:
+        match = re.search(rf'^{size}\s+(\S+)\s+(\S+)', proc.stdout, re.MULTILINE)
+        if proc.returncode == 0 and match:
+            values[size] = (float(match.group(1)), float(match.group(2)))
+
+    if len(values) != len(sizes):
+        print(f'# Step failed: {command}', file=log)
+        log.write(''.join(f'# | {line}\n' for line in proc.stdout.splitlines()))
+        return None
+
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Ramp the number of osu_mbw_mr pairs up to a full node')
+    parser.add_argument('--layout', choices=sorted(LAUNCHERS), required=True)
+    parser.add_argument('--max-pairs', type=int,
+                        help='largest number of pairs (default: a full node, '
+                             'from the CPUs available to this process)')
+    parser.add_argument('--bandwidth-size', type=int, default=1048576)
+    parser.add_argument('--rate-size', type=int, default=8)
+    parser.add_argument('--launcher',
+                        help='launcher of one step, `{pairs}`/`{tasks}` are replaced '
+                             '(default: srun for the layout)')
+    parser.add_argument('benchmark', nargs=argparse.REMAINDER,
+                        help='benchmark command, after `--`')
+    args = parser.parse_args(argv)
+
+    benchmark = [arg for arg in args.benchmark if arg != '--']
+    if not benchmark:
+        parser.error('no benchmark command given')
+
+    cpus = len(os.sched_getaffinity(0))
+    max_pairs = args.max_pairs or (cpus // 2 if args.layout == 'intranode' else cpus)
+    launcher = args.launcher or LAUNCHERS[args.layout]
+    sizes = sorted({args.rate_size, args.bandwidth_size})
+    rows = []
+    failed = 0
+    print(f'# Pairs {"MB/s":>12} {"Messages/s":>16}')
+    for pairs in pair_counts(max_pairs):
+        command = ' '.join([launcher.format(pairs=pairs, tasks=2 * pairs)] + benchmark + [
+            '-m', f'{sizes[0]}:{sizes[-1]}'
+        ])
+        values = run_step(command, sizes)
+        if values is None:
+            failed += 1
+            continue
+
+        bandwidth = values[args.bandwidth_size][0]
+        msgrate = values[args.rate_size][1]
+        rows.append((pairs, bandwidth, msgrate))
+        print(f'{pairs:<7} {bandwidth:>12.2f} {msgrate:>16.2f}', flush=True)
+
+    if rows:
+        pairs, bandwidth, msgrate = rows[-1]
+        xs = [row[0] for row in rows]
+        print(f'# Full node: pairs={pairs} bandwidth={bandwidth:.2f} msgrate={msgrate:.2f}')
+        print(f'# Knee: bandwidth={knee(xs, [row[1] for row in rows])} '
+              f'msgrate={knee(xs, [row[2] for row in rows])}')
+
+    print(f'# Failed steps: {failed}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
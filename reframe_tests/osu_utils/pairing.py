@@ -0,0 +1,64 @@
+'''Schedules of disjoint pairs for all-pairs measurements.
+
+A round-robin tournament (circle method) splits the N*(N-1)/2 pairs of N
+items into N-1 rounds (N rounds for odd N) in which no item appears twice,
+so the pairs of a round can be measured at the same time.
+'''
+
+import subprocess
+
+
+def round_robin(items):
+    '''Rounds of disjoint pairs covering every unordered pair exactly once.'''
+    items = list(items)
+    if len(items) % 2:
+        items.append(None)
+
+    count = len(items)
+    rounds = []
+    for _ in range(count - 1):
+        pairs = [(items[i], items[count - 1 - i]) for i in range(count // 2)]
+        rounds.append([(a, b) for a, b in pairs if a is not None and b is not None])
+
+        # Keep the first item in place and rotate the others
+        items = [items[0], items[-1]] + items[1:-1]
+
+    return rounds
+
+
+def waves(pairs, concurrency, conflicts=None):
+    '''Split disjoint pairs into waves of at most `concurrency` pairs (0: no limit).
+
+    `conflicts(pair)` returns the shared resources of a pair (e.g. its L3
+    domains); pairs with a resource in common never share a wave.
+    '''
+    pending = list(pairs)
+    concurrency = concurrency or len(pending)
+    result = []
+    while pending:
+        wave, used, remaining = [], set(), []
+        for pair in pending:
+            resources = set(conflicts(pair)) if conflicts else set()
+            if len(wave) < concurrency and not resources & used:
+                wave.append(pair)
+                used |= resources
+            else:
+                remaining.append(pair)
+
+        result.append(wave)
+        pending = remaining
+
+    return result
+
+
+def run_concurrently(commands):
+    '''Run shell commands at the same time; returns their (exit code, output).'''
+    procs = [subprocess.Popen(command, shell=True, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, universal_newlines=True)
+             for command in commands]
+    results = []
+    for proc in procs:
+        output, _ = proc.communicate()
+        results.append((proc.returncode, output))
+
+    return results
@@ -0,0 +1,48 @@
+'''srun options reproducing the intranode placement scenarios.'''
+
+# Scenario name -> srun options placing 2 tasks on one node
+INTRANODE_PLACEMENTS = {
+    'SameNumaNode': [
+        '--cpu-bind=verbose,cores',
+        '--mem-bind=local',
+        '--distribution=block:block'
+    ],
+    'SameSocketDifferentNuma': [
+        '--cpu-bind=verbose,map_cpu:0,16',
+        '--mem-bind=local',
+    ],
+    'DifferentSockets': [
+        '--ntasks-per-socket=1',
+        '--cpu-bind=verbose,cores',
+        '--mem-bind=local',
+        '--distribution=cyclic:cyclic'
+    ],
+}
+
+# Placements using hardcoded core ids that are only valid on some partitions
+PLACEMENT_SYSTEMS = {
+    'SameSocketDifferentNuma': ['aion:batch'],
+}
+
+
+def intranode_placements(partition):
+    '''Intranode scenarios that can be run on the given partition.'''
+    return [
+        name for name in INTRANODE_PLACEMENTS
+        if partition in PLACEMENT_SYSTEMS.get(name, [partition])
+    ]
+
+
+# Topology classes (see topology.py) the two ranks of a scenario may be bound
+# as; the topology-derived scenarios are named after their class
+SCENARIO_CLASSES = {
+    'SameNumaNode': ['SameL2', 'SameL3', 'SameNuma'],
+    'SameSocketDifferentNuma': ['CrossNuma'],
+    'DifferentSockets': ['CrossSocket'],
+    'DifferentNodes': ['CrossNode'],
+}
+
+
+def scenario_classes(scenario):
+    '''Placement classes accepted for the ranks of a scenario.'''
+    return SCENARIO_CLASSES.get(scenario, [scenario])
@@ -0,0 +1,113 @@
+'''Reference values of the OSU tests, generated from the run history.
+
+The references live in `reframe_tests/references.json` (or in the file named
+by `OSU_REFERENCES`), keyed like the tests select them:
+
+    install method -> scenario -> benchmark -> system:partition
+        -> perf variable -> [value, lower, upper, unit]
+
+Recalibrate them from the performance store with:
+
+    python3 Report/generate_references.py
+'''
+
+import json
+import os
+import re
+import tempfile
+
+# Statistics of repeated runs (`<metric>_p5`, `<metric>_cv`...), of adaptive
+# runs (`<metric>_ci`, `<metric>_iterations`), the slowest pair of a core matrix
+# class (`latency_<class>_max`), the outlier counts of the sweeps
+# (`<metric>_outliers`) and the knee of the multi-pair scaling (`<metric>_knee`)
+# are reported but not judged
+UNJUDGED_STATISTICS = r'p\d+|cv|ci|iterations|max|outliers|knee'
+UNJUDGED_PVAR_REGEX = re.compile(rf'_({UNJUDGED_STATISTICS})$')
+
+_CACHE = {}
+
+
+def default_references_path():
+    return os.environ.get(
+        'OSU_REFERENCES',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     'references.json')
+    )
+
+
+def load_references(path=None):
+    '''All the references of a file, or {} if it does not exist.'''
+    path = path or default_references_path()
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+
+    cached = _CACHE.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as fp:
+            cached = _CACHE[path] = (mtime, json.load(fp))
+
+    return cached[1]
+
+
+def scenario_references(install_method, scenario, benchmark, path=None):
+    '''ReFrame references of a test as {system:partition: {var: tuple}}.'''
+    entries = load_references(path).get(install_method, {}).get(
+        scenario, {}).get(benchmark, {})
+    return {
+        sysp: {var: tuple(value) for var, value in values.items()}
+        for sysp, values in entries.items()
+    }
+
+
+def missing_references(reference, partition, perf_vars, required=None):
+    '''The judged perf variables of a test that have no reference on `partition`.
+
+    `reference` is looked up like ReFrame does, by `<system:partition>:<var>`.
+    With `required` left to None, only a test with at least one reference on
+    the partition must have them all: a family not referenced there yet
+    misses none. True requires them all, False none.
+    '''
+    if required is False:
+        return []
+
+    missing = []
+    judged = [var for var in perf_vars if not UNJUDGED_PVAR_REGEX.search(var)]
+    for var in judged:
+        try:
+            reference[f'{partition}:{var}']
+        except KeyError:
+            missing.append(var)
+
+    if required is None and len(missing) == len(judged):
+        return []
+
+    return missing
+
+
+def set_reference(references, install_method, scenario, benchmark, sysp,
+                  var, value):
+    '''Set one `[value, lower, upper, unit]` entry; returns the previous one.'''
+    entries = references.setdefault(install_method, {}).setdefault(
+        scenario, {}).setdefault(benchmark, {}).setdefault(sysp, {})
+    previous = entries.get(var)
+    entries[var] = list(value)
+    return previous
+
+
+def write_references(references, path=None):
+    path = path or default_references_path()
+    text = json.dumps(references, indent=2, sort_keys=True)
+
+    # Keep each [value, lower, upper, unit] entry on a single line
+    text = re.sub(r'\[\s+([^\[\]{}]*?)\s+\]',
+                  lambda m: '[' + ' '.join(m.group(1).split()) + ']', text)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    suffix='.tmp')
+    with os.fdopen(fd, 'w') as fp:
+        fp.write(text + '\n')
+
+    os.replace(tmp_path, path)
+    return path
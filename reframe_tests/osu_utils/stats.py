@@ -0,0 +1,97 @@
+'''Statistics of repeated benchmark runs.
+
+Plain Python (no numpy) so that it can also be used by helpers running on
+the compute nodes.
+'''
+
+import math
+
+# Statistics reported next to the median of repeated runs
+REPEAT_STATISTICS = ['p5', 'p95', 'cv']
+
+# Metrics for which a higher value is better
+HIGHER_IS_BETTER = {'bandwidth', 'msgrate', 'overlap'}
+
+
+def percentile(values, q):
+    '''q-th percentile, interpolated linearly between the closest ranks.'''
+    values = sorted(values)
+    if not values:
+        raise ValueError('percentile of an empty sequence')
+
+    position = (len(values) - 1) * q / 100.0
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def median(values):
+    return percentile(values, 50)
+
+
+def coefficient_of_variation(values):
+    '''Sample standard deviation over the mean, in percent.'''
+    values = list(values)
+    if len(values) < 2:
+        return 0.0
+
+    mean = sum(values) / len(values)
+    if not mean:
+        return 0.0
+
+    variance = sum((value - mean)**2 for value in values) / (len(values) - 1)
+    return 100.0 * math.sqrt(variance) / abs(mean)
+
+
+def run_statistic(values, statistic):
+    '''`median`, `p<q>` (percentile) or `cv` of a list of values.'''
+    if statistic == 'median':
+        return median(values)
+
+    if statistic == 'cv':
+        return coefficient_of_variation(values)
+
+    if statistic.startswith('p'):
+        return percentile(values, float(statistic[1:]))
+
+    raise ValueError(f'unknown statistic: {statistic}')
+
+
+# Scale factor from the MAD to the standard deviation of a normal distribution
+MAD_TO_SIGMA = 1.4826
+
+
+def robust_z_scores(values):
+    '''Distance of each value to the median, in MAD-based standard deviations.
+
+    With a MAD of 0 (most values equal), values off the median are infinitely
+    far from it.
+    '''
+    values = list(values)
+    center = median(values)
+    sigma = MAD_TO_SIGMA * median([abs(value - center) for value in values])
+    if not sigma:
+        return [0.0 if value == center else math.copysign(math.inf, value - center)
+                for value in values]
+
+    return [(value - center) / sigma for value in values]
+
+
+def outlier_flags(metric, values, z_threshold=3.5, min_deviation=0.05):
+    '''(robust z, outlier) of each value of a metric across nodes or links.
+
+    A value is an outlier when it is worse than the median by more than
+    `z_threshold` robust standard deviations and by more than `min_deviation`
+    (relative), so that a very tight distribution does not flag tiny
+    differences.
+    '''
+    values = list(values)
+    scores = robust_z_scores(values)
+    center = median(values)
+    sign = -1 if metric in HIGHER_IS_BETTER else 1
+    flags = []
+    for value, score in zip(values, scores):
+        deviation = abs(value - center) / abs(center) if center else 0.0
+        flags.append((score, sign * score > z_threshold and deviation > min_deviation))
+
+    return flags
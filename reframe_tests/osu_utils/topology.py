@@ -0,0 +1,182 @@
+'''Node topology from hwloc (`lstopo --of xml`) and core-pair placements.
+
+The parser understands both the hwloc 1.x layout (NUMA nodes and caches as
+regular objects in the tree) and the hwloc 2.x one (NUMA nodes as memory
+children, `L2Cache`/`L3Cache` object types).
+
+Run as a script on a compute node to print the core pair of a placement:
+
+    lstopo --of xml --no-io topology.xml
+    python3 -m osu_utils.topology topology.xml SameL3
+'''
+
+import argparse
+import sys
+import xml.etree.ElementTree as ET
+
+# Topology relationships between the two cores of a pair, closest first.
+# SMT siblings of the same core are never paired.
+PLACEMENT_CLASSES = [
+    'SameL2',
+    'SameL3',
+    'SameNuma',
+    'CrossNuma',
+    'CrossSocket',
+]
+
+# Topology level each placement class shares (None: shares nothing)
+_SHARED_LEVEL = {
+    'SameL2': 'l2',
+    'SameL3': 'l3',
+    'SameNuma': 'numa',
+    'CrossNuma': 'package',
+    'CrossSocket': None,
+}
+
+
+def _object_type(elem):
+    '''Normalised hwloc object type of an XML element.'''
+    obj_type = elem.get('type')
+    if obj_type == 'Cache':
+        # hwloc 1.x: caches are told apart by their depth attribute
+        return 'L{}Cache'.format(elem.get('depth'))
+
+    if obj_type == 'Socket':
+        return 'Package'
+
+    return obj_type
+
+
+def _object_id(elem):
+    # hwloc 1.x caches carry neither index, any per-parse unique id will do
+    return elem.get('gp_index') or elem.get('os_index') or str(id(elem))
+
+
+def parse_lstopo_xml(source):
+    '''Parse an lstopo XML file (path or file object) into a topology dict.
+
+    The result is JSON serialisable:
+
+        {'cpu_model': str,
+         'cores': [{'pus': [os_index, ...], 'l2': id, 'l3': id,
+                    'numa': os_index, 'package': os_index}, ...]}
+
+    Cores are listed in hwloc's logical order.
+    '''
+    root = ET.parse(source).getroot()
+    topology = {'cpu_model': '', 'cores': []}
+
+    def walk(elem, levels):
+        obj_type = _object_type(elem)
+        levels = dict(levels)
+        if obj_type == 'Package':
+            levels['package'] = elem.get('os_index')
+            for info in elem.findall('info'):
+                if info.get('name') == 'CPUModel' and not topology['cpu_model']:
+                    topology['cpu_model'] = info.get('value', '').strip()
+        elif obj_type == 'NUMANode':
+            levels['numa'] = elem.get('os_index')
+        elif obj_type == 'L2Cache':
+            levels['l2'] = _object_id(elem)
+        elif obj_type == 'L3Cache':
+            levels['l3'] = _object_id(elem)
+
+        # hwloc 2.x attaches NUMA nodes as memory children of their parent
+        for child in elem.findall('object'):
+            if _object_type(child) == 'NUMANode':
+                levels['numa'] = child.get('os_index')
+
+        if obj_type == 'Core':
+            pus = [int(child.get('os_index')) for child in elem.findall('object')
+                   if _object_type(child) == 'PU']
+            core = {'pus': sorted(pus)}
+            for level in ('l2', 'l3', 'numa', 'package'):
+                core[level] = levels.get(level)
+
+            topology['cores'].append(core)
+            return
+
+        for child in elem.findall('object'):
+            walk(child, levels)
+
+    for child in root.findall('object'):
+        walk(child, {})
+
+    return topology
+
+
+def core_pair_class(core_a, core_b):
+    '''Placement class of two distinct cores of the same node.'''
+    for name in PLACEMENT_CLASSES:
+        level = _SHARED_LEVEL[name]
+        if level is None or (core_a[level] is not None and
+                             core_a[level] == core_b[level]):
+            return name
+
+
+def placement_pairs(topology):
+    '''Map every placement class present on the node to a pair of CPUs.
+
+    The first core is paired with the first core (in logical order) having
+    each relationship. Classes that collapse onto a closer one on this node
+    type (e.g. L2 private to each core) are simply absent.
+    '''
+    cores = topology['cores']
+    if not cores:
+        return {}
+
+    first = cores[0]
+    pairs = {}
+    for other in cores[1:]:
+        pairs.setdefault(core_pair_class(first, other),
+                         (first['pus'][0], other['pus'][0]))
+
+    return {name: pairs[name] for name in PLACEMENT_CLASSES if name in pairs}
+
+
+def mask_cpus(mask):
+    '''OS indices of the CPUs of a hexadecimal CPU mask (`0x1000f`).'''
+    value = int(mask, 16)
+    return [cpu for cpu in range(value.bit_length()) if value >> cpu & 1]
+
+
+def cpu_pair_class(topology, cpu_a, cpu_b):
+    '''Placement class of the cores holding two PU os indices.'''
+    core_of = {}
+    for core in topology['cores']:
+        for pu in core['pus']:
+            core_of[pu] = core
+
+    core_a, core_b = core_of[cpu_a], core_of[cpu_b]
+    if core_a is core_b:
+        return 'SameCore'
+
+    return core_pair_class(core_a, core_b)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Print the CPU pair of a placement class as `a,b`')
+    parser.add_argument('xml_file', help='output of `lstopo --of xml`')
+    parser.add_argument('placement', nargs='?', choices=PLACEMENT_CLASSES,
+                        help='placement class (omit to list all of them)')
+    args = parser.parse_args(argv)
+
+    pairs = placement_pairs(parse_lstopo_xml(args.xml_file))
+    if args.placement is None:
+        for name, (cpu_a, cpu_b) in pairs.items():
+            print(f'{name} {cpu_a},{cpu_b}')
+
+        return 0
+
+    if args.placement not in pairs:
+        print(f'placement {args.placement} is not available on this node '
+              f'type (available: {", ".join(pairs)})', file=sys.stderr)
+        return 1
+
+    print('{},{}'.format(*pairs[args.placement]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
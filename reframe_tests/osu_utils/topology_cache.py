@@ -0,0 +1,230 @@
+'''Persistent per-node-type cache of parsed topologies and placement pairs.
+
+Entries live in one JSON file per node type, named after the CPU model and a
+hash of the node hardware signature (sockets, NUMA nodes, cores, CPUs):
+
+    <cache_dir>/<cpu-model-slug>-<signature-hash>.json
+
+A node whose signature changed (e.g. SMT toggled, NPS mode changed in the
+BIOS) hashes to a different file, and storing it removes the stale entries
+of the same CPU model. The cache directory should be on a filesystem shared
+by the login and compute nodes.
+
+On a compute node, refresh the entry of the node type with:
+
+    lstopo --of xml --no-io topology.xml
+    python3 -m osu_utils.topology_cache store topology.xml
+'''
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+from osu_utils.topology import mask_cpus, parse_lstopo_xml, placement_pairs
+
+# Bump when the layout of the stored topology or of the pairs changes
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    return os.environ.get(
+        'OSU_TOPOLOGY_CACHE',
+        os.path.join(os.path.expanduser('~'), '.cache', 'osu-regression',
+                     'topology')
+    )
+
+
+def hardware_signature(cpu_model, packages, numa_nodes, cores, cpus):
+    '''Signature identifying a node type; all fields must be known.'''
+    return {
+        'cpu_model': cpu_model,
+        'packages': int(packages),
+        'numa_nodes': int(numa_nodes),
+        'cores': int(cores),
+        'cpus': int(cpus),
+    }
+
+
+def topology_signature(topology):
+    '''Hardware signature of a topology parsed from lstopo XML.'''
+    cores = topology['cores']
+    return hardware_signature(
+        topology['cpu_model'],
+        len({core['package'] for core in cores}),
+        len({core['numa'] for core in cores}),
+        len(cores),
+        sum(len(core['pus']) for core in cores)
+    )
+
+
+def processor_signature(processor):
+    '''Signature from a ReFrame partition processor, or None if incomplete.
+
+    The processor info is only filled in when ReFrame knows the partition
+    topology (auto-detected or set in the configuration).
+    '''
+    fields = (processor.model, processor.num_sockets,
+              processor.num_numa_nodes, processor.num_cores,
+              processor.num_cpus)
+    if any(field is None for field in fields):
+        return None
+
+    return hardware_signature(*fields)
+
+
+def processor_topology(processor):
+    '''Topology (as `parse_lstopo_xml`) of a ReFrame partition processor.
+
+    ReFrame lists the CPU masks of the cores, NUMA nodes, sockets and caches
+    of the partition; None if it does not know the cores.
+    '''
+    topology = processor.topology or {}
+    if not topology.get('cores'):
+        return None
+
+    levels = {'numa': topology.get('numa_nodes') or [],
+              'package': topology.get('sockets') or []}
+    for cache in topology.get('caches') or []:
+        if cache.get('type') in ('L2', 'L3'):
+            levels[cache['type'].lower()] = cache.get('cpusets') or []
+
+    owners = {}
+    for level, masks in levels.items():
+        for index, mask in enumerate(masks):
+            for cpu in mask_cpus(mask):
+                owners[level, cpu] = str(index)
+
+    cores = []
+    for mask in topology['cores']:
+        pus = mask_cpus(mask)
+        core = {'pus': pus}
+        for level in ('l2', 'l3', 'numa', 'package'):
+            core[level] = owners.get((level, pus[0]))
+
+        cores.append(core)
+
+    cores.sort(key=lambda core: core['pus'][0])
+    return {'cpu_model': processor.model or '', 'cores': cores}
+
+
+def _model_slug(cpu_model):
+    return re.sub(r'[^a-z0-9]+', '-', cpu_model.lower()).strip('-') or 'unknown'
+
+
+def cache_path(signature, cache_dir=None):
+    digest = hashlib.sha1(
+        json.dumps(signature, sort_keys=True).encode()
+    ).hexdigest()[:12]
+    return os.path.join(cache_dir or default_cache_dir(),
+                        f'{_model_slug(signature["cpu_model"])}-{digest}.json')
+
+
+def lookup(signature, cache_dir=None):
+    '''Cached entry of a node type, or None on a miss or a stale entry.'''
+    if signature is None:
+        return None
+
+    try:
+        with open(cache_path(signature, cache_dir)) as fp:
+            entry = json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+    if (entry.get('version') != CACHE_VERSION or
+        entry.get('signature') != signature):
+        return None
+
+    return entry
+
+
+def lookup_pairs(signature, cache_dir=None):
+    '''Cached placement pairs of a node type as {class: (cpu_a, cpu_b)}.'''
+    entry = lookup(signature, cache_dir)
+    if entry is None:
+        return None
+
+    return {name: tuple(pair) for name, pair in entry['pairs'].items()}
+
+
+def partition_topology(processor, cache_dir=None):
+    '''Topology of a partition: detected by ReFrame, else the cached one.'''
+    topology = processor_topology(processor)
+    if topology is None:
+        entry = lookup(processor_signature(processor), cache_dir)
+        topology = entry['topology'] if entry else None
+
+    return topology
+
+
+def store(topology, cache_dir=None):
+    '''Store a parsed topology and its placement pairs; return the path.'''
+    cache_dir = cache_dir or default_cache_dir()
+    signature = topology_signature(topology)
+    entry = {
+        'version': CACHE_VERSION,
+        'signature': signature,
+        'topology': topology,
+        'pairs': placement_pairs(topology),
+    }
+    path = cache_path(signature, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Drop entries of the same CPU model whose signature no longer matches
+    model_prefix = _model_slug(signature['cpu_model']) + '-'
+    for stale in glob.glob(os.path.join(cache_dir, model_prefix + '*.json')):
+        if stale == path:
+            continue
+
+        try:
+            with open(stale) as fp:
+                stale_model = json.load(fp)['signature']['cpu_model']
+        except (OSError, ValueError, KeyError):
+            continue
+
+        if stale_model == signature['cpu_model']:
+            os.remove(stale)
+
+    # Concurrent jobs on the same node type may store at the same time
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w') as fp:
+        json.dump(entry, fp, indent=2)
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Manage the per-node-type topology cache')
+    parser.add_argument('--cache-dir', default=default_cache_dir())
+    subparsers = parser.add_subparsers(dest='command')
+    store_parser = subparsers.add_parser(
+        'store', help='parse an lstopo XML file and cache it')
+    store_parser.add_argument('xml_file')
+    subparsers.add_parser('list', help='list the cached node types')
+    args = parser.parse_args(argv)
+
+    if args.command == 'store':
+        print(store(parse_lstopo_xml(args.xml_file), args.cache_dir))
+    elif args.command == 'list':
+        for path in sorted(glob.glob(os.path.join(args.cache_dir, '*.json'))):
+            with open(path) as fp:
+                entry = json.load(fp)
+
+            pairs = ' '.join(f'{name}={a},{b}'
+                             for name, (a, b) in entry['pairs'].items())
+            print(f'{os.path.basename(path)}: {pairs}')
+    else:
+        parser.print_help()
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+'''Communication paths the point-to-point tests can be pinned to.
+
+Each transport is a set of Open MPI (4.1) and UCX environment variables.
+The inter-node paths are UCX with one of its network transports, libfabric
+through the `cm` PML and `ob1` with one of its BTLs. The intranode paths
+select the shared-memory single-copy mechanism: CMA, XPMEM, or none
+(copy-in/copy-out through a shared buffer).
+
+The components Open MPI and UCX actually picked by a pinned run are read
+back from their verbose output (see `VERBOSE_ENV`), e.g.
+`pml=ucx tls=rc_mlx5,self,sysv`. The default runs stay quiet, so their
+timings are not taken with the verbose logging on.
+'''
+
+import re
+
+TRANSPORTS = {
+    # Whatever Open MPI selects by itself
+    'default': {},
+
+    # UCX, with its own transport selection or a pinned one
+    'ucx': {'OMPI_MCA_pml': 'ucx'},
+    'ucx-rc': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,sm,rc'},
+    'ucx-dc': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,sm,dc'},
+    'ucx-ud': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,sm,ud'},
+    'ucx-tcp': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,sm,tcp'},
+    'ucx-cma': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,posix,cma'},
+    'ucx-xpmem': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,posix,xpmem'},
+    'ucx-cico': {'OMPI_MCA_pml': 'ucx', 'UCX_TLS': 'self,posix'},
+
+    # libfabric, through the cm PML
+    'ofi': {'OMPI_MCA_pml': 'cm', 'OMPI_MCA_mtl': 'ofi'},
+
+    # ob1 and its BTLs (vader is the shared-memory one)
+    'ob1-tcp': {'OMPI_MCA_pml': 'ob1', 'OMPI_MCA_btl': 'self,vader,tcp'},
+    'ob1-ofi': {'OMPI_MCA_pml': 'ob1', 'OMPI_MCA_btl': 'self,vader,ofi'},
+    'ob1-cma': {'OMPI_MCA_pml': 'ob1', 'OMPI_MCA_btl': 'self,vader',
+                'OMPI_MCA_btl_vader_single_copy_mechanism': 'cma'},
+    'ob1-xpmem': {'OMPI_MCA_pml': 'ob1', 'OMPI_MCA_btl': 'self,vader',
+                  'OMPI_MCA_btl_vader_single_copy_mechanism': 'xpmem'},
+    'ob1-cico': {'OMPI_MCA_pml': 'ob1', 'OMPI_MCA_btl': 'self,vader',
+                 'OMPI_MCA_btl_vader_single_copy_mechanism': 'none'},
+}
+
+# Make Open MPI and UCX report the components they select (job stderr)
+VERBOSE_ENV = {
+    'OMPI_MCA_pml_base_verbose': '10',
+    'OMPI_MCA_mtl_base_verbose': '10',
+    'OMPI_MCA_btl_base_verbose': '10',
+    'UCX_LOG_LEVEL': 'info',
+}
+
+_PML_REGEX = re.compile(r'select: component (\w+) selected')
+_MTL_REGEX = re.compile(r'mca:base:select:\(\s*mtl\) Selected component \[(\w+)\]')
+_BTL_REGEX = re.compile(r'select: init of component (\w+) returned success')
+_UCX_REGEX = re.compile(r'ep_cfg\[\d+\]: tag\(([^)]*)\)')
+
+
+def transport_env(transport):
+    '''Environment pinning a transport, with the selection reports enabled.'''
+    if not transport or transport == 'default':
+        return {}
+
+    return dict(VERBOSE_ENV, **TRANSPORTS[transport])
+
+
+def transport_scenario(scenario, transport):
+    '''Scenario the references and the history of a pinned run are kept under.'''
+    if not transport or transport == 'default':
+        return scenario
+
+    return f'{scenario}+{transport}'
+
+
+def selected_transport(text):
+    '''Components reported in the verbose output of a run, e.g. `pml=ob1 btl=self,vader`.'''
+    selected = []
+    for name, regex in (('pml', _PML_REGEX), ('mtl', _MTL_REGEX), ('btl', _BTL_REGEX)):
+        components = sorted(set(regex.findall(text)))
+        if components:
+            selected.append(f'{name}={",".join(components)}')
+
+    tls = sorted({resource.split('/')[0] for match in _UCX_REGEX.findall(text)
+                  for resource in match.split()})
+    if tls:
+        selected.append(f'tls={",".join(tls)}')
+
+    return ' '.join(selected)
+
+
+def transport_error(transport, selected):
+    '''Message when the reported PML is not the pinned one, else None.'''
+    pinned = TRANSPORTS.get(transport, {}).get('OMPI_MCA_pml')
+    match = re.search(r'\bpml=(\S+)', selected)
+    if pinned and match and match.group(1) != pinned:
+        return f'transport {transport} pins pml={pinned}, but the run used {match.group(0)}'
+
+    return None
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+# The helpers are imported like the test files and the report scripts do:
+# `osu_utils` from reframe_tests/, the report modules from Report/
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for subdir in ('reframe_tests', 'Report'):
+    sys.path.insert(0, os.path.join(_ROOT, subdir))
+
+
+def _lstopo_xml(version, cores_per_l2):
+    '''lstopo XML of a 2-socket node: 2 NUMA nodes per socket, 2 L3 per NUMA
+    node, 4 cores per L3 and 2 PUs per core (core `c` has PUs `c`, `c + 32`).'''
+    core = 0
+    gp_index = iter(range(1, 1000))
+
+    def obj(obj_type, children='', **attrs):
+        # hwloc 1.x objects carry no gp_index
+        if version == 2:
+            attrs.setdefault('gp_index', next(gp_index))
+        attributes = ''.join(f' {name}="{value}"' for name, value in attrs.items())
+        return f'<object type="{obj_type}"{attributes}>{children}</object>'
+
+    def cores():
+        nonlocal core
+        l2s = []
+        for _ in range(4 // cores_per_l2):
+            members = []
+            for _ in range(cores_per_l2):
+                pus = obj('PU', os_index=core) + obj('PU', os_index=core + 32)
+                members.append(obj('Core', pus, os_index=core))
+                core += 1
+
+            if version == 1:
+                l2s.append(obj('Cache', ''.join(members), depth=2))
+            else:
+                l2s.append(obj('L2Cache', ''.join(members)))
+
+        return ''.join(l2s)
+
+    packages = []
+    for package in range(2):
+        numas = []
+        for numa in range(2 * package, 2 * package + 2):
+            if version == 1:
+                l3s = ''.join(obj('Cache', cores(), depth=3) for _ in range(2))
+                numas.append(obj('NUMANode', l3s, os_index=numa))
+            else:
+                l3s = ''.join(obj('L3Cache', cores()) for _ in range(2))
+                numas.append(obj('Group', obj('NUMANode', os_index=numa) + l3s))
+
+        info = '<info name="CPUModel" value="AMD EPYC 7H12 64-Core Processor"/>'
+        packages.append(obj('Socket' if version == 1 else 'Package',
+                            info + ''.join(numas), os_index=package))
+
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<topology>'
+            f'{obj("Machine", "".join(packages), os_index=0)}</topology>\n')
+
+
+@pytest.fixture
+def lstopo_xml(tmp_path):
+    '''Factory writing a synthetic lstopo XML file, returns its path.'''
+    def write(version=2, cores_per_l2=2):
+        path = tmp_path / f'topology-{version}-{cores_per_l2}.xml'
+        path.write_text(_lstopo_xml(version, cores_per_l2))
+        return str(path)
+
+    return write
@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from osu_utils import adaptive
+
+
+def test_t_quantile_uses_the_tabulated_rows():
+    assert adaptive.t_quantile_95(1) == 12.706
+    assert adaptive.t_quantile_95(12) == 2.179
+    assert adaptive.t_quantile_95(120) == 1.980
+
+
+def test_t_quantile_between_rows_is_conservative():
+    # dof=11 lies between the rows 10 and 12: the larger quantile is used
+    assert adaptive.t_quantile_95(11) == 2.228
+    for dof in range(1, 200):
+        assert adaptive.t_quantile_95(dof) >= adaptive.t_quantile_95(dof + 1)
+
+
+def test_t_quantile_rejects_no_degrees_of_freedom():
+    with pytest.raises(ValueError):
+        adaptive.t_quantile_95(0)
+
+
+def test_relative_ci_width():
+    assert adaptive.relative_ci_width([1.0]) == math.inf
+    assert adaptive.relative_ci_width([2.0, 2.0, 2.0]) == 0.0
+
+    # Mean 2, sample standard deviation 1 over 4 values
+    values = [1.0, 1.0, 3.0, 3.0]
+    sd = math.sqrt(4 / 3)
+    expected = 3.182 * sd / 2.0 / math.sqrt(4)
+    assert adaptive.relative_ci_width(values) == pytest.approx(expected)
+
+
+def test_sample_stops_once_converged(monkeypatch):
+    values = iter([10.0, 10.1, 9.9, 10.0, 50.0])
+    monkeypatch.setattr(adaptive, 'run_batch', lambda command, size: next(values))
+
+    batches, converged = adaptive.sample('osu_latency', 8192, rel_width=0.05,
+                                         time_budget=60)
+    assert converged
+    assert batches == [10.0, 10.1, 9.9]
+
+
+def test_sample_gives_up_after_max_batches(monkeypatch):
+    values = iter([1.0, 10.0] * 10)
+    monkeypatch.setattr(adaptive, 'run_batch', lambda command, size: next(values))
+
+    batches, converged = adaptive.sample('osu_latency', 8192, rel_width=0.01,
+                                         time_budget=60, max_batches=6)
+    assert not converged
+    assert len(batches) == 6
+
+
+def test_main_prints_the_osu_row_and_summary(monkeypatch, capsys):
+    monkeypatch.setattr(adaptive, 'run_batch', lambda command, size: 0.5)
+
+    assert adaptive.main(['--size', '8', '--batch-iterations', '100',
+                          '--', 'osu_latency']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ['8', '0.50']
+    assert lines[1:] == ['# Iterations: 300', '# CI: 0.00%', '# Converged: yes']
@@ -0,0 +1,94 @@
+import pytest
+
+from osu_utils import bindings
+from osu_utils.topology import parse_lstopo_xml
+
+SRUN_STDERR = '''\
+cpu-bind=MASK - aion-0001, task  0  0 [48120]: mask 0x1 set
+cpu-bind=MASK - aion-0001, task  1  1 [48121]: mask 0x100 set
+# OSU MPI Latency Test v7.2
+cpu-bind=MASK - aion-0001, task  0  0 [48130]: mask 0x1 set
+cpu-bind=MASK - aion-0001, task  1  1 [48131]: mask 0x100000000 set
+'''
+
+OMPI_STDERR = '''\
+[aion-0001:48121] MCW rank 0 bound to socket 0[core 0[hwt 0-1]]: [BB/../..]
+[aion-0001:48121] MCW rank 1 bound to socket 1[core 16[hwt 0-1]]: [../../BB]
+[aion-0002:1234] Rank 0 bound to package[0][core:2]
+[aion-0003:1234] Rank 1 bound to package[0][core:3]
+'''
+
+
+@pytest.fixture
+def topology(lstopo_xml):
+    return parse_lstopo_xml(lstopo_xml())
+
+
+def test_parse_srun_bindings():
+    launches = bindings.parse_bindings(SRUN_STDERR)
+    # A rank seen again starts the next launch
+    assert launches == [
+        {0: ('aion-0001', [0]), 1: ('aion-0001', [8])},
+        {0: ('aion-0001', [0]), 1: ('aion-0001', [32])},
+    ]
+
+
+def test_parse_ompi_bindings(topology):
+    launches = bindings.parse_bindings(OMPI_STDERR, topology)
+    assert launches == [
+        {0: ('aion-0001', [0, 32]), 1: ('aion-0001', [16, 48])},
+        {0: ('aion-0002', [2, 34]), 1: ('aion-0003', [3, 35])},
+    ]
+
+
+def test_parse_ompi_bindings_needs_the_topology():
+    assert bindings.parse_bindings(OMPI_STDERR) == []
+
+
+def test_srun_reports_take_precedence(topology):
+    launches = bindings.parse_bindings(SRUN_STDERR + OMPI_STDERR, topology)
+    assert len(launches) == 2
+    assert launches[0][1] == ('aion-0001', [8])
+
+
+@pytest.mark.parametrize('prefix', ['cpu-bind', 'cpu_bind', 'cpu-bind-cores', 'cpu_bind_cores'])
+def test_parse_srun_bindings_report_variants(prefix):
+    stderr = (f'{prefix}=MASK - aion-0001, task  0  0 [48120]: mask 0x1 set\n'
+              f'{prefix}=MASK - aion-0001, task  1  1 [48121]: mask 0x100 set\n')
+    assert bindings.parse_bindings(stderr) == [
+        {0: ('aion-0001', [0]), 1: ('aion-0001', [8])},
+    ]
+
+
+def test_launch_placements(topology):
+    assert bindings.launch_placements(SRUN_STDERR, topology) == [
+        ('aion-0001:0 aion-0001:8', 'CrossNuma'),
+        ('aion-0001:0 aion-0001:32', 'SameCore'),
+    ]
+    assert bindings.launch_placements(OMPI_STDERR, topology) == [
+        ('aion-0001:0,32 aion-0001:16,48', 'CrossSocket'),
+        ('aion-0002:2,34 aion-0003:3,35', 'CrossNode'),
+    ]
+
+
+def test_launch_class_unknown(topology):
+    # Without the node topology, only CrossNode is known
+    assert bindings.launch_class(None, {0: ('a', [0]), 1: ('a', [1])}) is None
+    assert bindings.launch_class(None, {0: ('a', [0]), 1: ('b', [1])}) == 'CrossNode'
+
+    # A CPU the topology does not have, a missing rank
+    assert bindings.launch_class(topology, {0: ('a', [0]), 1: ('a', [99])}) is None
+    assert bindings.launch_class(topology, {0: ('a', [0])}) is None
+
+    # Rank 1 spread over cores of different classes
+    assert bindings.launch_class(topology, {0: ('a', [0]), 1: ('a', [1, 2])}) is None
+
+
+def test_placement_error():
+    placements = [('a:0 a:1', 'SameL2'), ('a:0 a:8', 'CrossNuma')]
+    assert bindings.placement_error(placements[:1], ['SameL2', 'SameL3']) is None
+    assert bindings.placement_error(placements, ['SameL2']) == (
+        'ranks bound to a:0 a:8 (CrossNuma), expected SameL2')
+    assert bindings.placement_error([('a:0 a:1', None)], ['SameL2']) == (
+        'ranks bound to a:0 a:1 (unknown placement), expected SameL2')
+    assert 'no binding report' in bindings.placement_error([], ['SameL2'])
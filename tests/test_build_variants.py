@@ -0,0 +1,57 @@
+import pytest
+
+from osu_utils import build_variants
+
+ENVIRON_MODULES = ['env/testing/2023b', 'toolchain/foss/2023b', 'tools/EasyBuild']
+
+INTEL_REPORT = (
+    'OSU toolchain: modules=env/testing/2023b:tools/EasyBuild:GCCcore/13.2.0:'
+    'impi/2021.10.0:toolchain/intel/2023b mpi_root=/opt/software/impi/2021.10.0 '
+    'mpicc=/opt/software/impi/2021.10.0/mpi/2021.10.0/bin/mpicc '
+    'libmpi=/opt/software/impi/2021.10.0/mpi/2021.10.0/lib/release/libmpi.so.12\n'
+)
+
+
+def test_variant_modules_replace_the_toolchain():
+    assert build_variants.variant_modules('intel-2023b', ENVIRON_MODULES) == [
+        'env/testing/2023b', 'tools/EasyBuild', 'toolchain/intel/2023b']
+
+    # Flags only: the environment's toolchain, as for the baseline
+    assert build_variants.variant_modules('O3-native', ENVIRON_MODULES) == ENVIRON_MODULES
+    assert build_variants.variant_modules('default', ENVIRON_MODULES) == ENVIRON_MODULES
+
+
+def test_toolchain_commands():
+    assert build_variants.toolchain_commands('foss-2024a', ENVIRON_MODULES) == [
+        'module unload toolchain/foss/2023b', 'module load toolchain/foss/2024a']
+    assert build_variants.toolchain_commands('O3-native', ENVIRON_MODULES) == []
+
+
+def test_toolchain_report_command():
+    command = build_variants.toolchain_report_command('intel-2023b', 'c/mpi/pt2pt/osu_bw')
+    assert 'mpi_root=$EBROOTIMPI ' in command
+    assert 'ldd c/mpi/pt2pt/osu_bw ' in command
+
+
+def test_toolchain_error_of_a_clean_swap():
+    assert build_variants.toolchain_error('make\n' + INTEL_REPORT, 'intel-2023b',
+                                          ENVIRON_MODULES) is None
+
+
+@pytest.mark.parametrize('report, error', [
+    ('', 'no toolchain report in the build output'),
+    (INTEL_REPORT.replace('toolchain/intel/2023b', 'toolchain/foss/2023b'),
+     'toolchain/intel/2023b is not loaded'),
+    (INTEL_REPORT.replace('tools/EasyBuild', 'toolchain/foss/2023b'),
+     'toolchain/foss/2023b of the environment is still loaded'),
+    (INTEL_REPORT.replace('mpi_root=/opt/software/impi/2021.10.0', 'mpi_root='),
+     'no intelmpi module loaded'),
+    (INTEL_REPORT.replace('mpicc=/opt/software/impi/2021.10.0/mpi/2021.10.0/bin/mpicc',
+                          'mpicc=/opt/software/OpenMPI/4.1.6/bin/mpicc'),
+     'mpicc /opt/software/OpenMPI/4.1.6/bin/mpicc is not from /opt/software/impi/2021.10.0'),
+    (INTEL_REPORT.replace('libmpi=/opt/software/impi/2021.10.0/mpi/2021.10.0/lib/release/'
+                          'libmpi.so.12', 'libmpi='),
+     'libmpi (not found) is not from /opt/software/impi/2021.10.0'),
+])
+def test_toolchain_error(report, error):
+    assert build_variants.toolchain_error(report, 'intel-2023b', ENVIRON_MODULES) == error
@@ -0,0 +1,109 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from osu_utils import core_matrix
+from osu_utils.topology import parse_lstopo_xml
+
+# Stands for the launcher: prints the latency row of a pair, `{a}.{b}` us,
+# except for the pairs of CPU 3, which fail
+FAKE_LAUNCHER = '[ {a} -ne 3 ] && [ {b} -ne 3 ] && echo 8 {a}.{b}'
+
+
+@pytest.fixture
+def topology(lstopo_xml):
+    return parse_lstopo_xml(lstopo_xml())
+
+
+def test_matrix_cpus(topology):
+    assert core_matrix.matrix_cpus(topology) == list(range(32))
+    assert core_matrix.matrix_cpus(topology, all_pus=True) == list(range(64))
+
+
+def test_cache_domains(topology):
+    domains = core_matrix.cache_domains(topology)
+    # Cores 0-3 share an L3, the SMT sibling of a core is in its domain
+    assert domains[0] == domains[3] == domains[32]
+    assert domains[0] != domains[4]
+    assert domains[0][0] == 'l3'
+
+
+def test_cache_domains_without_l3(topology):
+    for core in topology['cores']:
+        core['l3'] = None
+
+    domains = core_matrix.cache_domains(topology)
+    assert domains[0] == domains[7] == ('numa', topology['cores'][0]['numa'])
+    assert domains[0] != domains[8]
+
+
+def test_parse_value():
+    output = '# OSU MPI Latency Test v7.2\n# Size Latency (us)\n0 0.19\n8 0.21\n'
+    assert core_matrix.parse_value(output, 8) == 0.21
+    assert core_matrix.parse_value(output, 16) is None
+
+
+def test_measure(topology):
+    cpus = [0, 1, 2, 3, 4]
+    log = io.StringIO()
+    results = core_matrix.measure(cpus, core_matrix.cache_domains(topology),
+                                  FAKE_LAUNCHER, 8, concurrency=2, log=log)
+
+    # Every pair is measured once
+    assert len(results) == 10
+    assert {frozenset(pair) for pair in results} == {
+        frozenset((a, b)) for a in cpus for b in cpus if a < b}
+    values = {frozenset(pair): value for pair, value in results.items()}
+    assert values[frozenset((0, 1))] in (0.1, 1.0)
+    assert values[frozenset((2, 3))] is None
+    assert log.getvalue().count('failed:') == 4
+
+
+def test_class_summary(topology):
+    results = {(0, 1): 0.2, (0, 2): 0.3, (0, 4): 0.5, (0, 16): 1.5, (0, 17): None}
+    summary = core_matrix.class_summary(topology, results)
+    assert list(summary) == ['SameL2', 'SameL3', 'SameNuma', 'CrossSocket']
+    assert summary['SameL2'] == {'pairs': 1, 'min': 0.2, 'median': 0.2,
+                                 'p95': 0.2, 'max': 0.2}
+
+
+def test_write_matrix(tmp_path):
+    output = str(tmp_path / 'core_matrix')
+    metadata = core_matrix.write_matrix(output, [0, 2, 4], {(0, 2): 0.25, (4, 0): 0.5,
+                                                          (2, 4): None}, {'unit': 'us'})
+    assert metadata['shape'] == [3, 3]
+    assert metadata['cpus'] == [0, 2, 4]
+    assert metadata['unit'] == 'us'
+
+    with open(output + '.json') as fp:
+        meta = json.load(fp)
+    matrix = np.fromfile(str(tmp_path / meta['file']),
+                         dtype=meta['dtype']).reshape(meta['shape'])
+    assert matrix[0, 1] == matrix[1, 0] == 0.25
+    assert matrix[0, 2] == matrix[2, 0] == 0.5
+    assert np.isnan(matrix[1, 2]) and np.isnan(matrix[0, 0])
+
+
+def test_main(lstopo_xml, tmp_path, capsys):
+    output = str(tmp_path / 'matrix')
+    assert core_matrix.main(['--topology', lstopo_xml(), '--launcher', FAKE_LAUNCHER,
+                             '--output', output, '--concurrency', '4',
+                             '--', 'osu_latency']) == 0
+
+    out = capsys.readouterr().out
+    assert '# Matrix: matrix.f32 (32x32 <f4)' in out
+    assert '# Class SameL2 pairs=' in out
+    assert '# Failed pairs: 31' in out
+
+    with open(output + '.json') as fp:
+        meta = json.load(fp)
+    assert meta['benchmark'] == 'osu_latency'
+    assert meta['failed_pairs'] == 31
+    assert sum(stats['pairs'] for stats in meta['summary'].values()) == 32 * 31 // 2 - 31
+
+
+def test_main_needs_a_benchmark(lstopo_xml):
+    with pytest.raises(SystemExit):
+        core_matrix.main(['--topology', lstopo_xml()])
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import detect_regressions
+from perf_store import connect, ingest
+
+PERFLOG_HEADER = (
+    'job_completion_time|system|partition|environ|jobid|job_nodelist|display_name|'
+    'install_method|scenario|'
+    'latency_var|latency_value|latency_ref|latency_lower_thres|latency_upper_thres|latency_unit|'
+    'latency_p95_var|latency_p95_value|latency_p95_ref|latency_p95_lower_thres|'
+    'latency_p95_upper_thres|latency_p95_unit'
+)
+
+
+def _noisy(rng, mean, count, noise=0.01):
+    return mean * (1 + noise * rng.standard_normal(count))
+
+
+def test_detect_changes_finds_a_sustained_drop():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([_noisy(rng, 12000.0, 30), _noisy(rng, 11040.0, 20)])
+    changes = detect_regressions.detect_changes(values)
+    assert len(changes) == 1
+    index, before, after, confidence = changes[0]
+    assert index == 30
+    assert before == pytest.approx(12000.0, rel=0.01)
+    assert after == pytest.approx(11040.0, rel=0.01)
+    assert confidence > 0.99
+
+
+def test_detect_changes_finds_several_changes():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([_noisy(rng, 2.0, 20), _noisy(rng, 2.4, 20), _noisy(rng, 2.0, 20)])
+    assert [index for index, *_ in detect_regressions.detect_changes(values)] == [20, 40]
+
+
+def test_detect_changes_ignores_noise_and_single_runs():
+    rng = np.random.default_rng(3)
+    values = _noisy(rng, 2.0, 60)
+    assert detect_regressions.detect_changes(values) == []
+
+    # One very slow run never makes a segment of its own
+    values[30] = 20.0
+    assert detect_regressions.detect_changes(values) == []
+
+
+def test_detect_changes_ignores_small_shifts():
+    # Significant on a flat series, but below min_shift
+    values = [100.0] * 20 + [101.0] * 20
+    assert detect_regressions.detect_changes(values) == []
+    assert [index for index, *_ in detect_regressions.detect_changes(values, min_shift=0.005)] == [20]
+
+
+def test_detect_changes_short_series():
+    assert detect_regressions.detect_changes([1.0] * 5 + [2.0] * 4) == []
+    assert detect_regressions.detect_changes([]) == []
+
+
+@pytest.mark.parametrize('metric, expected', [
+    ('bandwidth', True),
+    ('bandwidth_8192', True),
+    ('msgrate', True),
+    ('overlap', True),
+    ('latency', False),
+    ('latency_8192', False),
+])
+def test_higher_is_better(metric, expected):
+    assert detect_regressions.higher_is_better(metric) == expected
+
+
+def test_find_regressions(tmp_path):
+    rng = np.random.default_rng(4)
+    latencies = np.concatenate([_noisy(rng, 2.0, 15), _noisy(rng, 2.3, 15)])
+    start = datetime(2026, 9, 1)
+    lines = [PERFLOG_HEADER]
+    for day, latency in enumerate(latencies):
+        when = (start + timedelta(days=day)).isoformat(timespec='seconds')
+        # The p95 jumps but is a statistic: never judged
+        p95 = 2.5 if day < 10 else 5.0
+        lines.append(f'{when}|aion|batch|foss-2023b|{day}|aion-0001|'
+                     f'EESSIOsuSameNumaNode %benchmark_info=osu_latency|EESSI|SameNumaNode|'
+                     f'latency|{latency:.4f}|2.0|-0.1|0.1|us|latency_p95|{p95}||||us')
+
+    path = tmp_path / 'EESSIOsuSameNumaNode.log'
+    path.write_text('\n'.join(lines) + '\n')
+    conn = connect(':memory:')
+    ingest(conn, [str(path)])
+
+    changes = list(detect_regressions.find_regressions(conn))
+    assert len(changes) == 1
+    change = changes[0]
+    assert change['metric'] == 'latency'
+    assert change['install_method'] == 'EESSI'
+    assert change['kind'] == 'regression'
+    assert (change['runs_before'], change['runs_after']) == (15, 15)
+    assert change['shift'] == pytest.approx(0.15, abs=0.02)
+
+    assert list(detect_regressions.find_regressions(conn, install_method='source')) == []
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from osu_utils import easybuild
+
+EASYCONFIG = '''\
+easyblock = 'ConfigureMake'
+
+name = 'OSU-Micro-Benchmarks'
+version = '7.2'
+
+toolchain = {'name': 'foss', 'version': '2023b'}
+
+sources = [SOURCELOWER_TAR_GZ]
+moduleclass = 'perf'
+'''
+
+TOOLCHAIN_MODULES = ['toolchain/foss/2023b']
+
+FLAT_MODULE = 'OSU-Micro-Benchmarks/7.2-foss-2023b'
+CATEGORIZED_MODULE = 'perf/OSU-Micro-Benchmarks/7.2-foss-2023b'
+
+
+def _dry_run_output(module):
+    return (
+        '== Temporary log file in case of crash /tmp/eb-x/easybuild-x.log\n'
+        'Dry run: printing build status of easyconfigs and dependencies\n'
+        'CFGS=/opt/easyconfigs\n'
+        ' * [x] $CFGS/f/foss/foss-2023b.eb (module: toolchain/foss/2023b)\n'
+        f' * [ ] /stage/OSU-Micro-Benchmarks-7.2-foss-2023b.eb (module: {module})\n'
+        '== Temporary log file(s) /tmp/eb-x/easybuild-x.log* have been removed.\n'
+    )
+
+
+@pytest.fixture
+def easyconfig(tmp_path):
+    path = tmp_path / 'OSU-Micro-Benchmarks-7.2-foss-2023b.eb'
+    path.write_text(EASYCONFIG)
+    return str(path)
+
+
+def _install(prefix, easyconfig, module_name, digest=None):
+    module_file = os.path.join(prefix, 'modules', 'all', module_name + '.lua')
+    os.makedirs(os.path.dirname(module_file))
+    open(module_file, 'w').close()
+
+    stamp = easybuild.stamp_path(prefix, module_name)
+    os.makedirs(os.path.dirname(stamp))
+    with open(stamp, 'w') as fp:
+        fp.write((digest or easybuild.easyconfig_digest(easyconfig, TOOLCHAIN_MODULES)) + '\n')
+
+
+def test_easyconfig_module(easyconfig):
+    assert easybuild.easyconfig_module(easyconfig) == FLAT_MODULE
+
+
+@pytest.mark.parametrize('module', [FLAT_MODULE, CATEGORIZED_MODULE])
+def test_dry_run_module(easyconfig, module):
+    assert easybuild.dry_run_module(_dry_run_output(module), easyconfig) == module
+
+
+def test_dry_run_module_not_listed(easyconfig):
+    assert easybuild.dry_run_module('ERROR: Missing modules for dependencies', easyconfig) is None
+
+
+@pytest.fixture
+def eb_standin(tmp_path, monkeypatch):
+    '''An `eb` on the PATH printing the dry run of a naming scheme.'''
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    monkeypatch.setenv('PATH', f'{bin_dir}{os.pathsep}{os.environ["PATH"]}')
+
+    def standin(module):
+        eb = bin_dir / 'eb'
+        eb.write_text("#!/bin/sh\ncat <<'EOF'\n" + _dry_run_output(module) + 'EOF\n')
+        eb.chmod(0o755)
+
+    return standin
+
+
+@pytest.mark.parametrize('module', [FLAT_MODULE, CATEGORIZED_MODULE])
+def test_eb_module(easyconfig, eb_standin, module):
+    eb_standin(module)
+    assert easybuild.eb_module(easyconfig) == module
+
+
+def test_eb_module_without_eb(easyconfig, tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    assert easybuild.eb_module(easyconfig) == FLAT_MODULE
+
+
+@pytest.mark.parametrize('module', [FLAT_MODULE, CATEGORIZED_MODULE])
+def test_installed_module(easyconfig, tmp_path, module):
+    prefix = str(tmp_path / 'prefix')
+    _install(prefix, easyconfig, module)
+    assert easybuild.installed_module(prefix, easyconfig, TOOLCHAIN_MODULES, module) == module
+
+    # The toolchain changed since the installation
+    assert easybuild.installed_module(prefix, easyconfig, ['toolchain/foss/2024a'],
+                                      module) is None
+
+
+def test_installed_module_of_the_configured_scheme(easyconfig, eb_standin, tmp_path):
+    # Installed with a categorized scheme: the EasyBuildMNS name is not there
+    prefix = str(tmp_path / 'prefix')
+    _install(prefix, easyconfig, CATEGORIZED_MODULE)
+    assert easybuild.installed_module(prefix, easyconfig, TOOLCHAIN_MODULES,
+                                      FLAT_MODULE) is None
+
+    eb_standin(CATEGORIZED_MODULE)
+    assert easybuild.installed_module(prefix, easyconfig,
+                                      TOOLCHAIN_MODULES) == CATEGORIZED_MODULE
+
+
+def test_installed_module_without_stamp(easyconfig, tmp_path):
+    prefix = str(tmp_path / 'prefix')
+    _install(prefix, easyconfig, FLAT_MODULE)
+    os.remove(easybuild.stamp_path(prefix, FLAT_MODULE))
+    assert easybuild.installed_module(prefix, easyconfig, TOOLCHAIN_MODULES,
+                                      FLAT_MODULE) is None
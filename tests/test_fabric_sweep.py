@@ -0,0 +1,81 @@
+import csv
+import io
+import os
+
+import pytest
+
+from osu_utils import fabric_sweep
+
+STANDIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'reframe_tests', 'slurm_standin')
+NODES = [f'node-00{index}' for index in range(1, 9)]
+
+
+@pytest.fixture
+def slurm_standin(monkeypatch):
+    '''Stand-in srun, scontrol and benchmarks first in PATH.'''
+    monkeypatch.setenv('PATH', f'{STANDIN_DIR}{os.pathsep}{os.environ["PATH"]}')
+    monkeypatch.delenv('SLURM_STANDIN_NODES', raising=False)
+    monkeypatch.delenv('SLURM_STANDIN_SLOW', raising=False)
+    return monkeypatch
+
+
+def test_parse_benchmark():
+    assert fabric_sweep.parse_benchmark('latency:8192:osu_latency -x 10') == (
+        'latency', 8192, 'osu_latency -x 10')
+
+
+def test_parse_value():
+    output = '# OSU MPI Bandwidth Test v7.2\n# Size Bandwidth (MB/s)\n1048576 12323.30\n'
+    assert fabric_sweep.parse_value(output, 1048576) == 12323.3
+    assert fabric_sweep.parse_value(output, 8192) is None
+
+
+def test_job_nodes(slurm_standin):
+    assert fabric_sweep.job_nodes() == NODES
+    slurm_standin.setenv('SLURM_STANDIN_NODES', 'aion-0001 aion-0002')
+    assert fabric_sweep.job_nodes() == ['aion-0001', 'aion-0002']
+
+
+def test_measure():
+    # Stands for srun and the benchmark: echoes the row of the pair
+    benchmarks = [('latency', 8, 'true')]
+    launcher = '[ {a} != c ] && [ {b} != c ] && echo 8 1.5 &&'
+    log = io.StringIO()
+    results = fabric_sweep.measure(['a', 'b', 'c', 'd'], benchmarks, launcher,
+                                   concurrency=1, log=log)
+    assert len(results['latency']) == 6
+    failed = sorted(pair for pair, value in results['latency'].items() if value is None)
+    assert all('c' in pair for pair in failed) and len(failed) == 3
+    assert log.getvalue().count('# Round ') == 3
+
+
+def test_measure_stops_after_some_rounds():
+    results = fabric_sweep.measure(['a', 'b', 'c', 'd'], [('latency', 8, 'true')],
+                                   'echo 8 1.5 &&', rounds=1)
+    assert len(results['latency']) == 2
+
+
+def test_main(slurm_standin, tmp_path, capsys):
+    slurm_standin.setenv('SLURM_STANDIN_SLOW', 'node-003')
+    output = str(tmp_path / 'fabric_pairs.csv')
+    assert fabric_sweep.main(['--benchmark', 'latency:8192:osu_latency',
+                              '--benchmark', 'bandwidth:1048576:osu_bw',
+                              '--output', output]) == 0
+
+    out = capsys.readouterr().out
+    assert '# Metric latency pairs=28 ' in out
+    assert '# Failed pairs: 0' in out
+
+    with open(output) as fp:
+        rows = list(csv.DictReader(fp))
+    assert len(rows) == 2 * 28
+
+    # The stand-in only slows the first node of a pair down
+    outliers = {(row['metric'], row['node_a']) for row in rows if row['outlier'] == '1'}
+    assert outliers == {('latency', 'node-003'), ('bandwidth', 'node-003')}
+
+
+def test_main_needs_two_nodes(capsys):
+    assert fabric_sweep.main(['--benchmark', 'latency:8:osu_latency',
+                              '--nodes', 'node-001']) == 1
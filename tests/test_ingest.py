@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+import ingest
+
+RESULTS_TXT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'results.txt')
+
+PERFLOG = '''\
+job_completion_time|system|partition|environ|jobid|job_nodelist|display_name|install_method|scenario|latency_var|latency_value|latency_ref|latency_lower_thres|latency_upper_thres|latency_unit
+2026-10-01T10:00:00|aion|batch|foss-2023b|101|aion-0313|EESSIOsuSameNumaNode %benchmark_info=osu_latency|EESSI|SameNumaNode|latency|0.57|0.55|-0.1|0.1|us
+'''
+
+RUN_REPORT = {
+    'session_info': {'cmdline': 'reframe -r'},
+    'runs': [{
+        'testcases': [{
+            'display_name': 'OsuDifferentNodes %benchmark_info=osu_bw',
+            'system': 'aion', 'partition': 'batch', 'environ': 'foss-2023b',
+            'job_nodelist': ['aion-0064', 'aion-0065'],
+            'result': 'pass',
+            'perfvalues': {'aion:batch:bandwidth': [12300.0, 12000.0, -0.1, None, 'MB/s']},
+        }],
+    }],
+}
+
+
+@pytest.fixture
+def results_dir(tmp_path):
+    (tmp_path / 'EESSIOsuSameNumaNode.log').write_text(PERFLOG)
+    (tmp_path / 'run-report.json').write_text(json.dumps(RUN_REPORT, indent=2))
+    with open(RESULTS_TXT) as f:
+        (tmp_path / 'results.txt').write_text(f.read())
+
+    # Files a directory walk meets and must skip
+    (tmp_path / 'samples.csv').write_text('system,value\naion,1.0\n')
+    (tmp_path / 'references.json').write_text('{"SOURCE": {}}\n')
+    (tmp_path / 'rfm_job.out').write_text('# OSU MPI Latency Test\n0 0.57\n')
+    (tmp_path / 'perflog.gz').write_bytes(b'\x1f\x8b\x08\x00\x00\x00\x00\x00')
+    (tmp_path / 'empty.txt').write_text('')
+    return tmp_path
+
+
+def test_detect_format(results_dir):
+    formats = {name: ingest.detect_format(str(results_dir / name))
+               for name in os.listdir(results_dir)}
+    assert formats == {
+        'EESSIOsuSameNumaNode.log': 'perflog',
+        'run-report.json': 'report',
+        'results.txt': 'table',
+        'samples.csv': None,
+        'references.json': None,
+        'rfm_job.out': None,
+        'perflog.gz': None,
+        'empty.txt': None,
+    }
+
+
+def test_detect_format_missing_file(tmp_path):
+    assert ingest.detect_format(str(tmp_path / 'missing.log')) is None
+
+
+def test_iter_samples_skips_unrecognised_files(results_dir):
+    samples = list(ingest.iter_samples(str(results_dir)))
+    tests = {sample['test'] for sample in samples}
+    assert 'EESSIOsuSameNumaNode' in tests
+    assert 'OsuDifferentNodes' in tests
+    assert 'EasyBuildOsuSameSocketDifferentNuma' in tests
+    assert all(sample['value'] is not None for sample in samples)
+
+
+def test_perflog_sample(tmp_path):
+    path = tmp_path / 'EESSIOsuSameNumaNode.log'
+    path.write_text(PERFLOG)
+    sample, = ingest.iter_perflog(str(path))
+    assert sample['install_method'] == 'EESSI'
+    assert sample['scenario'] == 'SameNumaNode'
+    assert sample['benchmark'] == 'osu_latency'
+    assert sample['value'] == 0.57
+    assert sample['nodes'] == 'aion-0313'
+
+
+def test_run_report_sample(tmp_path):
+    path = tmp_path / 'run-report.json'
+    path.write_text(json.dumps(RUN_REPORT))
+    sample, = ingest.iter_run_report(str(path))
+    assert sample['metric'] == 'bandwidth'
+    assert sample['install_method'] == 'SOURCE'
+    assert sample['scenario'] == 'DifferentNodes'
+    assert sample['nodes'] == 'aion-0064,aion-0065'
+
+
+@pytest.mark.parametrize('pvar, expected', [
+    ('latency', (None, 'latency', None)),
+    ('latency_8192', (None, 'latency', 8192)),
+    ('latency_p95', (None, 'latency_p95', None)),
+    ('SameNumaNode_latency', ('SameNumaNode', 'latency', None)),
+    ('SameNumaNode_latency_outliers', ('SameNumaNode', 'latency_outliers', None)),
+])
+def test_split_perf_variable(pvar, expected):
+    assert ingest.split_perf_variable(pvar) == expected
+
+
+@pytest.mark.parametrize('nodelist, expected', [
+    ('aion-0064', ['aion-0064']),
+    ('aion-031[3-4],aion-0064', ['aion-0313', 'aion-0314', 'aion-0064']),
+    ('aion-[0098,0100-0101]', ['aion-0098', 'aion-0100', 'aion-0101']),
+    (['aion-0064', 'aion-0065'], ['aion-0064', 'aion-0065']),
+    ('null', []),
+    (None, []),
+])
+def test_expand_nodelist(nodelist, expected):
+    assert ingest.expand_nodelist(nodelist) == expected
+
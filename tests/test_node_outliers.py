@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import node_outliers
+from ingest import iter_samples
+
+RESULTS_TXT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'results.txt')
+
+
+def _sample(nodes, value, metric='latency', scenario='SameNumaNode',
+            install_method='EESSI', pvar=None):
+    return {
+        'system': 'aion', 'partition': 'batch', 'scenario': scenario,
+        'benchmark': 'osu_bw' if metric == 'bandwidth' else 'osu_latency',
+        'metric': metric, 'message_size': None, 'install_method': install_method,
+        'pvar': pvar or metric, 'value': value, 'nodes': nodes,
+    }
+
+
+def test_relative_slowdowns_direction():
+    samples = [_sample('a', 2.0), _sample('b', 2.0), _sample('c', 3.0),
+               _sample('a', 100.0, 'bandwidth'), _sample('b', 100.0, 'bandwidth'),
+               _sample('c', 50.0, 'bandwidth')]
+    slowdowns = {(sample['nodes'], sample['metric']): slowdown
+                 for sample, _, slowdown in node_outliers.relative_slowdowns(samples)}
+    # Worse is positive: higher latency, lower bandwidth
+    assert slowdowns[('c', 'latency')] == pytest.approx(0.5)
+    assert slowdowns[('c', 'bandwidth')] == pytest.approx(0.5)
+    assert slowdowns[('a', 'latency')] == 0.0
+
+
+def test_relative_slowdowns_skips_small_groups_and_statistics():
+    samples = [_sample('a', 2.0), _sample('b', 3.0),
+               _sample('a', 2.0, pvar='latency_p95'), _sample('b', 2.0, pvar='latency_p95'),
+               _sample('c', 9.0, pvar='latency_p95'), _sample('', 2.0), _sample('d', None)]
+    assert list(node_outliers.relative_slowdowns(samples)) == []
+
+
+def test_node_profiles_flags_nodes_slow_in_several_groups():
+    samples = []
+    for scenario in ('SameNumaNode', 'DifferentSockets'):
+        samples += [_sample(node, 2.0, scenario=scenario) for node in ('a', 'b', 'c')]
+        samples.append(_sample('slow', 2.4, scenario=scenario))
+
+    # A scenario that is slow on one run of a node is not enough
+    samples += [_sample(node, 2.0, scenario='DifferentNodes') for node in ('a', 'b')]
+    samples.append(_sample('c,d', 3.0, scenario='DifferentNodes'))
+
+    profiles = node_outliers.node_profiles(samples)
+    flagged = [profile['node'] for profile in profiles if profile['flagged']]
+    assert flagged == ['slow']
+    assert profiles[0]['slow_groups'] == 2
+    assert profiles[0]['slow_runs'] == 'EESSI/DifferentSockets/latency EESSI/SameNumaNode/latency'
+
+    by_node = {profile['node']: profile for profile in profiles}
+    assert by_node['c']['slow_groups'] == 1
+    assert not by_node['c']['flagged']
+
+
+def test_node_profiles_of_results_txt():
+    profiles = node_outliers.node_profiles(iter_samples(RESULTS_TXT))
+    assert [profile['node'] for profile in profiles if profile['flagged']] == ['aion-0270']
+
+
+def test_main_exit_status(capsys):
+    assert node_outliers.main([RESULTS_TXT]) == 1
+    assert 'aion-0270' in capsys.readouterr().out
+
+    assert node_outliers.main([RESULTS_TXT, '--system', 'iris']) == 0
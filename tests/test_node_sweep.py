@@ -0,0 +1,76 @@
+import csv
+import io
+import os
+
+import pytest
+
+from osu_utils import node_sweep
+
+STANDIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'reframe_tests', 'slurm_standin')
+BENCHMARKS = ['--benchmark', 'latency:8192:osu_latency',
+              '--benchmark', 'bandwidth:1048576:osu_bw']
+
+
+@pytest.fixture
+def slurm_standin(monkeypatch):
+    '''Stand-in srun, scontrol and benchmarks first in PATH.'''
+    monkeypatch.setenv('PATH', f'{STANDIN_DIR}{os.pathsep}{os.environ["PATH"]}')
+    monkeypatch.delenv('SLURM_STANDIN_NODES', raising=False)
+    monkeypatch.delenv('SLURM_STANDIN_SLOW', raising=False)
+    return monkeypatch
+
+
+def test_measure():
+    # Stands for srun and the benchmark: node c fails
+    launcher = '[ {node} != c ] && echo 8 1.5 && true'
+    steps = [('SameNumaNode', 'latency', 8, 'osu_latency'),
+             ('DifferentSockets', 'latency', 8, 'osu_latency')]
+    log = io.StringIO()
+    results = node_sweep.measure(['a', 'b', 'c'], steps, launcher, concurrency=2, log=log)
+    assert results == {
+        ('SameNumaNode', 'latency'): {'a': 1.5, 'b': 1.5, 'c': None},
+        ('DifferentSockets', 'latency'): {'a': 1.5, 'b': 1.5, 'c': None},
+    }
+    assert '# Node c failed SameNumaNode latency:' in log.getvalue()
+
+
+def test_measure_passes_the_scenario_options():
+    # The row is only printed when the options of the scenario reach the launch
+    launcher = 'case "$*" in *--ntasks-per-socket=1*) echo 8 2.0;; esac; true'
+    results = node_sweep.measure(['a'], [('DifferentSockets', 'latency', 8, '')],
+                                 f'sh -c \'{launcher}\' sh {{node}}', log=io.StringIO())
+    assert results[('DifferentSockets', 'latency')] == {'a': 2.0}
+
+
+@pytest.mark.parametrize('partition, scenarios', [
+    ('aion:batch', 3),
+    ('iris:batch', 2),
+])
+def test_main(slurm_standin, tmp_path, capsys, partition, scenarios):
+    slurm_standin.setenv('SLURM_STANDIN_SLOW', 'node-005')
+    output = str(tmp_path / 'node_health.csv')
+    assert node_sweep.main(['--partition', partition, '--output', output] + BENCHMARKS) == 0
+
+    out = capsys.readouterr().out
+    assert out.count('# Scenario ') == 2 * scenarios
+    assert '# Scenario DifferentSockets bandwidth nodes=8 ' in out
+    assert '# Failed runs: 0' in out
+
+    # Slow in every step
+    slow = [line for line in out.splitlines() if line.startswith('# Slow node')]
+    assert len(slow) == 1
+    assert slow[0].startswith('# Slow node node-005: SameNumaNode/latency ')
+    assert len(slow[0].split(': ', 1)[1].split()) == 2 * scenarios
+
+    with open(output) as fp:
+        rows = list(csv.DictReader(fp))
+    assert len(rows) == 8 * 2 * scenarios
+    assert {row['node'] for row in rows if row['outlier'] == '1'} == {'node-005'}
+
+
+def test_main_on_given_nodes(slurm_standin, tmp_path, capsys):
+    output = str(tmp_path / 'node_health.csv')
+    assert node_sweep.main(['--partition', 'iris:batch', '--output', output,
+                            '--nodes', 'iris-001', 'iris-002'] + BENCHMARKS) == 0
+    assert '# Scenario SameNumaNode latency nodes=2 ' in capsys.readouterr().out
@@ -0,0 +1,23 @@
+import pytest
+
+from osu_utils import opt_in
+
+
+def test_nothing_is_selected_by_default(monkeypatch):
+    monkeypatch.delenv('OSU_OPT_IN', raising=False)
+    assert opt_in.selected_groups() == set()
+
+
+def test_selected_groups_from_the_environment(monkeypatch):
+    monkeypatch.setenv('OSU_OPT_IN', ' health, ,sweep,health')
+    assert opt_in.selected_groups() == {'health', 'sweep'}
+
+
+def test_selected_groups_from_a_value(monkeypatch):
+    monkeypatch.setenv('OSU_OPT_IN', 'health')
+    assert opt_in.selected_groups('') == set()
+
+
+def test_unknown_group():
+    with pytest.raises(ValueError, match='unknown opt-in group'):
+        opt_in.selected_groups('health,everything')
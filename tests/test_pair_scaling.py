@@ -0,0 +1,100 @@
+import io
+import os
+
+import pytest
+
+from osu_utils import pair_scaling
+
+STANDIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'reframe_tests', 'slurm_standin')
+
+MBW_MR_OUTPUT = '''\
+# OSU MPI Multiple Bandwidth / Message Rate Test v7.2
+# [ pairs: 2 ] [ window size: 64 ]
+# Size                  MB/s        Messages/s
+8                      95.20       11900000.00
+1048576             24010.50          22898.00
+'''
+
+
+@pytest.mark.parametrize('max_pairs, counts', [
+    (1, [1]),
+    (2, [1, 2]),
+    (16, [1, 2, 4, 8, 16]),
+    (24, [1, 2, 4, 8, 16, 24]),
+    (64, [1, 2, 4, 8, 16, 32, 64]),
+])
+def test_pair_counts(max_pairs, counts):
+    assert pair_scaling.pair_counts(max_pairs) == counts
+
+
+def test_knee_of_a_saturating_curve():
+    xs = [1, 2, 4, 8, 16, 32, 64]
+    assert pair_scaling.knee(xs, [min(x, 16) * 1000 for x in xs]) == 16
+    assert pair_scaling.knee(xs, [min(x, 4) * 1000 for x in xs]) == 4
+
+
+def test_knee_of_a_linear_curve():
+    # No point above the chord: the first one
+    xs = [1, 2, 4, 8]
+    assert pair_scaling.knee(xs, [1000 * x for x in xs]) == 1
+
+
+@pytest.mark.parametrize('xs, ys, expected', [
+    ([1], [5.0], 1),
+    ([1, 2], [5.0, 9.0], 2),
+    ([1, 2, 4], [5.0, 5.0, 5.0], 1),
+])
+def test_knee_degenerate_curves(xs, ys, expected):
+    assert pair_scaling.knee(xs, ys) == expected
+
+
+def test_run_step():
+    command = f"printf '%s' '{MBW_MR_OUTPUT}'"
+    assert pair_scaling.run_step(command, [8, 1048576]) == {
+        8: (95.2, 11900000.0),
+        1048576: (24010.5, 22898.0),
+    }
+
+
+@pytest.mark.parametrize('command', [
+    "printf '%s' '# OSU MPI Multiple Bandwidth'",
+    "echo '8 95.20 11900000.00'; exit 1",
+])
+def test_run_step_failures(command):
+    log = io.StringIO()
+    assert pair_scaling.run_step(command, [8, 1048576], log) is None
+    assert log.getvalue().startswith(f'# Step failed: {command}')
+
+
+@pytest.mark.parametrize('layout', ['intranode', 'internode'])
+def test_main(monkeypatch, capsys, layout):
+    monkeypatch.setenv('PATH', f'{STANDIN_DIR}{os.pathsep}{os.environ["PATH"]}')
+    monkeypatch.setenv('SLURM_STANDIN_SATURATION', '8')
+    assert pair_scaling.main(['--layout', layout, '--max-pairs', '32',
+                              '--', 'osu_mbw_mr']) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    rows = [line.split() for line in lines if not line.startswith('#')]
+    assert [int(row[0]) for row in rows] == [1, 2, 4, 8, 16, 32]
+    assert float(rows[1][1]) == pytest.approx(2 * float(rows[0][1]), rel=0.05)
+    assert lines[-3].startswith('# Full node: pairs=32 bandwidth=')
+    assert lines[-2] == '# Knee: bandwidth=8 msgrate=8'
+    assert lines[-1] == '# Failed steps: 0'
+
+
+def test_main_with_failed_steps(capsys):
+    launcher = '[ {pairs} -ne 2 ] && printf "8 10 {tasks}0\\n1048576 {tasks}00 1\\n" &&'
+    assert pair_scaling.main(['--layout', 'intranode', '--max-pairs', '4',
+                              '--launcher', launcher, '--', 'true']) == 0
+
+    out = capsys.readouterr().out
+    assert [line.split()[0] for line in out.splitlines() if not line.startswith('#')] == [
+        '1', '4']
+    assert '# Full node: pairs=4 bandwidth=800.00 msgrate=80.00' in out
+    assert '# Failed steps: 1' in out
+
+
+def test_main_needs_a_benchmark():
+    with pytest.raises(SystemExit):
+        pair_scaling.main(['--layout', 'intranode'])
@@ -0,0 +1,45 @@
+import itertools
+
+import pytest
+
+from osu_utils import pairing
+
+
+@pytest.mark.parametrize('count', [2, 3, 4, 7, 8, 16])
+def test_round_robin_covers_every_pair_once(count):
+    rounds = pairing.round_robin(range(count))
+    pairs = [frozenset(pair) for pairs in rounds for pair in pairs]
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == {frozenset(pair) for pair in itertools.combinations(range(count), 2)}
+
+
+@pytest.mark.parametrize('count, expected_rounds', [(4, 3), (5, 5), (8, 7)])
+def test_round_robin_rounds_are_disjoint(count, expected_rounds):
+    rounds = pairing.round_robin(range(count))
+    assert len(rounds) == expected_rounds
+    for pairs in rounds:
+        items = [item for pair in pairs for item in pair]
+        assert len(items) == len(set(items))
+
+
+def test_round_robin_of_one_item():
+    assert all(not pairs for pairs in pairing.round_robin(['a']))
+
+
+def test_waves_concurrency():
+    pairs = [(0, 1), (2, 3), (4, 5), (6, 7), (8, 9)]
+    assert pairing.waves(pairs, 2) == [[(0, 1), (2, 3)], [(4, 5), (6, 7)], [(8, 9)]]
+    assert pairing.waves(pairs, 0) == [pairs]
+
+
+def test_waves_conflicts():
+    # Cores 0-3 and 4-7 share an L3 domain
+    l3 = lambda core: core // 4
+    conflicts = lambda pair: {l3(core) for core in pair}
+    waves = pairing.waves([(0, 1), (2, 3), (4, 5), (0, 4)], 0, conflicts)
+    assert waves == [[(0, 1), (4, 5)], [(2, 3)], [(0, 4)]]
+
+
+def test_run_concurrently():
+    results = pairing.run_concurrently(['echo one', 'echo two >&2; exit 3'])
+    assert results == [(0, 'one\n'), (3, 'two\n')]
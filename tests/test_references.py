@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from osu_utils import references
+
+
+@pytest.fixture
+def references_path(tmp_path):
+    refs = {}
+    references.set_reference(refs, 'EESSI', 'SameNumaNode', 'osu_latency',
+                             'aion:batch', 'latency', (0.57, -0.1, 0.1, 'us'))
+    references.set_reference(refs, 'EESSI', 'SameNumaNode', 'osu_bw',
+                             'aion:batch', 'bandwidth', (14830.5, -0.1, None, 'MB/s'))
+    return references.write_references(refs, str(tmp_path / 'references.json'))
+
+
+def test_scenario_references(references_path):
+    assert references.scenario_references(
+        'EESSI', 'SameNumaNode', 'osu_latency', references_path) == {
+        'aion:batch': {'latency': (0.57, -0.1, 0.1, 'us')},
+    }
+
+
+@pytest.mark.parametrize('install_method, scenario, benchmark', [
+    ('SOURCE', 'SameNumaNode', 'osu_latency'),
+    ('EESSI', 'CrossNode', 'osu_latency'),
+    ('EESSI', 'SameNumaNode', 'osu_bibw'),
+])
+def test_scenario_references_missing(references_path, install_method, scenario, benchmark):
+    assert references.scenario_references(
+        install_method, scenario, benchmark, references_path) == {}
+
+
+def test_scenario_references_without_file(tmp_path):
+    path = str(tmp_path / 'missing.json')
+    assert references.scenario_references('EESSI', 'SameNumaNode', 'osu_bw', path) == {}
+
+
+def test_load_references_reloads_changed_files(references_path):
+    assert 'EESSI' in references.load_references(references_path)
+
+    refs = {}
+    references.set_reference(refs, 'SOURCE', 'CrossNode', 'osu_bw', 'aion:batch',
+                             'bandwidth', (12300.0, -0.1, None, 'MB/s'))
+    references.write_references(refs, references_path)
+    stat = os.stat(references_path)
+    os.utime(references_path, (stat.st_atime, stat.st_mtime + 10))
+    assert list(references.load_references(references_path)) == ['SOURCE']
+
+
+def test_set_reference_returns_the_previous_entry():
+    refs = {}
+    assert references.set_reference(refs, 'EESSI', 'CrossNode', 'osu_bw', 'aion:batch',
+                                    'bandwidth', (1.0, -0.1, None, 'MB/s')) is None
+    assert references.set_reference(refs, 'EESSI', 'CrossNode', 'osu_bw', 'aion:batch',
+                                    'bandwidth', (2.0, -0.1, None, 'MB/s')) == [
+        1.0, -0.1, None, 'MB/s']
+
+
+def test_write_references_keeps_the_shipped_layout(tmp_path, monkeypatch):
+    monkeypatch.delenv('OSU_REFERENCES', raising=False)
+    with open(references.default_references_path()) as f:
+        shipped = f.read()
+
+    path = str(tmp_path / 'references.json')
+    references.write_references(references.load_references(), path)
+    with open(path) as f:
+        assert f.read() == shipped
+
+
+REFERENCE = {
+    'aion:batch:latency': (0.57, -0.1, 0.1, 'us'),
+}
+
+
+@pytest.mark.parametrize('required, missing', [
+    (None, ['bandwidth']),
+    (True, ['bandwidth']),
+    (False, []),
+])
+def test_missing_references_of_a_referenced_test(required, missing):
+    perf_vars = ['latency', 'latency_p95', 'bandwidth']
+    assert references.missing_references(REFERENCE, 'aion:batch', perf_vars,
+                                         required) == missing
+
+
+@pytest.mark.parametrize('required, missing', [
+    (None, []),
+    (True, ['latency', 'msgrate']),
+    (False, []),
+])
+def test_missing_references_of_an_unreferenced_family(required, missing):
+    # A family with no reference on the partition yet, e.g. the fabric sweep
+    perf_vars = ['latency', 'latency_outliers', 'msgrate', 'msgrate_knee']
+    assert references.missing_references(REFERENCE, 'iris:batch', perf_vars,
+                                         required) == missing
+
+
+def test_missing_references_without_judged_variables():
+    assert references.missing_references({}, 'aion:batch', ['latency_cv'], True) == []
+
+
+@pytest.mark.parametrize('pvar, judged', [
+    ('latency', True),
+    ('bandwidth_8192', True),
+    ('SameNumaNode_latency', True),
+    ('latency_p95', False),
+    ('latency_cv', False),
+    ('latency_CrossNuma_max', False),
+    ('bandwidth_outliers', False),
+    ('msgrate_knee', False),
+])
+def test_unjudged_pvar_regex(pvar, judged):
+    assert (references.UNJUDGED_PVAR_REGEX.search(pvar) is None) == judged
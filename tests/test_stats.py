@@ -0,0 +1,83 @@
+import math
+
+import pytest
+
+from osu_utils import stats
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [4.0, 1.0, 3.0, 2.0]
+    assert stats.percentile(values, 0) == 1.0
+    assert stats.percentile(values, 100) == 4.0
+    assert stats.percentile(values, 50) == pytest.approx(2.5)
+    assert stats.percentile(values, 95) == pytest.approx(3.85)
+
+
+def test_percentile_of_one_value():
+    assert stats.percentile([7.0], 5) == 7.0
+
+
+def test_percentile_of_nothing():
+    with pytest.raises(ValueError):
+        stats.percentile([], 50)
+
+
+def test_median():
+    assert stats.median([3.0, 1.0, 2.0]) == 2.0
+    assert stats.median([1.0, 2.0, 3.0, 10.0]) == pytest.approx(2.5)
+
+
+def test_coefficient_of_variation():
+    # Sample standard deviation of [1, 2, 3] is 1, mean is 2
+    assert stats.coefficient_of_variation([1.0, 2.0, 3.0]) == pytest.approx(50.0)
+    assert stats.coefficient_of_variation([5.0, 5.0, 5.0]) == 0.0
+    assert stats.coefficient_of_variation([5.0]) == 0.0
+    assert stats.coefficient_of_variation([-1.0, 1.0]) == 0.0
+
+
+@pytest.mark.parametrize('statistic, expected', [
+    ('median', 3.0),
+    ('p5', 1.2),
+    ('p95', 4.8),
+    ('cv', 100.0 * math.sqrt(2.5) / 3.0),
+])
+def test_run_statistic(statistic, expected):
+    assert stats.run_statistic([1.0, 2.0, 3.0, 4.0, 5.0], statistic) == pytest.approx(expected)
+
+
+def test_run_statistic_unknown():
+    with pytest.raises(ValueError):
+        stats.run_statistic([1.0, 2.0], 'mean')
+
+
+def test_robust_z_scores():
+    scores = stats.robust_z_scores([1.0, 2.0, 3.0, 4.0, 100.0])
+    # Median 3, MAD 1
+    assert scores[2] == 0.0
+    assert scores[3] == pytest.approx(1 / stats.MAD_TO_SIGMA)
+    assert scores[4] == pytest.approx(97 / stats.MAD_TO_SIGMA)
+
+
+def test_robust_z_scores_without_spread():
+    assert stats.robust_z_scores([2.0, 2.0, 2.0, 3.0, 1.0]) == [
+        0.0, 0.0, 0.0, math.inf, -math.inf]
+
+
+def test_outlier_flags_lower_is_better():
+    latencies = [2.0, 2.1, 2.0, 1.9, 2.0, 4.0, 0.5]
+    flags = [outlier for _, outlier in stats.outlier_flags('latency', latencies)]
+    # Only the slow link is an outlier, not the fast one
+    assert flags == [False, False, False, False, False, True, False]
+
+
+def test_outlier_flags_higher_is_better():
+    bandwidths = [12000.0, 12100.0, 11900.0, 12050.0, 6000.0, 20000.0]
+    flags = [outlier for _, outlier in stats.outlier_flags('bandwidth', bandwidths)]
+    assert flags == [False, False, False, False, True, False]
+
+
+def test_outlier_flags_ignore_tiny_deviations():
+    # Far off in robust z, but within min_deviation of the median
+    latencies = [2.0, 2.0, 2.0, 2.0, 2.05]
+    flags = [outlier for _, outlier in stats.outlier_flags('latency', latencies)]
+    assert flags == [False] * 5
@@ -0,0 +1,70 @@
+import pytest
+
+from osu_utils import topology
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_parse_lstopo_xml(lstopo_xml, version):
+    parsed = topology.parse_lstopo_xml(lstopo_xml(version))
+    assert parsed['cpu_model'] == 'AMD EPYC 7H12 64-Core Processor'
+
+    cores = parsed['cores']
+    assert len(cores) == 32
+    assert cores[0]['pus'] == [0, 32]
+    assert [core['package'] for core in (cores[0], cores[16])] == ['0', '1']
+    assert [core['numa'] for core in (cores[0], cores[8], cores[16], cores[24])] == [
+        '0', '1', '2', '3']
+
+    # Cores 0-1 share an L2, cores 0-3 an L3
+    assert cores[0]['l2'] == cores[1]['l2'] != cores[2]['l2']
+    assert cores[0]['l3'] == cores[3]['l3'] != cores[4]['l3']
+
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_placement_pairs(lstopo_xml, version):
+    pairs = topology.placement_pairs(topology.parse_lstopo_xml(lstopo_xml(version)))
+    assert pairs == {
+        'SameL2': (0, 1),
+        'SameL3': (0, 2),
+        'SameNuma': (0, 4),
+        'CrossNuma': (0, 8),
+        'CrossSocket': (0, 16),
+    }
+
+
+def test_placement_pairs_private_l2(lstopo_xml):
+    # No two cores share an L2: SameL2 collapses onto nothing and is absent
+    pairs = topology.placement_pairs(topology.parse_lstopo_xml(lstopo_xml(cores_per_l2=1)))
+    assert list(pairs) == ['SameL3', 'SameNuma', 'CrossNuma', 'CrossSocket']
+    assert pairs['SameL3'] == (0, 1)
+
+
+def test_placement_pairs_without_cores():
+    assert topology.placement_pairs({'cpu_model': '', 'cores': []}) == {}
+
+
+@pytest.mark.parametrize('cpu_a, cpu_b, expected', [
+    (0, 32, 'SameCore'),
+    (0, 1, 'SameL2'),
+    (33, 2, 'SameL3'),
+    (0, 7, 'SameNuma'),
+    (0, 15, 'CrossNuma'),
+    (0, 63, 'CrossSocket'),
+])
+def test_cpu_pair_class(lstopo_xml, cpu_a, cpu_b, expected):
+    parsed = topology.parse_lstopo_xml(lstopo_xml())
+    assert topology.cpu_pair_class(parsed, cpu_a, cpu_b) == expected
+
+
+def test_mask_cpus():
+    assert topology.mask_cpus('0x1000f') == [0, 1, 2, 3, 16]
+    assert topology.mask_cpus('0x0') == []
+
+
+def test_main(lstopo_xml, capsys):
+    path = lstopo_xml()
+    assert topology.main([path, 'CrossNuma']) == 0
+    assert capsys.readouterr().out == '0,8\n'
+
+    assert topology.main([lstopo_xml(cores_per_l2=1), 'SameL2']) == 1
+    assert 'not available' in capsys.readouterr().err